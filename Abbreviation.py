@@ -1,3 +1,13 @@
+import sys
+
+# policies of choosing the definition of an abbreviation, when it is defined with different long notices:
+# the latest definition with long notice, the first definition with long notice,
+# or the most frequent long notice (ties are resolved in favour of the first defined long notice)
+MERGE_POLICIES = ["latest", "first", "most-frequent"]
+# max number of different long notices, tracked for every abbreviation
+DEFAULT_MAX_CANDIDATES = 8
+
+
 class Abbreviation:
     """
     An Abbreviation found in your text files
@@ -7,6 +17,8 @@ class Abbreviation:
         file: file where abbreviation was first defined
         line: line in the file where abbreviation was first defined
     """
+    __slots__ = ("short", "long", "file", "line")
+
     def __init__(self, short, long=None, file=None, line=None):
         self.short = short
         self.long = long
@@ -14,15 +26,257 @@ class Abbreviation:
         self.file = file
 
     def __eq__(self, other):
+        if not isinstance(other, Abbreviation):
+            return NotImplemented
         return self.short == other.short
 
+    def __hash__(self):
+        # abbreviations are equal if their short notices are equal,
+        # so the hash should only depend on the short notice
+        return hash(self.short)
+
     def __str__(self):
         return "{" + self.short + "}"
 
 
+class AbbreviationRegistry:
+    """
+    A collection of abbreviations, indexed by short notice.
+    Insert, replace and lookup of an abbreviation take O(1) time.
+    The abbreviations are kept in the order, in which they were first
+    defined, i.e., a replaced abbreviation keeps the position of the
+    abbreviation it replaces.
+    If a merge policy is specified, the registry also counts votes for every long notice
+    of an abbreviation, and the policy chooses the definition of the abbreviation.
+    Attributes:
+        abbreviations_by_short: dictionary with key = short notice, value = abbreviation
+        policy: merge policy (one of MERGE_POLICIES) or None. If None, long notices are not counted,
+            and the latest definition with long notice is kept
+        max_candidates: max number of different long notices, tracked for every abbreviation
+        candidates_by_short: dictionary with key = short notice, value = long notices
+            of the abbreviation (DefinitionCandidates)
+    """
+    def __init__(self, abbreviations=None, policy=None, max_candidates=DEFAULT_MAX_CANDIDATES):
+        if policy is not None and policy not in MERGE_POLICIES:
+            raise Exception("Unknown merge policy: " + str(policy) + ". Expected one of " + str(MERGE_POLICIES))
+        self.abbreviations_by_short = {}
+        self.policy = policy
+        self.max_candidates = max_candidates
+        self.candidates_by_short = {}
+        if abbreviations is not None:
+            for abbreviation in abbreviations:
+                self.add_or_replace(abbreviation)
+
+    def add_or_replace(self, abbreviation):
+        """
+        Add abbreviation to the registry or replace existing abbreviation in the registry.
+        The abbreviation is added to the registry, if the registry does not yet contain
+         an abbreviation with the same short notice.
+        The abbreviation replaces another abbreviation in the registry, if:
+            1) current abbreviation has long notice;
+            2) the registry contains an abbreviation with the same short notice;
+            3) the merge policy (if specified) chooses the current abbreviation
+        :param abbreviation: abbreviation
+        :return: True, if an abbreviation in the registry was replaced and False otherwise
+        """
+        if self.policy is not None:
+            return self.vote(abbreviation)
+
+        saved_abbreviation = self.abbreviations_by_short.get(abbreviation.short)
+        # add
+        if saved_abbreviation is None:
+            self.abbreviations_by_short[abbreviation.short] = abbreviation
+            return False
+
+        # replace
+        if abbreviation.long is not None:
+            self.abbreviations_by_short[abbreviation.short] = abbreviation
+            return True
+        return False
+
+    def vote(self, abbreviation):
+        """
+        Count abbreviation as a vote for its long notice, and keep the definition, chosen by the merge policy
+        :param abbreviation: abbreviation
+        :return: True, if an abbreviation in the registry was replaced and False otherwise
+        """
+        short = abbreviation.short
+        saved_abbreviation = self.abbreviations_by_short.get(short)
+        if abbreviation.long is None:
+            if saved_abbreviation is None:
+                self.abbreviations_by_short[short] = abbreviation
+            return False
+
+        candidates = self.candidates_by_short.get(short)
+        if candidates is None:
+            candidates = DefinitionCandidates()
+            self.candidates_by_short[short] = candidates
+        candidates.vote(abbreviation, self.max_candidates)
+
+        if self.policy == "latest":
+            chosen_abbreviation = abbreviation
+        elif self.policy == "first":
+            chosen_abbreviation = candidates.get_first()
+        else:
+            chosen_abbreviation = candidates.get_most_frequent()
+
+        if chosen_abbreviation is saved_abbreviation:
+            return False
+        self.abbreviations_by_short[short] = chosen_abbreviation
+        return saved_abbreviation is not None
+
+    def get_conflicts(self):
+        """
+        Get abbreviations, defined with different long notices
+        :return: conflicts as additional fields of abbreviations in the output JSON file:
+            dictionary with key = short notice, value = dictionary with the list of long notices
+            of the abbreviation, their votes and first definitions
+        """
+        conflicts = {}
+        for short, candidates in self.candidates_by_short.items():
+            if len(candidates.candidates) < 2 and candidates.other_votes == 0:
+                continue
+            fields = {"conflicts": [{"long": first_abbreviation.long, "votes": votes,
+                                     "file": first_abbreviation.file, "line": first_abbreviation.line}
+                                    for _, votes, first_abbreviation in candidates.candidates]}
+            if candidates.other_votes > 0:
+                fields["other_votes"] = candidates.other_votes
+            conflicts[short] = fields
+        return conflicts
+
+    def find(self, short_notice):
+        """
+        Find abbreviation by short notice
+        :param short_notice: short notice of abbreviation, e.g., BBC
+        :return: abbreviation with the short notice, if one is registered and None otherwise
+        """
+        return self.abbreviations_by_short.get(short_notice)
+
+    def to_list(self):
+        """
+        Get registered abbreviations as a list
+        :return: list of abbreviations in the order of their first definition
+        """
+        return list(self.abbreviations_by_short.values())
+
+    def __contains__(self, abbreviation):
+        return abbreviation.short in self.abbreviations_by_short
+
+    def __iter__(self):
+        return iter(self.abbreviations_by_short.values())
+
+    def __len__(self):
+        return len(self.abbreviations_by_short)
+
+
+class FileAbbreviations:
+    """
+    Abbreviations found in a single file, in the order of their positions in the file.
+    Unlike the registry, the file abbreviations keep every definition with long notice, so that
+    the merge policies count every definition of the file, not only the latest one.
+    Uses of an abbreviation without long notice are only kept, until the abbreviation is first found
+    Attributes:
+        abbreviations: list of abbreviations
+        shorts: set of short notices of the abbreviations
+    """
+    __slots__ = ("abbreviations", "shorts")
+
+    def __init__(self):
+        self.abbreviations = []
+        self.shorts = set()
+
+    def add(self, abbreviation):
+        """
+        Add abbreviation to the file abbreviations
+        :param abbreviation: abbreviation
+        :return: True, if the abbreviation was added and False, if it is a repeated use without long notice
+        """
+        if abbreviation.long is None and abbreviation.short in self.shorts:
+            return False
+        self.shorts.add(abbreviation.short)
+        self.abbreviations.append(abbreviation)
+        return True
+
+    def is_found(self, short_notice):
+        return short_notice in self.shorts
+
+    def to_list(self):
+        return self.abbreviations
+
+
+class DefinitionCandidates:
+    """
+    Long notices of an abbreviation, found in the input files.
+    Long notices are compared after normalization (case and white spaces are ignored).
+    The number of tracked long notices is capped, so that the memory stays bounded
+    Attributes:
+        candidates: list of [normalized long notice, votes, first abbreviation with the long notice]
+            in the order of the first definition
+        other_votes: votes for long notices, which were not tracked, because the cap was reached
+    """
+    __slots__ = ("candidates", "other_votes")
+
+    def __init__(self):
+        self.candidates = []
+        self.other_votes = 0
+
+    def vote(self, abbreviation, max_candidates=DEFAULT_MAX_CANDIDATES):
+        normalized_long = normalize_long_notice(abbreviation.long)
+        for candidate in self.candidates:
+            if candidate[0] is normalized_long:
+                candidate[1] += 1
+                return
+        if len(self.candidates) < max_candidates:
+            self.candidates.append([normalized_long, 1, abbreviation])
+        else:
+            self.other_votes += 1
+
+    def get_first(self):
+        return self.candidates[0][2]
+
+    def get_most_frequent(self):
+        # max() returns the first of the candidates with max votes
+        return max(self.candidates, key=lambda candidate: candidate[1])[2]
+
+
+def normalize_long_notice(long_notice):
+    """
+    Normalize long notice of an abbreviation, e.g., "Deep  learning " -> "deep learning".
+    Normalized long notices are interned, so that every long notice is stored once
+    and long notices can be compared by identity
+    :param long_notice: long notice
+    :return: normalized long notice
+    """
+    return sys.intern(" ".join(long_notice.split()).lower())
+
+
 def find_abbreviation_by_short_notice(short_notice, abbreviations):
+    if isinstance(abbreviations, AbbreviationRegistry):
+        return abbreviations.find(short_notice)
     for abbreviation in abbreviations:
         if abbreviation.short == short_notice:
             return abbreviation
     return None
 
+
+def abbreviation_to_record(abbreviation):
+    """
+    Represent abbreviation as a compact record, i.e., a tuple (short, long, line).
+    Records are cheap to pickle and to store, and are used to pass abbreviations
+    found in a file between processes. The file is not stored in the record,
+    because all the records, obtained from a file, share the file
+    :param abbreviation: abbreviation
+    :return: record (short, long, line)
+    """
+    return abbreviation.short, abbreviation.long, abbreviation.line
+
+
+def record_to_abbreviation(record, file_path=None):
+    """
+    Restore abbreviation from a compact record
+    :param record: record (short, long, line)
+    :param file_path: path to the file, where the abbreviation was found
+    :return: abbreviation
+    """
+    short, long, line = record
+    return Abbreviation(short, long, file_path, line)
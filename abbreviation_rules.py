@@ -0,0 +1,173 @@
+"""
+Rules of abbreviations classification. The rules decide, whether a substring, enclosed in round
+brackets (a candidate), is an abbreviation, and which suffix of an abbreviation marks the plural form
+(e.g., "s" in CNNs). Default rules can be extended with a JSON rules file, e.g.:
+    {
+        "stop_words": ["MHz", "GHz", "GB"],
+        "stop_patterns": ["(?=.*[0-9])([A-Z][a-z]?[0-9]*)+", "[A-Z][A-Za-z]+[0-9]{4}[a-z]?"],
+        "allowed_words": ["3D"],
+        "allowed_patterns": ["[0-9][A-Z]"]
+    }
+The rules are compiled once into a single regular expression and frozen sets, so that every candidate
+is classified in one step. Classification results are memoized per distinct candidate in a bounded LRU
+cache, because the same candidates repeat thousands of times across a corpus
+"""
+import re
+import json
+from functools import lru_cache
+
+# default rules reproduce the built-in classification: an abbreviation has at least
+# two capital letters and does not start with i.e. or e.g.; "s" marks the plural form
+DEFAULT_RULES = {
+    # min number of capital letters in an abbreviation
+    "min_capital_letters": 2,
+    # candidates with these prefixes (e.g., "i.e., the first one") are never abbreviations
+    "excluded_prefixes": ["i.e.", "e.g."],
+    # candidates, which are never abbreviations, e.g., units like MHz
+    "stop_words": [],
+    # regular expressions of candidates, which are never abbreviations, e.g., citation keys or chemical formulas
+    "stop_patterns": [],
+    # candidates, which are always abbreviations, even if they have less capital letters, e.g., 3D
+    "allowed_words": [],
+    # regular expressions of candidates, which are always abbreviations
+    "allowed_patterns": [],
+    # suffixes of abbreviations, which mark the plural form and do not match a word of the long notice
+    "plural_suffixes": ["s"]
+}
+
+# max number of distinct candidates, which classification is memoized
+DEFAULT_MEMO_SIZE = 65536
+
+
+class AbbreviationRules:
+    """
+    Compiled rules of abbreviations classification
+    Attributes:
+        config: rules configuration: dictionary with the keys of DEFAULT_RULES
+        min_capital_letters: min number of capital letters in an abbreviation
+        stop_words: frozen set of candidates, which are never abbreviations
+        allowed_words: frozen set of candidates, which are always abbreviations
+        pattern: compiled regular expression, which fully matches allowed candidates (group "allowed")
+            and excluded candidates (group "stop"), or None if there are no patterns
+        plural_suffixes: plural suffixes, longest first
+        classify: memoized classification function: classify(candidate) -> True, if the candidate
+            is an abbreviation and False otherwise
+    """
+    def __init__(self, config=None, memo_size=DEFAULT_MEMO_SIZE):
+        self.config = get_rules_config(config)
+        self.min_capital_letters = self.config["min_capital_letters"]
+        self.stop_words = frozenset(self.config["stop_words"])
+        self.allowed_words = frozenset(self.config["allowed_words"])
+        self.pattern = compile_rules_pattern(self.config)
+        self.plural_suffixes = tuple(sorted(self.config["plural_suffixes"], key=len, reverse=True))
+        self.classify = lru_cache(maxsize=memo_size)(self.classify_candidate)
+
+    def classify_candidate(self, candidate):
+        """
+        Classify a candidate (not memoized)
+        :param candidate: substring, enclosed in round brackets
+        :return: True, if the candidate is an abbreviation, and False otherwise
+        """
+        if candidate in self.allowed_words:
+            return True
+        if candidate in self.stop_words:
+            return False
+        if self.pattern is not None:
+            match = self.pattern.fullmatch(candidate)
+            if match is not None:
+                return match.lastgroup == "allowed"
+        return sum(map(str.isupper, candidate)) >= self.min_capital_letters
+
+    def strip_plural_suffix(self, short_notice):
+        """
+        Strip plural suffix from short notice of an abbreviation, e.g., CNNs -> CNN
+        :param short_notice: short notice of abbreviation
+        :return: short notice without plural suffix
+        """
+        for suffix in self.plural_suffixes:
+            if short_notice.endswith(suffix):
+                return short_notice[:-len(suffix)]
+        return short_notice
+
+
+def get_rules_config(config=None):
+    """
+    Get complete rules configuration. Lists in the configuration extend
+    the default lists, other values replace the default values
+    :param config: rules configuration (dictionary) or None
+    :return: rules configuration with all the keys of DEFAULT_RULES
+    """
+    complete_config = {key: list(value) if isinstance(value, list) else value for key, value in DEFAULT_RULES.items()}
+    if config is None:
+        return complete_config
+    for key, value in config.items():
+        if key not in DEFAULT_RULES:
+            raise Exception("Unknown abbreviations rule: " + str(key) + ". Expected one of " + str(list(DEFAULT_RULES)))
+        if isinstance(DEFAULT_RULES[key], list):
+            complete_config[key] += [item for item in value if item not in complete_config[key]]
+        else:
+            complete_config[key] = value
+    return complete_config
+
+
+def compile_rules_pattern(config):
+    """
+    Compile allowed patterns, stop patterns and excluded prefixes into a single regular expression.
+    Allowed patterns are tried first, so they take precedence over the stop patterns
+    :param config: complete rules configuration
+    :return: compiled regular expression with groups "allowed" and "stop" or None if there are no patterns
+    """
+    stop_patterns = list(config["stop_patterns"])
+    # candidates may be surrounded by white spaces, e.g., ( i.e., the first one)
+    stop_patterns += [r"\s*" + re.escape(prefix) + ".*" for prefix in config["excluded_prefixes"]]
+    groups = []
+    if config["allowed_patterns"]:
+        groups.append("(?P<allowed>" + "|".join("(?:" + p + ")" for p in config["allowed_patterns"]) + ")")
+    if stop_patterns:
+        groups.append("(?P<stop>" + "|".join("(?:" + p + ")" for p in stop_patterns) + ")")
+    if len(groups) == 0:
+        return None
+    return re.compile("|".join(groups), re.DOTALL)
+
+
+def load_rules_config(rules_path):
+    """
+    Load rules configuration from a JSON file
+    :param rules_path: path to JSON rules file
+    :return: rules configuration (dictionary)
+    """
+    with open(rules_path) as f:
+        config = json.load(f)
+    # check the configuration before the search starts
+    AbbreviationRules(config)
+    return config
+
+
+# compiled default rules, used if no rules configuration is given
+DEFAULT_ABBREVIATION_RULES = AbbreviationRules()
+
+# max number of distinct rules configurations, which compiled rules are kept
+MAX_COMPILED_RULES = 16
+
+
+def get_rules(config=None):
+    """
+    Get compiled rules of a configuration. The rules are compiled once per distinct configuration
+    and shared by all the callers, e.g., by scanners in different threads: compiled rules are never changed
+    :param config: rules configuration (dictionary). If None, default rules are returned
+    :return: compiled rules (AbbreviationRules)
+    """
+    if config is None:
+        return DEFAULT_ABBREVIATION_RULES
+    # configurations are dictionaries, so they are keyed by their JSON representation
+    return compile_rules(json.dumps(config, sort_keys=True))
+
+
+@lru_cache(maxsize=MAX_COMPILED_RULES)
+def compile_rules(config_json):
+    """
+    Compile rules of a configuration, represented as JSON
+    :param config_json: rules configuration, represented as JSON
+    :return: compiled rules (AbbreviationRules)
+    """
+    return AbbreviationRules(json.loads(config_json))
@@ -0,0 +1,175 @@
+"""
+Library API of the abbreviations search. Unlike main(), the API works on texts
+that are already in memory: it does not read or write files and does not print.
+Example:
+    from abbreviations_api import scan_texts
+    records = scan_texts([("intro.tex", "the existing Deep Learning (DL) frameworks")])
+    # [{'short': 'DL', 'long': 'Deep Learning ', 'file': 'intro.tex', 'line': 0}]
+"""
+from io import StringIO
+
+# local imports
+from Abbreviation import AbbreviationRegistry, abbreviation_to_record
+from scan_options import ScanOptions
+from json_converters.abbreviations_to_json import abbreviation_to_dict
+from abbreviation_rules import get_rules
+from result_store import ResultStore
+from main import find_abbreviations_in_lines
+
+
+class AbbreviationsScanner:
+    """
+    Reusable abbreviations scanner. The scanner resolves the abbreviations search engine once,
+    so that the setup is amortized over all the texts, scanned by the scanner
+    Attributes:
+        options: abbreviations search options (ScanOptions)
+        rules: compiled rules of abbreviations classification (AbbreviationRules)
+    """
+    def __init__(self, options=None):
+        self.options = ScanOptions() if options is None else options
+        if self.options.engine == "bytes":
+            raise Exception("The bytes engine visits raw bytes of input files. In-memory texts are "
+                            "already decoded, use the line or regex engine instead")
+        self.rules = rules = get_rules(self.options.rules)
+        if self.options.latex_aware:
+            from latex_tokenizer import iterate_prose_lines
+            # StringIO splits the text into lines only at line breaks ("\n"), as the regex engine does
+            get_lines = lambda text: iterate_prose_lines(StringIO(text))
+            get_text = lambda text: "".join(iterate_prose_lines(StringIO(text)))
+        else:
+            get_lines = StringIO
+            get_text = lambda text: text
+
+        if self.options.engine == "regex":
+            from regex_scanner import find_abbreviations_in_buffer
+            window = self.options.window
+            self._find_abbreviations = lambda text, name: find_abbreviations_in_buffer(get_text(text), name,
+                                                                                       window, rules)
+        else:
+            lookback = self.options.lookback
+            self._find_abbreviations = lambda text, name: find_abbreviations_in_lines(get_lines(text), name,
+                                                                                      lookback, rules)
+
+    def scan_text(self, name, text):
+        """
+        Find abbreviations in a text
+        :param name: name of the text (e.g., file name), saved in the "file" field of the records
+        :param text: text that may contain abbreviations
+        :return: list of records of abbreviations found in the text. Every record is a dictionary
+            with keys "short", "long" (if found), "file" and "line", as in the output JSON file.
+            An abbreviation, defined several times in the text, has a single record (the latest definition)
+        """
+        return [abbreviation_to_dict(abbreviation)
+                for abbreviation in AbbreviationRegistry(self._find_abbreviations(text, name))]
+
+    def find_abbreviations(self, name, text):
+        """
+        Find abbreviations in a text
+        :param name: name of the text (e.g., file name), saved in the "file" attribute of the abbreviations
+        :param text: text that may contain abbreviations
+        :return: list of abbreviations (Abbreviation) found in the text: every definition with long notice
+            and the first use of every abbreviation, e.g., to be merged with a merge policy
+        """
+        return self._find_abbreviations(text, name)
+
+    def scan_batch(self, texts):
+        """
+        Find abbreviations in every text of a batch
+        :param texts: iterable over tuples (name, text)
+        :return: list of tuples (name, records), where records is the list of
+            records of abbreviations found in the text, in the order of the input texts
+        """
+        find_abbreviations = self._find_abbreviations
+        return [(name, [abbreviation_to_dict(abbreviation)
+                         for abbreviation in AbbreviationRegistry(find_abbreviations(text, name))])
+                for name, text in texts]
+
+    def scan_texts(self, texts):
+        """
+        Find abbreviations in a number of texts and merge them, as they would be
+        merged if the texts were input files
+        :param texts: iterable over tuples (name, text)
+        :return: list of records of abbreviations found in the texts, in the order of their first definition
+        """
+        find_abbreviations = self._find_abbreviations
+        abbreviations = AbbreviationRegistry()
+        for name, text in texts:
+            for abbreviation in find_abbreviations(text, name):
+                abbreviations.add_or_replace(abbreviation)
+        return [abbreviation_to_dict(abbreviation) for abbreviation in abbreviations]
+
+    def scan_to_store(self, texts, store=None):
+        """
+        Find abbreviations in every text of a batch and keep them in a compact result store,
+        e.g., to analyse abbreviations of a large corpus, which do not fit in memory as records
+        :param texts: iterable over tuples (name, text)
+        :param store: result store (ResultStore), where the abbreviations are added. If None, a new store is created
+        :return: result store with abbreviations found in the texts, in the order of the input texts.
+            Use store.merge() to merge the abbreviations, as scan_texts() does
+        """
+        find_abbreviations = self._find_abbreviations
+        if store is None:
+            store = ResultStore()
+        for name, text in texts:
+            store.add_records(name, map(abbreviation_to_record, find_abbreviations(text, name)))
+        return store
+
+
+_default_scanner = None
+
+
+def get_default_scanner():
+    """
+    Get scanner with default options. The scanner is created once and reused by all calls
+    :return: scanner with default options
+    """
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = AbbreviationsScanner()
+    return _default_scanner
+
+
+def scan_text(name, text, options=None):
+    """
+    Find abbreviations in a text
+    :param name: name of the text (e.g., file name), saved in the "file" field of the records
+    :param text: text that may contain abbreviations
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :return: list of records of abbreviations found in the text
+    """
+    scanner = get_default_scanner() if options is None else AbbreviationsScanner(options)
+    return scanner.scan_text(name, text)
+
+
+def scan_texts(texts, options=None):
+    """
+    Find abbreviations in a number of texts and merge them
+    :param texts: iterable over tuples (name, text)
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :return: list of records of abbreviations found in the texts, in the order of their first definition
+    """
+    scanner = get_default_scanner() if options is None else AbbreviationsScanner(options)
+    return scanner.scan_texts(texts)
+
+
+def scan_batch(texts, options=None):
+    """
+    Find abbreviations in every text of a batch
+    :param texts: iterable over tuples (name, text)
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :return: list of tuples (name, records) in the order of the input texts
+    """
+    scanner = get_default_scanner() if options is None else AbbreviationsScanner(options)
+    return scanner.scan_batch(texts)
+
+
+def scan_to_store(texts, store=None, options=None):
+    """
+    Find abbreviations in every text of a batch and keep them in a compact result store
+    :param texts: iterable over tuples (name, text)
+    :param store: result store (ResultStore), where the abbreviations are added. If None, a new store is created
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :return: result store with abbreviations found in the texts
+    """
+    scanner = get_default_scanner() if options is None else AbbreviationsScanner(options)
+    return scanner.scan_to_store(texts, store)
@@ -0,0 +1,152 @@
+"""
+Lightweight entry point of abbreviations search for build-system hooks (e.g., latexmk or pre-commit).
+Every input file is scanned separately (abbreviations of different files are not merged), and the
+abbreviations found in the file are printed as a single JSON line (NDJSON):
+    {"file": "intro.tex", "abbreviations": [{"short": "DL", "long": "Deep Learning ", "file": "intro.tex", "line": 0}]}
+Files, which cannot be read, are printed with an "error" field instead of "abbreviations".
+Paths are taken from the command line or, in batch mode, from stdin, so that a single process
+can serve a whole build. Only the modules, needed for the search, are imported, and the
+command line is parsed without argparse, so that the startup stays cheap.
+Example:
+    python abbreviations_hook.py chapter1.tex chapter2.tex
+    find . -name "*.tex" -print0 | python abbreviations_hook.py --stdin -0
+"""
+import os
+import sys
+import json
+
+# local imports
+from Abbreviation import AbbreviationRegistry
+from scan_options import ScanOptions
+from json_converters.abbreviations_to_json import abbreviation_to_dict
+from archive_reader import is_archive
+from main import find_abbreviations_in_file, find_abbreviations_in_archive
+
+USAGE = """usage: abbreviations_hook.py [--engine line|regex|bytes] [--lookback N] [--latex-aware] [-e EXTENSION]
+                             [--stdin [-0]] [FILE ...]
+  --stdin: read paths to input files from stdin, one path per line
+  -0: paths in stdin are separated by NUL characters (e.g., find -print0) instead of line breaks"""
+
+
+def main():
+    try:
+        settings = parse_args(sys.argv[1:])
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        print(USAGE, file=sys.stderr)
+        sys.exit(2)
+    options, file_paths, read_stdin, null_separated = settings
+
+    if read_stdin:
+        stdin = sys.stdin.buffer if null_separated else sys.stdin
+        file_paths = iterate_null_separated_paths(stdin) if null_separated else iterate_line_separated_paths(stdin)
+
+    # the results are written into stdout, and all the other messages (e.g., errors) into stderr
+    output = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        for file_path in file_paths:
+            for result in scan_file(file_path, options):
+                output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        sys.stdout = output
+
+
+def parse_args(args):
+    """
+    Parse command line arguments
+    :param args: command line arguments (without the script name)
+    :return: tuple (options, file_paths, read_stdin, null_separated)
+    """
+    engine = "line"
+    lookback = 1
+    latex_aware = False
+    extension = "tex"
+    read_stdin = False
+    null_separated = False
+    file_paths = []
+
+    args = iter(args)
+    for arg in args:
+        if arg == "--engine":
+            engine = next(args, None)
+        elif arg == "--lookback":
+            lookback = int(next(args, "1"))
+        elif arg == "--latex-aware":
+            latex_aware = True
+        elif arg == "-e":
+            extension = next(args, extension)
+        elif arg == "--stdin":
+            read_stdin = True
+        elif arg == "-0":
+            null_separated = True
+        elif arg.startswith("-"):
+            raise Exception("Unknown argument: " + arg)
+        else:
+            file_paths.append(arg)
+
+    if null_separated and not read_stdin:
+        raise Exception("-0 is only supported with --stdin")
+    if not read_stdin and len(file_paths) == 0:
+        raise Exception("No input files")
+    options = ScanOptions(lookback=lookback, engine=engine, latex_aware=latex_aware, member_extensions=[extension])
+    return options, file_paths, read_stdin, null_separated
+
+
+def scan_file(file_path, options):
+    """
+    Try to find abbreviations in an input file or archive
+    :param file_path: path to input file or archive
+    :param options: abbreviations search options (ScanOptions)
+    :return: list of results: dictionaries with the file path and either the list of abbreviations,
+        found in the file, or the error. An archive has one result per scanned member
+    """
+    if is_archive(file_path):
+        return [get_result(path, abbreviations, error) for path, abbreviations, error
+                in find_abbreviations_in_archive(file_path, False, options, report_errors=False)]
+    try:
+        return [get_result(file_path, find_abbreviations_in_file(file_path, False, options))]
+    except (OSError, UnicodeDecodeError) as e:
+        return [get_result(file_path, error=str(e))]
+
+
+def get_result(file_path, abbreviations=None, error=None):
+    if error is not None:
+        return {"file": file_path, "error": error}
+    # an abbreviation, defined several times in the file, is reported once (the latest definition)
+    return {"file": file_path, "abbreviations": [abbreviation_to_dict(abbreviation)
+                                                 for abbreviation in AbbreviationRegistry(abbreviations)]}
+
+
+def iterate_line_separated_paths(stream):
+    for line in stream:
+        path = line.rstrip("\r\n")
+        if path != "":
+            yield path
+
+
+def iterate_null_separated_paths(stream, chunk_size=1 << 16):
+    """
+    Iterate over NUL-separated paths in a binary stream. The paths are returned,
+    as soon as they are read, so that the files can be scanned before the stream is over
+    :param stream: binary stream, e.g., sys.stdin.buffer
+    :param chunk_size: size of chunks, in which the stream is read
+    :return: generator of paths
+    """
+    pending = b""
+    while True:
+        chunk = stream.read1(chunk_size) if hasattr(stream, "read1") else stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        *paths, pending = pending.split(b"\0")
+        for path in paths:
+            if path != b"":
+                yield os.fsdecode(path)
+    if pending != b"":
+        yield os.fsdecode(pending)
+
+
+if __name__ == "__main__":
+    main()
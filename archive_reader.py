@@ -0,0 +1,78 @@
+"""
+Reader of archives (.zip, .tar, .tar.gz) with input files, e.g., arXiv-style source bundles.
+Archive members are read one by one straight from the archive, without extracting the
+archive to the disk. Abbreviations, found in an archive member, refer to the member
+by path of the form archive!member, e.g., 2101.00001.tar.gz!sections/intro.tex
+"""
+import os
+
+# local imports
+from input_file_worker import has_matching_extension_in_set
+
+# extensions of archives with input files
+ARCHIVE_EXTENSIONS = ["zip", "tar", "tar.gz", "tgz"]
+# separator between path to archive and path to archive member
+ARCHIVE_MEMBER_SEPARATOR = "!"
+
+
+def is_archive(path):
+    return has_matching_extension_in_set(os.path.basename(path).lower(), frozenset(ARCHIVE_EXTENSIONS))
+
+
+def get_member_path(archive_path, member_name):
+    return archive_path + ARCHIVE_MEMBER_SEPARATOR + member_name
+
+
+def iterate_archive_members(archive_path, member_extensions=None):
+    """
+    Iterate over the files in an archive. The members are read one after another,
+    so only one member is kept in memory. Tar archives (compressed or not) are read
+    as a stream, in a single pass
+    :param archive_path: path to .zip, .tar or .tar.gz archive
+    :param member_extensions: extensions of archive members to read. If None, all the members are read
+    :return: generator of tuples (member_path, data), where member_path is the path of the form
+        archive!member and data is the raw content (bytes) of the member
+    """
+    extensions_set = None if member_extensions is None else frozenset(member_extensions)
+
+    if archive_path.lower().endswith(".zip"):
+        import zipfile
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not has_member_extension(member.filename, extensions_set):
+                    continue
+                with archive.open(member) as f:
+                    yield get_member_path(archive_path, member.filename), f.read()
+        return
+
+    import tarfile
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member in archive:
+            if not member.isfile() or not has_member_extension(member.name, extensions_set):
+                continue
+            f = archive.extractfile(member)
+            yield get_member_path(archive_path, member.name), f.read()
+
+
+def has_member_extension(member_name, extensions_set):
+    if extensions_set is None:
+        return True
+    return has_matching_extension_in_set(member_name.rsplit("/", 1)[-1], extensions_set)
+
+
+def decode_member(data, encodings):
+    """
+    Decode content of an archive member
+    :param data: raw content (bytes) of the member
+    :param encodings: encodings, tried one after another, until the member is decoded
+    :return: decoded text. Line breaks are translated into "\n", as when a text file is opened
+    """
+    last_encoding = encodings[-1]
+    for encoding in encodings:
+        try:
+            text = data.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            if encoding == last_encoding:
+                raise
+    return text.replace("\r\n", "\n").replace("\r", "\n")
@@ -0,0 +1,110 @@
+"""
+Comparison of found abbreviations with a baseline, i.e., a previously generated output JSON file.
+Only the differences are reported: added, removed and changed (defined with another long notice)
+abbreviations. The exit code of the comparison can be used to gate CI pipelines
+"""
+import json
+import hashlib
+
+# local imports
+from json_converters.json_util import parse_list, extract_or_default
+
+# exit codes of the comparison
+EXIT_NO_CHANGES = 0
+EXIT_CHANGES = 1
+EXIT_ERROR = 2
+
+
+def load_baseline(baseline_path):
+    """
+    Load baseline abbreviations into an index
+    :param baseline_path: path to previously generated output JSON or NDJSON file.
+        In an NDJSON file, a later line with the same short notice supersedes earlier lines
+    :return: dictionary with key = short notice, value = abbreviation (dictionary), as in the output JSON file
+    """
+    try:
+        baseline_json = parse_list(baseline_path)
+    except json.JSONDecodeError:
+        baseline_json = None
+    if isinstance(baseline_json, dict) and "abbreviations" in baseline_json:
+        abbreviations = extract_or_default(baseline_json, "abbreviations", [])
+    else:
+        with open(baseline_path) as f:
+            abbreviations = [json.loads(line) for line in f if line.strip() != ""]
+    return {abbreviation["short"]: abbreviation for abbreviation in abbreviations}
+
+
+def diff_abbreviations(baseline_index, abbreviations):
+    """
+    Compare found abbreviations with the baseline
+    :param baseline_index: baseline abbreviations: dictionary with key = short notice,
+        value = abbreviation (dictionary)
+    :param abbreviations: list of found abbreviations
+    :return: differences: dictionary with lists of "added" and "removed" abbreviations
+        and "changed" abbreviations with their "old" and "new" long notices
+    """
+    added = []
+    changed = []
+    found_shorts = set()
+    for abbreviation in abbreviations:
+        found_shorts.add(abbreviation.short)
+        baseline_abbreviation = baseline_index.get(abbreviation.short)
+        if baseline_abbreviation is None:
+            added.append(abbreviation_to_diff_dict(abbreviation.short, abbreviation.long,
+                                                   abbreviation.file, abbreviation.line))
+        elif baseline_abbreviation.get("long") != abbreviation.long:
+            changed.append({"short": abbreviation.short,
+                            "old": baseline_abbreviation.get("long"),
+                            "new": abbreviation.long,
+                            "file": abbreviation.file,
+                            "line": abbreviation.line})
+    removed = [abbreviation_to_diff_dict(short, abbreviation.get("long"), abbreviation.get("file"),
+                                         abbreviation.get("line"))
+               for short, abbreviation in baseline_index.items() if short not in found_shorts]
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def abbreviation_to_diff_dict(short, long, file, line):
+    return {"short": short, "long": long, "file": file, "line": line}
+
+
+def has_differences(differences):
+    return len(differences["added"]) > 0 or len(differences["removed"]) > 0 or len(differences["changed"]) > 0
+
+
+def get_definitions_digest(definitions):
+    """
+    Get digest of abbreviations definitions. The digest does not depend on the order of the definitions
+    :param definitions: iterable over pairs (short notice, long notice or None)
+    :return: hex digest of the definitions
+    """
+    sorted_definitions = sorted((short, "" if long is None else long) for short, long in definitions)
+    return hashlib.sha1(json.dumps(sorted_definitions).encode("utf-8")).hexdigest()
+
+
+def get_baseline_digest(baseline_index):
+    return get_definitions_digest((short, abbreviation.get("long")) for short, abbreviation in baseline_index.items())
+
+
+def print_differences(differences, baseline_path):
+    if not has_differences(differences):
+        print("No changes against baseline", baseline_path)
+        return
+    print("Changes against baseline", baseline_path + ":", len(differences["added"]), "added,",
+          len(differences["removed"]), "removed,", len(differences["changed"]), "changed")
+    for abbreviation in differences["added"]:
+        print("  + " + abbreviation["short"], format_long_notice(abbreviation["long"]),
+              format_location(abbreviation))
+    for abbreviation in differences["removed"]:
+        print("  - " + abbreviation["short"], format_long_notice(abbreviation["long"]))
+    for abbreviation in differences["changed"]:
+        print("  ~ " + abbreviation["short"], format_long_notice(abbreviation["old"]), "->",
+              format_long_notice(abbreviation["new"]), format_location(abbreviation))
+
+
+def format_long_notice(long_notice):
+    return "(no long notice)" if long_notice is None else "\"" + long_notice.strip() + "\""
+
+
+def format_location(abbreviation):
+    return "at " + str(abbreviation["file"]) + ":" + str(abbreviation["line"])
@@ -0,0 +1,167 @@
+import os
+import random
+import argparse
+
+WORDS = ["system", "model", "network", "data", "parallel", "execution", "platform", "memory",
+         "processing", "application", "throughput", "latency", "mapping", "layer", "graph",
+         "computation", "resource", "embedded", "device", "workload", "inference", "training",
+         "schedule", "analysis", "method", "efficient", "distributed", "architecture", "unit",
+         "kernel", "buffer", "channel", "pipeline", "task", "level", "dataflow", "operator"]
+
+FALSE_POSITIVE_BRACKETS = ["(see Section~\\ref{sec:intro})", "(x)", "(i.e., the first one)", "(e.g., CPUs)",
+                           "$f(XY)$", "(2019)", "(a)", "(in contrast)", "(Fig. 3)", "(cf. Table 2)"]
+
+
+class CorpusSettings:
+    """
+    Settings of a synthetic LaTeX corpus
+    Attributes:
+        files: number of .tex files in the corpus
+        file_size: approximate size of every file, in bytes
+        line_length: approximate length of a text line, in characters
+        abbreviation_density: share of lines that define an abbreviation
+        wrapped_share: share of abbreviation definitions, wrapped across a line break
+        false_positive_share: share of lines that contain round brackets, which do not define an abbreviation
+        distinct_abbreviations: number of distinct abbreviations in the corpus
+        seed: random seed. The same settings and seed always produce the same corpus
+    """
+    def __init__(self, files=100, file_size=20000, line_length=100, abbreviation_density=0.05,
+                 wrapped_share=0.2, false_positive_share=0.1, distinct_abbreviations=500, seed=0):
+        self.files = files
+        self.file_size = file_size
+        self.line_length = line_length
+        self.abbreviation_density = abbreviation_density
+        self.wrapped_share = wrapped_share
+        self.false_positive_share = false_positive_share
+        self.distinct_abbreviations = distinct_abbreviations
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def generate_corpus(output_dir, settings: CorpusSettings, verbose=False):
+    """
+    Generate a synthetic LaTeX corpus
+    :param output_dir: directory, where the corpus .tex files are saved
+    :param settings: corpus settings
+    :param verbose: flag. If True, print details
+    :return: list of paths to generated .tex files
+    """
+    rnd = random.Random(settings.seed)
+    definitions = generate_definitions(rnd, settings.distinct_abbreviations)
+    os.makedirs(output_dir, exist_ok=True)
+
+    file_paths = []
+    for file_id in range(settings.files):
+        # spread the files over several chapters to have a nested directory tree
+        chapter_dir = os.path.join(output_dir, "chapter" + str(file_id % 10))
+        os.makedirs(chapter_dir, exist_ok=True)
+        file_path = os.path.join(chapter_dir, "section" + str(file_id) + ".tex")
+        with open(file_path, "w") as f:
+            f.write(generate_file_content(rnd, definitions, settings))
+        file_paths.append(file_path)
+
+    if verbose:
+        print("Generated", len(file_paths), "files in", output_dir)
+    return file_paths
+
+
+def generate_definitions(rnd, distinct_abbreviations):
+    """
+    Generate abbreviation definitions
+    :param rnd: random generator
+    :param distinct_abbreviations: number of distinct abbreviations
+    :return: list of tuples (long notice words, short notice)
+    """
+    definitions = {}
+    while len(definitions) < distinct_abbreviations:
+        long_notice_words = [rnd.choice(WORDS) for _ in range(rnd.randint(2, 5))]
+        long_notice_words = [word.capitalize() if rnd.random() < 0.5 else word for word in long_notice_words]
+        short_notice = "".join(word[0].upper() for word in long_notice_words)
+        if rnd.random() < 0.3:
+            short_notice += "s"
+        definitions.setdefault(short_notice, long_notice_words)
+    return [(long_notice_words, short_notice) for short_notice, long_notice_words in definitions.items()]
+
+
+def generate_file_content(rnd, definitions, settings: CorpusSettings):
+    """
+    Generate content of a single .tex file
+    :param rnd: random generator
+    :param definitions: list of tuples (long notice words, short notice)
+    :param settings: corpus settings
+    :return: content of the .tex file
+    """
+    lines = ["\\section{Synthetic section}\n", "\\label{sec:synthetic}\n", "\n"]
+    size = sum(len(line) for line in lines)
+    while size < settings.file_size:
+        words = generate_prose_words(rnd, settings.line_length)
+        chance = rnd.random()
+        if chance < settings.abbreviation_density:
+            long_notice_words, short_notice = rnd.choice(definitions)
+            definition = long_notice_words + ["(" + short_notice + ")"]
+            position = rnd.randint(0, len(words))
+            if rnd.random() < settings.wrapped_share:
+                # wrap the definition across a line break
+                split_pos = rnd.randint(1, len(definition) - 1)
+                first_line = words[:position] + definition[:split_pos]
+                second_line = definition[split_pos:] + words[position:]
+                new_lines = [" ".join(first_line) + "\n", " ".join(second_line) + "\n"]
+            else:
+                new_lines = [" ".join(words[:position] + definition + words[position:]) + "\n"]
+        elif chance < settings.abbreviation_density + settings.false_positive_share:
+            words.insert(rnd.randint(0, len(words)), rnd.choice(FALSE_POSITIVE_BRACKETS))
+            new_lines = [" ".join(words) + "\n"]
+        else:
+            new_lines = [" ".join(words) + "\n"]
+
+        for line in new_lines:
+            lines.append(line)
+            size += len(line)
+    return "".join(lines)
+
+
+def generate_prose_words(rnd, line_length):
+    """
+    Generate words of a prose line
+    :param rnd: random generator
+    :param line_length: approximate length of the line, in characters
+    :return: list of words
+    """
+    words = []
+    length = 0
+    while length < line_length:
+        word = rnd.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description='The script generates a synthetic LaTeX corpus '
+                                                 'for abbreviations search benchmarking.')
+    parser.add_argument('-o', metavar='--output', type=str, action='store', default="./output/corpus",
+                        help='path to output directory')
+    parser.add_argument('--files', type=int, action='store', default=100, help='number of .tex files')
+    parser.add_argument('--file-size', type=int, action='store', default=20000, help='approximate file size, in bytes')
+    parser.add_argument('--line-length', type=int, action='store', default=100,
+                        help='approximate line length, in characters')
+    parser.add_argument('--density', type=float, action='store', default=0.05,
+                        help='share of lines that define an abbreviation')
+    parser.add_argument('--wrapped', type=float, action='store', default=0.2,
+                        help='share of abbreviation definitions, wrapped across a line break')
+    parser.add_argument('--false-positives', type=float, action='store', default=0.1,
+                        help='share of lines with round brackets, which do not define an abbreviation')
+    parser.add_argument('--distinct', type=int, action='store', default=500, help='number of distinct abbreviations')
+    parser.add_argument('--seed', type=int, action='store', default=0, help='random seed')
+    parser.add_argument('--verbose', help="print details", action="store_true", default=False)
+    args = parser.parse_args()
+
+    settings = CorpusSettings(args.files, args.file_size, args.line_length, args.density,
+                              args.wrapped, args.false_positives, args.distinct, args.seed)
+    generate_corpus(args.o, settings, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
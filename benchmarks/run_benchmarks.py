@@ -0,0 +1,298 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+import tracemalloc
+import subprocess
+
+# make the project modules importable, when the script is run from the benchmarks directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# local imports
+from Abbreviation import Abbreviation, AbbreviationRegistry
+from result_store import ResultStore
+from scan_options import ScanOptions
+from input_file_worker import get_input_file_paths
+from json_converters.abbreviations_to_json import abbreviations_to_json, save_as_json
+from json_converters.json_util import parse_list
+from main import find_abbreviations_in_files_list, has_two_round_brackets, try_find_abbreviations_in_line, \
+    iterate_line_definitions, find_substrings_in_round_brackets, is_abbreviation, get_short_notice_letters, \
+    search_substring_for_long_notice, add_or_replace_abbreviation
+from benchmarks.corpus_generator import CorpusSettings, generate_corpus
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='The script measures throughput of abbreviations search '
+                                                 'stages on a synthetic LaTeX corpus. The results are saved '
+                                                 'in output JSON file.')
+    parser.add_argument('-i', metavar='--input', type=str, action='store', default=None,
+                        help='path to an existing corpus directory. If not specified, a synthetic corpus is generated')
+    parser.add_argument('-o', metavar='--output', type=str, action='store', default="./output/bench.json",
+                        help='path to output JSON file with benchmark results')
+    parser.add_argument('--files', type=int, action='store', default=100, help='number of generated .tex files')
+    parser.add_argument('--file-size', type=int, action='store', default=20000,
+                        help='approximate size of a generated file, in bytes')
+    parser.add_argument('--line-length', type=int, action='store', default=100,
+                        help='approximate line length, in characters')
+    parser.add_argument('--density', type=float, action='store', default=0.05,
+                        help='share of lines that define an abbreviation')
+    parser.add_argument('--wrapped', type=float, action='store', default=0.2,
+                        help='share of abbreviation definitions, wrapped across a line break')
+    parser.add_argument('--false-positives', type=float, action='store', default=0.1,
+                        help='share of lines with round brackets, which do not define an abbreviation')
+    parser.add_argument('--distinct', type=int, action='store', default=500, help='number of distinct abbreviations')
+    parser.add_argument('--seed', type=int, action='store', default=0, help='random seed')
+    parser.add_argument('--compare', type=str, action='store', default=None,
+                        help='path to benchmark results of another commit to compare with')
+    parser.add_argument('--verbose', help="print details", action="store_true", default=False)
+    args = parser.parse_args()
+
+    settings = CorpusSettings(args.files, args.file_size, args.line_length, args.density,
+                              args.wrapped, args.false_positives, args.distinct, args.seed)
+
+    if args.i is not None:
+        results = run_benchmarks(args.i, None, args.verbose)
+    else:
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            generate_corpus(corpus_dir, settings, args.verbose)
+            results = run_benchmarks(corpus_dir, settings, args.verbose)
+
+    if args.compare is not None:
+        results["comparison"] = compare_results(parse_list(args.compare), results)
+        print_comparison(results["comparison"])
+
+    save_as_json(args.o, results)
+    if args.verbose:
+        print("Benchmark results saved in", args.o)
+
+
+def run_benchmarks(corpus_dir, settings=None, verbose=False):
+    """
+    Measure throughput of abbreviations search stages on a corpus
+    :param corpus_dir: path to corpus directory with .tex files
+    :param settings: settings of the synthetic corpus (if the corpus was generated)
+    :param verbose: flag. If True, print details
+    :return: benchmark results (dictionary)
+    """
+    stages = []
+
+    # discovery
+    start = time.perf_counter()
+    file_paths = get_input_file_paths(corpus_dir, ["tex"])
+    stages.append(stage_result("discovery", time.perf_counter() - start, len(file_paths), 0))
+    corpus_bytes = sum(os.path.getsize(path) for path in file_paths)
+
+    # file reading
+    start = time.perf_counter()
+    files_as_lines = []
+    for path in file_paths:
+        with open(path) as fp:
+            files_as_lines.append(list(fp))
+    stages.append(stage_result("reading", time.perf_counter() - start, len(file_paths), corpus_bytes))
+
+    # bracket prefiltering
+    start = time.perf_counter()
+    candidate_lines = []
+    for path, lines in zip(file_paths, files_as_lines):
+        prev_line = ""
+        for line_id, line in enumerate(lines):
+            if has_two_round_brackets(line):
+                candidate_lines.append((line, prev_line, line_id, path))
+            prev_line = line
+    stages.append(stage_result("prefilter", time.perf_counter() - start, len(file_paths), corpus_bytes,
+                               candidate_lines=len(candidate_lines)))
+
+    # abbreviations search in the candidate lines
+    start = time.perf_counter()
+    line_abbreviations = []
+    for line, prev_line, line_id, path in candidate_lines:
+        for abbreviation in try_find_abbreviations_in_line(line, prev_line):
+            abbreviation.file = path
+            abbreviation.line = line_id
+            line_abbreviations.append(abbreviation)
+    stages.append(stage_result("try_find_abbreviations_in_line", time.perf_counter() - start, len(file_paths),
+                               corpus_bytes, abbreviations=len(line_abbreviations)))
+
+    # long notice search alone
+    long_notice_inputs = []
+    for line, prev_line, _, _ in candidate_lines:
+        for substring in find_substrings_in_round_brackets(line):
+            if is_abbreviation(substring):
+                long_notice_inputs.append((prev_line + line[:line.find(substring)],
+                                           get_short_notice_letters(substring)))
+    start = time.perf_counter()
+    for substring, short_notice_letters in long_notice_inputs:
+        search_substring_for_long_notice(substring, short_notice_letters)
+    stages.append(stage_result("search_substring_for_long_notice", time.perf_counter() - start, len(file_paths),
+                               corpus_bytes, calls=len(long_notice_inputs)))
+
+    # merge
+    start = time.perf_counter()
+    registry = AbbreviationRegistry()
+    for abbreviation in line_abbreviations:
+        add_or_replace_abbreviation(abbreviation, registry)
+    stages.append(stage_result("add_or_replace_abbreviation", time.perf_counter() - start, len(file_paths),
+                               corpus_bytes, abbreviations=len(registry)))
+
+    # memory, taken by per-file results, which are kept until all the files are scanned (--follow-includes)
+    # or for the whole session (--watch): lists of abbreviation objects and a compact result store.
+    # The stages run under tracemalloc, so their times are only comparable with each other
+    tracemalloc.start()
+    start = time.perf_counter()
+    file_results = {}
+    for line, prev_line, line_id, path in candidate_lines:
+        file_abbreviations = file_results.setdefault(path, [])
+        for short_notice, long_notice in iterate_line_definitions(line, prev_line):
+            file_abbreviations.append(Abbreviation(short_notice, long_notice, path, line_id))
+    seconds = time.perf_counter() - start
+    traced_current, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stages.append(stage_result("file_results_objects", seconds, len(file_paths), corpus_bytes,
+                               abbreviations=sum(len(a) for a in file_results.values()),
+                               traced_peak_bytes=traced_peak, traced_retained_bytes=traced_current))
+    del file_results
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = ResultStore()
+    # candidate lines of a file follow each other, so the results of a file are added, when the next file starts
+    file_path, file_records = None, []
+    for line, prev_line, line_id, path in candidate_lines:
+        if path != file_path:
+            if file_path is not None:
+                store.add_records(file_path, file_records)
+            file_path, file_records = path, []
+        for short_notice, long_notice in iterate_line_definitions(line, prev_line):
+            file_records.append((short_notice, long_notice, line_id))
+    if file_path is not None:
+        store.add_records(file_path, file_records)
+    del file_records
+    seconds = time.perf_counter() - start
+    traced_current, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stages.append(stage_result("file_results_store", seconds, len(file_paths), corpus_bytes,
+                               abbreviations=len(store), traced_peak_bytes=traced_peak,
+                               traced_retained_bytes=traced_current))
+    del store
+
+    # output
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        abbreviations_to_json(registry.to_list(), os.path.join(output_dir, "abbr.json"), False)
+        stages.append(stage_result("abbreviations_to_json", time.perf_counter() - start, len(file_paths),
+                                   corpus_bytes))
+
+    # end-to-end abbreviations search with every engine and prefilter
+    for name, options in [("line", ScanOptions(engine="line")),
+                          ("regex", ScanOptions(engine="regex")),
+                          ("line_latex_aware", ScanOptions(engine="line", latex_aware=True))]:
+        start = time.perf_counter()
+        abbreviations = find_abbreviations_in_files_list(file_paths, False, options)
+        stages.append(stage_result("end_to_end_" + name, time.perf_counter() - start, len(file_paths),
+                                   corpus_bytes, abbreviations=len(abbreviations)))
+
+    results = {"commit": get_git_commit(),
+               "python": sys.version.split()[0],
+               "corpus": {"files": len(file_paths), "bytes": corpus_bytes,
+                          "settings": settings.to_dict() if settings is not None else None},
+               "stages": stages,
+               "peak_rss_bytes": get_peak_rss_bytes()}
+
+    if verbose:
+        print_results(results)
+    return results
+
+
+def stage_result(name, seconds, files, corpus_bytes, **counters):
+    """
+    Represent measurements of a benchmark stage as a dictionary
+    :param name: stage name
+    :param seconds: stage wall time, in seconds
+    :param files: number of files, processed in the stage
+    :param corpus_bytes: number of bytes, processed in the stage
+    :param counters: additional stage counters
+    :return: stage measurements (dictionary)
+    """
+    result = {"stage": name,
+              "seconds": seconds,
+              "files_per_second": files / seconds if seconds > 0 else None,
+              "mb_per_second": corpus_bytes / seconds / 1e6 if seconds > 0 and corpus_bytes > 0 else None,
+              "peak_rss_bytes": get_peak_rss_bytes()}
+    result.update(counters)
+    return result
+
+
+def get_peak_rss_bytes():
+    """
+    Get peak resident set size of the current process
+    :return: peak resident set size, in bytes, or None if it cannot be obtained on this platform
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in kilobytes on other platforms
+    if sys.platform == "darwin":
+        return peak_rss
+    return peak_rss * 1024
+
+
+def get_git_commit():
+    """
+    Get the current git commit of the project, so that the results of different commits can be compared
+    :return: current git commit hash or None, if it cannot be obtained
+    """
+    try:
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=project_dir,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(baseline_results, results):
+    """
+    Compare benchmark results with the results of another commit
+    :param baseline_results: benchmark results of another commit
+    :param results: benchmark results of the current commit
+    :return: list of per-stage comparisons. Speedup > 1 means that the current commit is faster
+    """
+    baseline_stages = {stage["stage"]: stage for stage in baseline_results["stages"]}
+    comparison = []
+    for stage in results["stages"]:
+        baseline_stage = baseline_stages.get(stage["stage"])
+        if baseline_stage is None:
+            continue
+        speedup = baseline_stage["seconds"] / stage["seconds"] if stage["seconds"] > 0 else None
+        comparison.append({"stage": stage["stage"],
+                           "baseline_commit": baseline_results.get("commit"),
+                           "baseline_seconds": baseline_stage["seconds"],
+                           "seconds": stage["seconds"],
+                           "speedup": speedup})
+    return comparison
+
+
+def print_comparison(comparison):
+    for stage in comparison:
+        speedup = stage["speedup"]
+        print("  - {:<36} speedup {:>6}".format(stage["stage"], "-" if speedup is None else "{:.2f}".format(speedup)))
+
+
+def print_results(results):
+    print("Corpus:", results["corpus"]["files"], "files,", results["corpus"]["bytes"], "bytes")
+    for stage in results["stages"]:
+        mb_per_second = stage["mb_per_second"]
+        print("  - {:<36} {:>9.4f} s {:>10} MB/s".format(
+            stage["stage"], stage["seconds"], "-" if mb_per_second is None else "{:.2f}".format(mb_per_second)))
+        if "traced_peak_bytes" in stage:
+            print("    traced peak memory:", stage["traced_peak_bytes"], "bytes")
+    print("Peak RSS:", results["peak_rss_bytes"], "bytes")
+
+
+if __name__ == "__main__":
+    main()
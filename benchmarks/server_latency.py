@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+import socket
+import tempfile
+import argparse
+import threading
+import subprocess
+
+# make the project modules importable, when the script is run from the benchmarks directory
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+# local imports
+from scan_client import ScanClient
+from json_converters.abbreviations_to_json import save_as_json
+from benchmarks.corpus_generator import CorpusSettings, generate_corpus
+from benchmarks.run_benchmarks import get_git_commit, get_peak_rss_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='The script measures latency of scan requests to the abbreviations '
+                                                 'scan server on a synthetic LaTeX corpus, and compares it with '
+                                                 'starting a new process for every request. The results are saved '
+                                                 'in output JSON file.')
+    parser.add_argument('-i', metavar='--input', type=str, action='store', default=None,
+                        help='path to an existing corpus directory. If not specified, a synthetic corpus is generated')
+    parser.add_argument('-o', metavar='--output', type=str, action='store', default="./output/server_latency.json",
+                        help='path to output JSON file with benchmark results')
+    parser.add_argument('--files', type=int, action='store', default=100, help='number of generated .tex files')
+    parser.add_argument('--file-size', type=int, action='store', default=20000,
+                        help='approximate size of a generated file, in bytes')
+    parser.add_argument('--requests', type=int, action='store', default=200, help='number of measured requests')
+    parser.add_argument('--clients', type=int, action='store', default=4, help='number of concurrent clients')
+    parser.add_argument('--cold-runs', type=int, action='store', default=5,
+                        help='number of measured runs of a new process per request (abbreviations_hook.py)')
+    parser.add_argument('--seed', type=int, action='store', default=0, help='random seed')
+    parser.add_argument('--verbose', help="print details", action="store_true", default=False)
+    args = parser.parse_args()
+
+    settings = CorpusSettings(files=args.files, file_size=args.file_size, seed=args.seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.i is not None:
+            from input_file_worker import get_input_file_paths
+            file_paths = get_input_file_paths(args.i, ["tex"])
+            settings = None
+        else:
+            file_paths = generate_corpus(os.path.join(work_dir, "corpus"), settings, args.verbose)
+        results = run_server_benchmark(file_paths, work_dir, args.requests, args.clients, args.cold_runs)
+    results["corpus"]["settings"] = settings.to_dict() if settings is not None else None
+
+    if args.verbose:
+        print_results(results)
+    save_as_json(args.o, results)
+    if args.verbose:
+        print("Benchmark results saved in", args.o)
+
+
+def run_server_benchmark(file_paths, work_dir, requests=200, clients=4, cold_runs=5):
+    """
+    Measure latency of requests to the scan server
+    :param file_paths: paths to .tex files of the corpus
+    :param work_dir: directory for the server socket
+    :param requests: number of measured requests of every kind
+    :param clients: number of concurrent clients
+    :param cold_runs: number of measured runs of a new process per request
+    :return: benchmark results (dictionary)
+    """
+    if len(file_paths) == 0:
+        raise Exception("The corpus has no .tex files")
+    texts = []
+    for path in file_paths:
+        with open(path) as f:
+            texts.append(f.read())
+
+    stages = []
+    server_process, connection_settings = start_server(work_dir)
+    try:
+        with ScanClient(**connection_settings) as client:
+            # warm-up: every document is scanned once, as when an editor opens a project
+            start = time.perf_counter()
+            for path, text in zip(file_paths, texts):
+                client.scan(path, text)
+            stages.append({"stage": "warm_up", "seconds": time.perf_counter() - start, "requests": len(file_paths)})
+
+            scan_latencies = []
+            query_latencies = []
+            for request_id in range(requests):
+                path = file_paths[request_id % len(file_paths)]
+                text = texts[request_id % len(file_paths)]
+                start = time.perf_counter()
+                client.scan(path, text)
+                scan_latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                client.query(path)
+                query_latencies.append(time.perf_counter() - start)
+            stages.append(latency_result("scan", scan_latencies))
+            stages.append(latency_result("query", query_latencies))
+            stats = client.get_stats()
+
+        stages.append(run_concurrent_clients(file_paths, texts, connection_settings, requests, clients))
+    finally:
+        server_process.terminate()
+        server_process.wait()
+
+    # a new process per request, as without the server
+    cold_latencies = []
+    for run in range(cold_runs):
+        start = time.perf_counter()
+        hook_path = os.path.join(PROJECT_DIR, "abbreviations_hook.py")
+        subprocess.run([sys.executable, hook_path, file_paths[run % len(file_paths)]],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        cold_latencies.append(time.perf_counter() - start)
+    stages.append(latency_result("new_process_per_request", cold_latencies))
+
+    return {"commit": get_git_commit(),
+            "python": sys.version.split()[0],
+            "corpus": {"files": len(file_paths), "bytes": sum(len(text.encode("utf-8")) for text in texts)},
+            "server": stats,
+            "stages": stages,
+            "peak_rss_bytes": get_peak_rss_bytes()}
+
+
+def start_server(work_dir, timeout=10.0):
+    """
+    Start the scan server in a new process and wait, until it accepts connections
+    :param work_dir: directory for the server socket
+    :param timeout: max time to wait for the server, in seconds
+    :return: tuple (server_process, connection_settings), where connection_settings are keyword arguments of ScanClient
+    """
+    command = [sys.executable, os.path.join(PROJECT_DIR, "scan_server.py")]
+    if hasattr(socket, "AF_UNIX"):
+        connection_settings = {"socket_path": os.path.join(work_dir, "abbr.sock")}
+        command += ["--socket", connection_settings["socket_path"]]
+    else:
+        connection_settings = {"port": get_free_port()}
+        command += ["--port", str(connection_settings["port"])]
+    server_process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            with ScanClient(**connection_settings) as client:
+                client.get_stats()
+            return server_process, connection_settings
+        except OSError:
+            if time.perf_counter() > deadline or server_process.poll() is not None:
+                server_process.terminate()
+                raise Exception("Scan server did not start")
+            time.sleep(0.05)
+
+
+def get_free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_concurrent_clients(file_paths, texts, connection_settings, requests, clients):
+    """
+    Send scan requests from several clients at the same time
+    :return: latency measurements of all the requests (dictionary)
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def send_requests(client_id):
+        client_latencies = []
+        with ScanClient(**connection_settings) as client:
+            for request_id in range(client_id, requests, clients):
+                start = time.perf_counter()
+                client.scan(file_paths[request_id % len(file_paths)], texts[request_id % len(file_paths)])
+                client_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(client_latencies)
+
+    threads = [threading.Thread(target=send_requests, args=(client_id,)) for client_id in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    result = latency_result("scan_" + str(clients) + "_clients", latencies)
+    result["requests_per_second"] = len(latencies) / seconds if seconds > 0 else None
+    return result
+
+
+def latency_result(name, latencies):
+    """
+    Represent latencies of a benchmark stage as a dictionary
+    :param name: stage name
+    :param latencies: latencies of the requests, in seconds
+    :return: stage measurements (dictionary) with median, 95th percentile and max latency, in milliseconds
+    """
+    ordered = sorted(latencies)
+    return {"stage": name,
+            "requests": len(ordered),
+            "p50_ms": ordered[len(ordered) // 2] * 1000 if ordered else None,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000 if ordered else None,
+            "max_ms": ordered[-1] * 1000 if ordered else None}
+
+
+def print_results(results):
+    print("Corpus:", results["corpus"]["files"], "files,", results["corpus"]["bytes"], "bytes")
+    for stage in results["stages"]:
+        if "p50_ms" not in stage:
+            print("  - {:<36} {:>9.4f} s".format(stage["stage"], stage["seconds"]))
+            continue
+        print("  - {:<36} p50 {:>8.2f} ms  p95 {:>8.2f} ms  max {:>8.2f} ms".format(
+            stage["stage"], stage["p50_ms"], stage["p95_ms"], stage["max_ms"]))
+
+
+if __name__ == "__main__":
+    main()
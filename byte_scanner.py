@@ -0,0 +1,112 @@
+"""
+Bytes engine of abbreviations search. The engine searches raw bytes of an input file
+for candidates, and only decodes the text around the candidates, so that most of the
+file is never decoded or split into lines. The engine supports encodings, compatible
+with ASCII (e.g., UTF-8, Latin-1, Windows-1252), where round brackets, letters and
+line breaks are single ASCII bytes
+"""
+import os
+import re
+import mmap
+
+# local imports
+from Abbreviation import Abbreviation, FileAbbreviations
+from scan_options import DEFAULT_ENCODINGS
+from abbreviation_rules import DEFAULT_ABBREVIATION_RULES
+from main import is_abbreviation, get_short_notice_letters, search_substring_for_long_notice
+
+BYTES_ROUND_BRACKETS_PATTERN = re.compile(rb"\(([A-Za-z0-9_]+)\)")
+
+
+def find_abbreviations_in_bytes_file(file_path, lookback=1, encodings=DEFAULT_ENCODINGS,
+                                     rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Visit an input file as raw bytes and try to find abbreviations there.
+    The file is memory-mapped, so it is not copied into memory as a whole
+    :param file_path: path to input file
+    :param lookback: number of previous lines, where the long notice of an abbreviation is searched
+    :param encodings: encodings of the file, tried one after another, until the text is decoded
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: tuple (abbreviations, decode_errors): list of abbreviations found in the input file
+        and number of text windows, which could not be decoded with any of the encodings
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return find_abbreviations_in_bytes(data, file_path, lookback, encodings, rules)
+
+
+def find_abbreviations_in_bytes(data, file_path=None, lookback=1, encodings=DEFAULT_ENCODINGS,
+                                rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Visit raw bytes of a text and try to find abbreviations there
+    :param data: raw bytes of a text (bytes or mmap)
+    :param file_path: path to the file, the text belongs to (if available)
+    :param lookback: number of previous lines, where the long notice of an abbreviation is searched
+    :param encodings: encodings of the text, tried one after another, until the text is decoded
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: tuple (abbreviations, decode_errors): list of abbreviations found in the text (every definition
+        with long notice and the first use of every abbreviation, see FileAbbreviations) and number of
+        text windows, which could not be decoded with any of the encodings
+    """
+    abbreviations = FileAbbreviations()
+    decode_errors = 0
+
+    line_id = 0
+    counted_pos = 0
+    for match in BYTES_ROUND_BRACKETS_PATTERN.finditer(data):
+        # the candidate consists of ASCII letters, digits and underscores only
+        substring = match.group(1).decode("ascii")
+        if not is_abbreviation(substring, rules):
+            continue
+
+        short_notice_pos = match.start(1)
+        line_id += data[counted_pos:short_notice_pos].count(b"\n")
+        counted_pos = short_notice_pos
+
+        # as in the line engine, the long notice is searched in the
+        # current line and (lookback) previous lines
+        window_start = find_lines_start(data, match.start(), lookback)
+        window, decoded = decode_window(data[window_start:short_notice_pos], encodings)
+        if not decoded:
+            decode_errors += 1
+        long_notice = search_substring_for_long_notice(window, get_short_notice_letters(substring, rules))
+
+        if long_notice is None and abbreviations.is_found(substring):
+            continue
+        abbreviations.add(Abbreviation(substring, long_notice, file_path, line_id))
+
+    return abbreviations.to_list(), decode_errors
+
+
+def find_lines_start(data, pos, lookback):
+    """
+    Find start of the line with a position, or start of one of the lines before it
+    :param data: raw bytes of a text
+    :param pos: position in the text
+    :param lookback: number of previous lines to include
+    :return: start of the (lookback)-th line before the line with the position
+    """
+    start = data.rfind(b"\n", 0, pos) + 1
+    for _ in range(lookback):
+        if start == 0:
+            break
+        start = data.rfind(b"\n", 0, start - 1) + 1
+    return start
+
+
+def decode_window(window, encodings):
+    """
+    Decode a window of raw bytes
+    :param window: raw bytes
+    :param encodings: encodings, tried one after another, until the window is decoded
+    :return: tuple (text, decoded): decoded text and flag, which is False, if the window
+        could not be decoded with any of the encodings and undecodable bytes were replaced
+    """
+    for encoding in encodings:
+        try:
+            return window.decode(encoding).replace("\r\n", "\n"), True
+        except UnicodeDecodeError:
+            continue
+    return window.decode(encodings[0], errors="replace").replace("\r\n", "\n"), False
@@ -0,0 +1,261 @@
+"""
+SQLite corpus index of abbreviations. Unlike the output JSON file, which only holds the winning
+definition of every abbreviation, the index keeps every definition found in every document, so
+that questions like "all long notices ever used for CNN" or "which documents define DL" can be
+answered without scanning the documents again. The index is updated per document: when a document
+is scanned again, its previous definitions are replaced, and documents, which no longer exist, are removed.
+Example:
+    python main.py -i ./corpus -o ./output/abbr.json --index ./output/abbr.sqlite
+    python corpus_index.py -d ./output/abbr.sqlite long-notices CNN
+    python corpus_index.py -d ./output/abbr.sqlite documents DL
+"""
+import os
+import time
+import sqlite3
+import argparse
+
+# local imports
+from archive_reader import ARCHIVE_MEMBER_SEPARATOR
+
+# number of documents, which are written to the index in a single transaction
+DEFAULT_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    mtime_ns INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS definitions (
+    id INTEGER PRIMARY KEY,
+    short TEXT NOT NULL,
+    long TEXT NOT NULL,
+    UNIQUE (short, long)
+);
+CREATE TABLE IF NOT EXISTS occurrences (
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    definition_id INTEGER NOT NULL REFERENCES definitions (id),
+    line INTEGER
+);
+CREATE INDEX IF NOT EXISTS occurrences_by_document ON occurrences (document_id);
+CREATE INDEX IF NOT EXISTS occurrences_by_definition ON occurrences (definition_id);
+"""
+
+
+class CorpusIndex:
+    """
+    SQLite corpus index of abbreviations
+    Tables:
+        documents: scanned documents (input files or archive members), stored with absolute paths,
+            so that the index can be updated from any working directory
+        definitions: distinct pairs (short notice, long notice). Long notice is empty, if it was not found
+        occurrences: definitions found in the documents: (document, definition, line)
+    Attributes:
+        db_path: path to the SQLite database file
+        batch_size: number of documents, which are written in a single transaction
+        connection: connection to the database or None, if the index is not open
+        definition_ids: dictionary with key = (short, long), value = id of the definition
+        pending_documents: number of documents, written since the last commit
+        added_paths: set of paths of the documents, added since the index was opened
+    """
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.connection = None
+        self.definition_ids = {}
+        self.pending_documents = 0
+        self.added_paths = set()
+
+    def open(self):
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir != "":
+            os.makedirs(db_dir, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self.definition_ids = {(short, long): definition_id for definition_id, short, long
+                               in self.connection.execute("SELECT id, short, long FROM definitions")}
+
+    def close(self, failed=False):
+        """
+        Close the index
+        :param failed: flag. If True, the update failed, and the changes since the last
+            committed batch are rolled back, otherwise the changes are committed
+        """
+        if self.connection is None:
+            return
+        if failed:
+            self.connection.rollback()
+        else:
+            self.connection.commit()
+        self.connection.close()
+        self.connection = None
+        self.pending_documents = 0
+        self.added_paths = set()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(failed=exc_type is not None)
+
+    def add_document(self, path, abbreviations):
+        """
+        Insert a document with abbreviations found in it, or replace the abbreviations
+        of the document, if the document is already in the index. The changes are
+        committed in batches of (batch_size) documents
+        :param path: path to the document (input file or archive member)
+        :param abbreviations: list of abbreviations found in the document
+        """
+        path = get_document_path(path)
+        size, mtime_ns = get_document_fingerprint(path)
+        cursor = self.connection.cursor()
+        cursor.execute("INSERT INTO documents (path, size, mtime_ns, indexed_at) VALUES (?, ?, ?, ?) "
+                       "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                       "indexed_at = excluded.indexed_at",
+                       (path, size, mtime_ns, time.time()))
+        document_id = cursor.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()[0]
+        cursor.execute("DELETE FROM occurrences WHERE document_id = ?", (document_id,))
+        cursor.executemany("INSERT INTO occurrences (document_id, definition_id, line) VALUES (?, ?, ?)",
+                           [(document_id, self.get_definition_id(cursor, abbreviation), abbreviation.line)
+                            for abbreviation in abbreviations])
+
+        self.added_paths.add(path)
+        self.pending_documents += 1
+        if self.pending_documents >= self.batch_size:
+            self.connection.commit()
+            self.pending_documents = 0
+
+    def get_definition_id(self, cursor, abbreviation):
+        key = (abbreviation.short, "" if abbreviation.long is None else abbreviation.long)
+        definition_id = self.definition_ids.get(key)
+        if definition_id is None:
+            cursor.execute("INSERT INTO definitions (short, long) VALUES (?, ?)", key)
+            definition_id = cursor.lastrowid
+            self.definition_ids[key] = definition_id
+        return definition_id
+
+    def remove_document(self, path):
+        self.connection.execute("DELETE FROM documents WHERE path = ?", (get_document_path(path),))
+
+    def remove_missing_documents(self):
+        """
+        Remove documents, which no longer exist: deleted files, members of deleted archives and
+        members, which are no longer in an archive, if the archive was indexed again since the index was opened.
+        Documents with relative paths, stored by earlier versions of the index, are also removed,
+        because they cannot be located: the documents are indexed again with absolute paths
+        :return: number of removed documents
+        """
+        updated_archives = set(path.split(ARCHIVE_MEMBER_SEPARATOR)[0] for path in self.added_paths
+                               if ARCHIVE_MEMBER_SEPARATOR in path and not os.path.isfile(path))
+        missing_paths = []
+        for (path,) in self.connection.execute("SELECT path FROM documents").fetchall():
+            if path in self.added_paths:
+                continue
+            if os.path.isabs(path):
+                if os.path.isfile(path):
+                    continue
+                archive_path = path.split(ARCHIVE_MEMBER_SEPARATOR)[0]
+                if archive_path != path and os.path.isfile(archive_path) and archive_path not in updated_archives:
+                    continue
+            missing_paths.append((path,))
+        self.connection.executemany("DELETE FROM documents WHERE path = ?", missing_paths)
+        return len(missing_paths)
+
+    def get_long_notices(self, short):
+        """
+        Get all long notices, used for an abbreviation
+        :param short: short notice of the abbreviation
+        :return: list of tuples (long notice, number of occurrences, number of documents),
+            most frequent long notices first
+        """
+        return self.connection.execute(
+            "SELECT d.long, COUNT(*), COUNT(DISTINCT o.document_id) FROM definitions d "
+            "JOIN occurrences o ON o.definition_id = d.id WHERE d.short = ? AND d.long != '' "
+            "GROUP BY d.id ORDER BY COUNT(*) DESC, d.long", (short,)).fetchall()
+
+    def get_documents(self, short):
+        """
+        Get documents, which define an abbreviation
+        :param short: short notice of the abbreviation
+        :return: list of tuples (document path, line, long notice or None), ordered by document path
+        """
+        rows = self.connection.execute(
+            "SELECT doc.path, o.line, d.long FROM definitions d "
+            "JOIN occurrences o ON o.definition_id = d.id JOIN documents doc ON doc.id = o.document_id "
+            "WHERE d.short = ? ORDER BY doc.path, o.line", (short,)).fetchall()
+        return [(path, line, long if long != "" else None) for path, line, long in rows]
+
+    def get_summary(self):
+        """
+        Get number of documents, distinct abbreviations, distinct definitions and occurrences in the index
+        :return: dictionary with key = name of the number, value = the number
+        """
+        execute = self.connection.execute
+        return {"documents": execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+                "abbreviations": execute("SELECT COUNT(DISTINCT short) FROM definitions").fetchone()[0],
+                "definitions": execute("SELECT COUNT(*) FROM definitions").fetchone()[0],
+                "occurrences": execute("SELECT COUNT(*) FROM occurrences").fetchone()[0]}
+
+
+def get_document_path(path):
+    """
+    Get absolute path of a document. For an archive member (archive!member), the path to the archive
+    is made absolute, and the path to the member inside the archive is kept
+    :param path: path to the document (input file or archive member)
+    :return: absolute path to the document
+    """
+    archive_path, separator, member_path = path.partition(ARCHIVE_MEMBER_SEPARATOR)
+    if separator == "" or os.path.isfile(path):
+        return os.path.abspath(path)
+    return os.path.abspath(archive_path) + separator + member_path
+
+
+def get_document_fingerprint(path):
+    """
+    Get fingerprint of a document
+    :param path: path to the document
+    :return: tuple (size, modification time) of the document file or (None, None),
+        if the document is not a file (e.g., it is an archive member)
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description='The script queries the SQLite corpus index of abbreviations, '
+                                                 'created with the --index option of main.py.')
+    parser.add_argument('-d', metavar='--database', type=str, action='store', required=True,
+                        help='path to the SQLite corpus index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    long_notices_parser = subparsers.add_parser('long-notices', help='all long notices, used for an abbreviation')
+    long_notices_parser.add_argument('short', type=str, help='short notice of the abbreviation, e.g., CNN')
+    documents_parser = subparsers.add_parser('documents', help='documents, which define an abbreviation')
+    documents_parser.add_argument('short', type=str, help='short notice of the abbreviation, e.g., DL')
+    subparsers.add_parser('summary', help='number of documents, abbreviations and definitions in the index')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.d):
+        print("Corpus index not found:", args.d)
+        return
+
+    with CorpusIndex(args.d) as corpus_index:
+        if args.command == "long-notices":
+            for long, occurrences, documents in corpus_index.get_long_notices(args.short):
+                print("{:<60} {:>8} occurrences {:>8} documents".format(long.strip(), occurrences, documents))
+        elif args.command == "documents":
+            for path, line, long in corpus_index.get_documents(args.short):
+                print(path + ":" + str(line), "" if long is None else long.strip())
+        else:
+            for name, value in corpus_index.get_summary().items():
+                print("{:<14} {:>10}".format(name, value))
+
+
+if __name__ == "__main__":
+    main()
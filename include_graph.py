@@ -0,0 +1,248 @@
+import os
+import re
+import json
+
+# local imports
+from json_converters.abbreviations_to_json import save_as_json
+from scan_options import DEFAULT_ENCODINGS
+from archive_reader import decode_member
+
+# \input{file}, \include{file} or \subfile{file}
+INCLUDE_PATTERN = re.compile(r"\\(input|include|subfile)\s*\{([^}]+)\}")
+# LaTeX comment: % that is not escaped with \
+COMMENT_PATTERN = re.compile(r"(?<!\\)%.*")
+
+INCLUDE_GRAPH_FORMAT_VERSION = 3
+
+
+class IncludeGraph:
+    """
+    Graph of LaTeX files, connected by \\input, \\include and \\subfile commands.
+    The include commands of every visited file are cached on disk, so that the files,
+    which did not change since the previous run, are not parsed again. The included
+    files are resolved on every run, because they depend on the root document and
+    on the files that exist
+    Attributes:
+        cache_path: path to the .json file, where the includes of the visited files are cached.
+            If None, the includes are not cached
+        encodings: encodings of the files, tried one after another, until a file is decoded
+        entries: dictionary with key = absolute file path, value = cached include commands of the file
+        parsed_files: number of files, parsed during the current run
+    """
+    def __init__(self, cache_path=None, encodings=DEFAULT_ENCODINGS):
+        self.cache_path = cache_path
+        self.encodings = encodings
+        self.entries = {}
+        self.parsed_files = 0
+
+    def load(self):
+        """
+        Load cached includes from the disk
+        """
+        if self.cache_path is None or not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cache_json = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache_json.get("version") == INCLUDE_GRAPH_FORMAT_VERSION:
+            self.entries = cache_json.get("files", {})
+
+    def save(self):
+        """
+        Save cached includes to the disk
+        """
+        if self.cache_path is None:
+            return
+        cache_json = {"version": INCLUDE_GRAPH_FORMAT_VERSION, "files": self.entries}
+        save_as_json(self.cache_path, cache_json, pretty_printing=False)
+
+    def get_reachable_files(self, root_path, verbose=False):
+        """
+        Get files, reachable from the root document: every file is followed by the files it includes,
+        in the order of the include commands. Every file is returned once, even if it is included several times
+        :param root_path: path to the root document, e.g., thesis/main.tex
+        :param verbose: flag. If True, print details
+        :return: list of paths to reachable files
+        """
+        return self.get_reading_order(root_path, verbose).get_files()
+
+    def get_reading_order(self, root_path, verbose=False):
+        """
+        Get reading order of the document: parts (segments) of the reachable files, in the order, in which
+        they are read. E.g., if main.tex includes chapter1.tex in line 4, main.tex is read until line 4,
+        then chapter1.tex, and then the rest of main.tex. Every file is only expanded at its first include
+        :param root_path: path to the root document, e.g., thesis/main.tex
+        :param verbose: flag. If True, print details
+        :return: reading order of the document (ReadingOrder)
+        """
+        segments = []
+        self.visit(root_path, root_path, set(), segments, verbose)
+        reading_order = ReadingOrder(segments)
+        if verbose:
+            print("Input registered: document", root_path, "with", len(reading_order.get_files()), "reachable files,",
+                  self.parsed_files, "parsed")
+        return reading_order
+
+    def visit(self, file_path, root_path, visited, segments, verbose=False):
+        """
+        Add segments of a file and of the files it includes to the reading order
+        :param file_path: path to the file
+        :param root_path: path to the root document
+        :param visited: set of absolute paths to visited files
+        :param segments: list of segments (file_path, start_line, end_line), where the segments are added
+        :param verbose: flag. If True, print details
+        """
+        key = os.path.abspath(file_path)
+        if key in visited:
+            return
+        visited.add(key)
+        if not os.path.isfile(file_path):
+            if verbose:
+                print("Included file", file_path, "not found")
+            return
+        start_line = 0
+        for included_path, line in self.get_includes(file_path, root_path):
+            # the line with the include command is read before the included file
+            segments.append((file_path, start_line, line + 1))
+            self.visit(included_path, root_path, visited, segments, verbose)
+            start_line = line + 1
+        segments.append((file_path, start_line, None))
+
+    def get_includes(self, file_path, root_path):
+        """
+        Get files, included by a file
+        :param file_path: path to the file
+        :param root_path: path to the root document
+        :return: list of tuples (included_path, line), where included_path is the path to the included file
+            and line is the line of the include command, in the order of the include commands
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+        if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            include_commands = entry["commands"]
+        else:
+            try:
+                include_commands = parse_include_commands(file_path, self.encodings)
+            except UnicodeDecodeError as e:
+                print("Includes of", file_path, "cannot be decoded with any of the encodings", self.encodings, "-", e)
+                return []
+            self.parsed_files += 1
+            self.entries[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "commands": include_commands}
+        return [(resolve_include(included_name, command, file_path, root_path), line)
+                for command, included_name, line in include_commands]
+
+
+class ReadingOrder:
+    """
+    Reading order of a LaTeX document, split into files
+    Attributes:
+        segments: list of segments (file_path, start_line, end_line) in the reading order. A segment covers lines
+            from start_line (inclusive) to end_line (exclusive) of the file. If end_line is None,
+            the segment covers the rest of the file
+        file_segments: dictionary with key = file path, value = list of (start_line, end_line, segment index)
+    """
+    def __init__(self, segments):
+        self.segments = segments
+        self.file_segments = {}
+        for index, (file_path, start_line, end_line) in enumerate(segments):
+            self.file_segments.setdefault(file_path, []).append((start_line, end_line, index))
+
+    def get_files(self):
+        """
+        Get files of the document
+        :return: list of paths to the files, in the order of their first segments
+        """
+        return list(self.file_segments.keys())
+
+    def get_position(self, file_path, line):
+        """
+        Get position of a line in the reading order
+        :param file_path: path to the file
+        :param line: line in the file
+        :return: position (segment index, line), which can be compared with other positions,
+            or None if the file is not a part of the document
+        """
+        for start_line, end_line, index in self.file_segments.get(file_path, []):
+            if line >= start_line and (end_line is None or line < end_line):
+                return index, line
+        return None
+
+    def iterate_abbreviations(self, get_file_abbreviations):
+        """
+        Iterate over abbreviations, found in the files of the document, in the reading order
+        :param get_file_abbreviations: function, which returns abbreviations found in a file,
+            e.g., ResultStore.get_file_abbreviations
+        :return: generator of abbreviations. Abbreviations of a segment are returned
+            in the order, in which they are listed for the file
+        """
+        for file_path, start_line, end_line in self.segments:
+            for abbreviation in get_file_abbreviations(file_path):
+                line = abbreviation.line if abbreviation.line is not None else 0
+                if line >= start_line and (end_line is None or line < end_line):
+                    yield abbreviation
+
+
+def parse_includes(file_path, root_path, encodings=DEFAULT_ENCODINGS):
+    """
+    Parse \\input, \\include and \\subfile commands in a file. Commented commands are ignored
+    :param file_path: path to the file
+    :param root_path: path to the root document
+    :param encodings: encodings of the file, tried one after another, until the file is decoded
+    :return: list of tuples (included_path, line): paths to the included files and lines of
+        the include commands, in the order of the include commands
+    """
+    return [(resolve_include(included_name, command, file_path, root_path), line)
+            for command, included_name, line in parse_include_commands(file_path, encodings)]
+
+
+def parse_include_commands(file_path, encodings=DEFAULT_ENCODINGS):
+    """
+    Parse \\input, \\include and \\subfile commands in a file, without resolving the included files.
+    Commented commands are ignored
+    :param file_path: path to the file
+    :param encodings: encodings of the file, tried one after another, until the file is decoded
+    :return: list of lists [command, included_name, line]: include commands (input, include or subfile),
+        names of the included files, as specified in the commands, and lines of the commands
+    """
+    include_commands = []
+    with open(file_path, "rb") as fp:
+        text = decode_member(fp.read(), encodings)
+    for line_id, line in enumerate(text.split("\n")):
+        if "\\" not in line:
+            continue
+        line = COMMENT_PATTERN.sub("", line)
+        for command, included_name in INCLUDE_PATTERN.findall(line):
+            include_commands.append([command, included_name.strip(), line_id])
+    return include_commands
+
+
+def resolve_include(included_name, command, file_path, root_path):
+    """
+    Resolve path to an included file. As in LaTeX, files, included with \\input
+    and \\include, are resolved relative to the root document, and files, included
+    with \\subfile, are resolved relative to the including file
+    :param included_name: name of the included file, as specified in the include command
+    :param command: include command: input, include or subfile
+    :param file_path: path to the including file
+    :param root_path: path to the root document
+    :return: path to the included file
+    """
+    base_path = file_path if command == "subfile" else root_path
+    included_path = os.path.normpath(os.path.join(os.path.dirname(base_path), included_name))
+    # the .tex extension can be omitted
+    if not os.path.isfile(included_path) and not included_path.endswith(".tex"):
+        included_path += ".tex"
+    return included_path
+
+
+def get_default_include_graph_path(output_path):
+    """
+    Get default path to the include graph cache: the cache is stored next to the output file
+    :param output_path: path to output JSON file with abbreviations
+    :return: path to the include graph cache file
+    """
+    output_dir, output_file = os.path.split(output_path)
+    return os.path.join(output_dir, "." + output_file + ".includes")
@@ -1,16 +1,25 @@
 import os
-import glob
+import fnmatch
 
+# names of directories (and files) that are not visited, when input files directory is traversed
+DEFAULT_EXCLUDE_PATTERNS = [".*", "node_modules", "__pycache__", "_minted-*", "build"]
 
-def get_input_file_paths(input_path, file_extensions=None, verbose=False):
+
+def get_input_file_paths(input_path, file_extensions=None, verbose=False, exclude_patterns=None,
+                         archive_extensions=None):
     """
     Get path to all input files to traverse
     :param input_path: path to input .tex file or directory with .tex files
     :param file_extensions: input file extensions. If None,
         files of all extensions will be considered.
     :param verbose: flag. If True, print details
+    :param exclude_patterns: glob patterns of names of directories (and files), which are not visited.
+        If None, the default patterns are used
+    :param archive_extensions: extensions of archives with input files (e.g., zip), which are
+        traversed together with the input files. If None, archives are not traversed
     :return: list of files to traverse
     """
+    file_extensions = add_archive_extensions(file_extensions, archive_extensions)
     # input is a file
     if is_file(input_path):
         if has_matching_extension(input_path, file_extensions):
@@ -23,7 +32,7 @@ def get_input_file_paths(input_path, file_extensions=None, verbose=False):
 
     # input is a directory
     if is_directory(input_path):
-        input_file_paths = find_path_to_dir_files_recursively(input_path, file_extensions)
+        input_file_paths = list(iterate_dir_files_recursively(input_path, file_extensions, exclude_patterns))
         if verbose:
             print("Input registered: input is a directory with", len(input_file_paths),
                   "files with", file_extensions, "extensions")
@@ -33,6 +42,39 @@ def get_input_file_paths(input_path, file_extensions=None, verbose=False):
     raise Exception("Wrong input: existing file or files directory is expected.")
 
 
+def iterate_input_file_paths(input_path, file_extensions=None, verbose=False, exclude_patterns=None,
+                             archive_extensions=None):
+    """
+    Iterate over paths to all input files to traverse. Unlike get_input_file_paths(), the paths
+    are returned while the input files directory is traversed, so that the input files can be
+    scanned before the traversal is over
+    :param input_path: path to input .tex file or directory with .tex files
+    :param file_extensions: input file extensions. If None,
+        files of all extensions will be considered.
+    :param verbose: flag. If True, print details
+    :param exclude_patterns: glob patterns of names of directories (and files), which are not visited.
+        If None, the default patterns are used
+    :param archive_extensions: extensions of archives with input files (e.g., zip), which are
+        traversed together with the input files. If None, archives are not traversed
+    :return: generator of paths to files to traverse
+    """
+    if is_directory(input_path):
+        if verbose:
+            print("Input registered: input is a directory. Files with", file_extensions, "extensions are searched")
+        yield from iterate_dir_files_recursively(input_path, add_archive_extensions(file_extensions,
+                                                                                    archive_extensions),
+                                                 exclude_patterns)
+        return
+    yield from get_input_file_paths(input_path, file_extensions, verbose, exclude_patterns, archive_extensions)
+
+
+def add_archive_extensions(file_extensions, archive_extensions):
+    if file_extensions is None or archive_extensions is None:
+        return file_extensions
+    return list(file_extensions) + [extension for extension in archive_extensions
+                                    if extension not in file_extensions]
+
+
 def is_directory(path):
     return os.path.isdir(path)
 
@@ -42,6 +84,7 @@ def is_file(path):
 
 
 def find_path_to_dir_files_recursively(input_dir, file_extensions=None):
+    import glob
     file_paths = []
     # add file paths without filtering
     if file_extensions is None:
@@ -56,9 +99,83 @@ def find_path_to_dir_files_recursively(input_dir, file_extensions=None):
     return file_paths
 
 
+def iterate_dir_files_recursively(input_dir, file_extensions=None, exclude_patterns=None):
+    """
+    Traverse directory and its subdirectories and iterate over paths to files in the directory.
+    Directories, which names match the exclude patterns, are not visited. Every directory is
+    visited only once, so that symbolic links cannot make the traversal loop
+    :param input_dir: path to the directory
+    :param file_extensions: file extensions. If None, files of all extensions will be considered.
+    :param exclude_patterns: glob patterns of names of directories (and files), which are not visited.
+        If None, the default patterns are used
+    :return: generator of paths to files in the directory. Files in a directory are returned
+        in alphabetical order, before the files in the subdirectories of the directory
+    """
+    if exclude_patterns is None:
+        exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    extensions_set = None if file_extensions is None else frozenset(file_extensions)
+    visited_dirs = set()
+    dirs_to_visit = [input_dir]
+
+    while dirs_to_visit:
+        dir_path = dirs_to_visit.pop()
+        try:
+            dir_stat = os.stat(dir_path)
+        except OSError:
+            continue
+        dir_id = (dir_stat.st_dev, dir_stat.st_ino)
+        if dir_id in visited_dirs:
+            continue
+        visited_dirs.add(dir_id)
+
+        try:
+            with os.scandir(dir_path) as entries:
+                entries = sorted(entries, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if is_excluded(entry.name, exclude_patterns):
+                continue
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif extensions_set is None or has_matching_extension_in_set(entry.name, extensions_set):
+                    yield entry.path
+            except OSError:
+                continue
+
+        # subdirectories are visited in alphabetical order
+        subdirs.reverse()
+        dirs_to_visit.extend(subdirs)
+
+
+def is_excluded(name, exclude_patterns):
+    for pattern in exclude_patterns:
+        if fnmatch.fnmatchcase(name, pattern):
+            return True
+    return False
+
+
 def has_matching_extension(file_path, extensions):
     for extension in extensions:
         if file_path.endswith("." + extension):
             return True
     return False
 
+
+def has_matching_extension_in_set(file_name, extensions_set):
+    """
+    Check if file has one of the extensions. Extensions, consisting of
+    several parts (e.g., tar.gz) are supported
+    :param file_name: name of the file
+    :param extensions_set: set of file extensions without leading dot
+    :return: True, if the file has one of the extensions and False otherwise
+    """
+    dot_pos = file_name.find(".")
+    while dot_pos != -1:
+        if file_name[dot_pos + 1:] in extensions_set:
+            return True
+        dot_pos = file_name.find(".", dot_pos + 1)
+    return False
@@ -2,32 +2,185 @@ import json
 import os
 import Abbreviation
 
+# formats of output file with abbreviations: pretty-printed JSON, JSON without white spaces
+# or newline-delimited JSON (one abbreviation per line)
+OUTPUT_FORMATS = ["json-pretty", "json-compact", "ndjson"]
+DEFAULT_OUTPUT_FORMAT = "json-pretty"
+# separators of compact JSON (json-compact and ndjson formats): without white spaces
+COMPACT_SEPARATORS = (",", ":")
 
-def abbreviations_to_json(abbreviations: [Abbreviation], filepath: str, verbose):
+
+def abbreviations_to_json(abbreviations: [Abbreviation], filepath: str, verbose, extra_fields=None,
+                          output_format=DEFAULT_OUTPUT_FORMAT):
     """
-    Convert a target edge platform (architecture) into a JSON File
+    Convert a target edge platform (architecture) into a JSON File.
+    The abbreviations are written one by one into a temporary file, which then replaces
+    the output file, so that the output file is never left half-written
     :param abbreviations: list of abbreviations
     :param filepath: path to target .json file
     :param verbose: print details
+    :param extra_fields: additional fields of abbreviations (e.g., number of uses):
+        dictionary with key = short notice, value = dictionary of additional fields
+    :param output_format: format of the output file (one of OUTPUT_FORMATS)
     """
-    json_abbreviations = []
-    for abbreviation in abbreviations:
-        abbreviation_as_dict = {"short": abbreviation.short}
-        if abbreviation.long is not None:
-            abbreviation_as_dict["long"] = abbreviation.long
-        if abbreviation.file is not None:
-            abbreviation_as_dict["file"] = abbreviation.file
-        if abbreviation.line is not None:
-            abbreviation_as_dict["line"] = abbreviation.line
-        json_abbreviations.append(abbreviation_as_dict)
-
-    abbreviations_as_dict = {"abbreviations": json_abbreviations}
-    save_as_json(filepath, abbreviations_as_dict)
+    if output_format not in OUTPUT_FORMATS:
+        raise Exception("Unknown output format: " + str(output_format) + ". Expected one of " + str(OUTPUT_FORMATS))
+
+    with AtomicFileWriter(filepath) as f:
+        if output_format == "ndjson":
+            for abbreviation in abbreviations:
+                record = get_abbreviation_record(abbreviation, extra_fields)
+                f.write(json.dumps(record, separators=COMPACT_SEPARATORS) + "\n")
+        else:
+            write_abbreviations_document(f, abbreviations, extra_fields, output_format == "json-pretty")
 
     if verbose:
         print("Abbreviations saved in", filepath)
 
 
+def write_abbreviations_document(f, abbreviations, extra_fields=None, pretty_printing=True):
+    """
+    Write abbreviations as a JSON document {"abbreviations": [...]}, one abbreviation at a time,
+    so that the list of all the abbreviations as dictionaries is never built.
+    The written document is the same, as json.dump() of the document with indent=4
+    (pretty printing) or with COMPACT_SEPARATORS would write
+    :param f: open text file
+    :param abbreviations: iterable over abbreviations
+    :param extra_fields: additional fields of abbreviations
+    :param pretty_printing: flag. If True, the document is indented with 4 spaces, as by save_as_json(),
+        otherwise the document is written without white spaces
+    """
+    separator = ",\n        " if pretty_printing else ","
+    written = False
+    for abbreviation in abbreviations:
+        record = get_abbreviation_record(abbreviation, extra_fields)
+        if pretty_printing:
+            record_json = json.dumps(record, indent=4).replace("\n", "\n        ")
+        else:
+            record_json = json.dumps(record, separators=COMPACT_SEPARATORS)
+        if written:
+            f.write(separator)
+        else:
+            f.write("{\n    \"abbreviations\": [\n        " if pretty_printing else "{\"abbreviations\":[")
+            written = True
+        f.write(record_json)
+    if not written:
+        f.write("{\n    \"abbreviations\": []\n}" if pretty_printing else "{\"abbreviations\":[]}")
+    else:
+        f.write("\n    ]\n}" if pretty_printing else "]}")
+
+
+def get_abbreviation_record(abbreviation, extra_fields=None):
+    abbreviation_as_dict = abbreviation_to_dict(abbreviation)
+    if extra_fields is not None and abbreviation.short in extra_fields:
+        abbreviation_as_dict.update(extra_fields[abbreviation.short])
+    return abbreviation_as_dict
+
+
+class AtomicFileWriter:
+    """
+    Text file, which is written under a temporary name (the path with ".part" suffix) and
+    replaces the target file only when the file is closed without errors.
+    The temporary file can be followed (e.g., with tail -f), while it is written
+    Attributes:
+        path: path to target file
+        tmp_path: path to temporary file
+        file: open temporary file
+    """
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.file = None
+
+    def __enter__(self):
+        # create parent directory for file, if it doesn't exist
+        parent_dir = os.path.dirname(self.path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        self.file = open(self.tmp_path, 'w')
+        return self
+
+    def write(self, text):
+        self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+            return False
+        os.replace(self.tmp_path, self.path)
+        return False
+
+
+class NdjsonAbbreviationsWriter:
+    """
+    Writer of abbreviations into NDJSON output file, while the input files are scanned.
+    An abbreviation is written, when it is first found and every time its definition changes,
+    so a later line with the same short notice supersedes the earlier lines.
+    The lines are flushed after every scanned file into the temporary file (the output path
+    with ".part" suffix), which replaces the output file when the search is finished
+    Attributes:
+        file: output file (AtomicFileWriter)
+        written_abbreviations: dictionary with key = short notice, value = the last written abbreviation
+    """
+    def __init__(self, filepath):
+        self.file = AtomicFileWriter(filepath)
+        self.written_abbreviations = {}
+
+    def open(self):
+        self.file.__enter__()
+
+    def write_changes(self, abbreviations):
+        """
+        Write abbreviations, which definitions changed since they were written last time
+        :param abbreviations: abbreviations (e.g., the merged abbreviations of a registry) to check
+        """
+        for abbreviation in abbreviations:
+            if self.written_abbreviations.get(abbreviation.short) is not abbreviation:
+                self.written_abbreviations[abbreviation.short] = abbreviation
+                self.file.write(json.dumps(abbreviation_to_dict(abbreviation), separators=COMPACT_SEPARATORS) + "\n")
+        self.file.flush()
+
+    def write_extra_fields(self, extra_fields):
+        """
+        Write abbreviations once more with their additional fields, found after the search (e.g., number of uses)
+        :param extra_fields: dictionary with key = short notice, value = dictionary of additional fields
+        """
+        for short, abbreviation in self.written_abbreviations.items():
+            if short in extra_fields:
+                record = get_abbreviation_record(abbreviation, extra_fields)
+                self.file.write(json.dumps(record, separators=COMPACT_SEPARATORS) + "\n")
+
+    def close(self, failed=False):
+        """
+        Finish the output file
+        :param failed: flag. If True, the search failed, and the output file is not replaced
+        """
+        if failed:
+            self.file.__exit__(Exception, None, None)
+        else:
+            self.file.__exit__(None, None, None)
+
+
+def abbreviation_to_dict(abbreviation: Abbreviation):
+    """
+    Represent abbreviation as a dictionary
+    :param abbreviation: abbreviation
+    :return: dictionary with the abbreviation attributes, which are specified
+    """
+    abbreviation_as_dict = {"short": abbreviation.short}
+    if abbreviation.long is not None:
+        abbreviation_as_dict["long"] = abbreviation.long
+    if abbreviation.file is not None:
+        abbreviation_as_dict["file"] = abbreviation.file
+    if abbreviation.line is not None:
+        abbreviation_as_dict["line"] = abbreviation.line
+    return abbreviation_as_dict
+
+
 def save_as_json(abs_path, data_json, pretty_printing=True):
     """
     Write json file
@@ -36,7 +189,9 @@ def save_as_json(abs_path, data_json, pretty_printing=True):
     :param data_json json string to be written into the file
     """
     # create parent directory for file, if it doesn't exist
-    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    parent_dir = os.path.dirname(abs_path)
+    if parent_dir:
+        os.makedirs(parent_dir, exist_ok=True)
 
     with open(abs_path, 'w') as f:
         if pretty_printing:
@@ -0,0 +1,123 @@
+"""
+LaTeX-aware prefilter of abbreviations search. The prefilter visits lines of a
+LaTeX document once, tracks comment, verbatim and math state across the lines and
+keeps only prose, so that code listings, commented-out text and formulas like
+f(XY) are not searched for abbreviations. Line structure of the document is kept,
+so that line numbers of the found abbreviations do not change
+"""
+import re
+
+# environments, which content is not prose
+VERBATIM_ENVIRONMENTS = frozenset(["verbatim", "verbatim*", "Verbatim", "lstlisting", "minted", "comment"])
+MATH_ENVIRONMENTS = frozenset(["equation", "equation*", "align", "align*", "alignat", "alignat*", "gather",
+                               "gather*", "multline", "multline*", "eqnarray", "eqnarray*", "math", "displaymath",
+                               "flalign", "flalign*"])
+
+# characters, which may change the tokenizer state
+SPECIAL_CHARS = ("\\", "$", "%")
+
+# tokens, which may change the tokenizer state
+TOKEN_PATTERN = re.compile(r"\\begin\{([^}]+)\}|\\end\{([^}]+)\}|\\verb\*?(.)|\\\\|\\[$%]|\\\(|\\\)|\\\[|\\\]|\$\$|\$|%")
+
+# tokenizer states
+PROSE = 0
+INLINE_MATH = 1
+DISPLAY_MATH = 2
+VERBATIM = 3
+
+
+def iterate_prose_lines(lines):
+    """
+    Iterate over lines of a LaTeX document, keeping only prose in every line.
+    Comments, verbatim environments (and \\verb), inline math and display math are removed.
+    Every line keeps its trailing line break, so that line numbers do not change
+    :param lines: iterable over lines of a LaTeX document, e.g., an open .tex file
+    :return: generator of lines, where only prose is kept
+    """
+    state = PROSE
+    # environment or delimiter, which ends the current non-prose state
+    end_marker = None
+
+    for line in lines:
+        # fast path: the line has no tokens, which may change the state
+        if state == PROSE and not any(char in line for char in SPECIAL_CHARS):
+            yield line
+            continue
+
+        line_break = "\n" if line.endswith("\n") else ""
+        prose_parts = []
+        prose_start = 0 if state == PROSE else None
+        pos = 0
+        line_length = len(line)
+        while pos < line_length:
+            match = TOKEN_PATTERN.search(line, pos)
+            if match is None:
+                break
+            token = match.group()
+            pos = match.end()
+
+            if state == PROSE:
+                if token == "%":
+                    prose_parts.append(line[prose_start:match.start()])
+                    prose_start = None
+                    break
+                if token.startswith("\\verb"):
+                    # \verb|code| ends at the next occurrence of the delimiter
+                    verb_end = line.find(match.group(3), pos)
+                    prose_parts.append(line[prose_start:match.start()])
+                    pos = line_length if verb_end == -1 else verb_end + 1
+                    prose_start = pos
+                    continue
+                new_state, new_end_marker = get_non_prose_state(match)
+                if new_state != PROSE:
+                    prose_parts.append(line[prose_start:match.start()])
+                    prose_start = None
+                    state = new_state
+                    end_marker = new_end_marker
+                continue
+
+            # the line (part) is not prose: look for the end of the non-prose state
+            if state == VERBATIM:
+                if match.group(2) == end_marker:
+                    state = PROSE
+                    prose_start = pos
+                continue
+            if token == "%":
+                # comment inside math
+                break
+            if token == end_marker or (match.group(2) is not None and match.group(2) == end_marker):
+                state = PROSE
+                end_marker = None
+                prose_start = pos
+
+        if prose_start is not None:
+            prose_parts.append(line[prose_start:].rstrip("\n"))
+        yield "".join(prose_parts) + line_break
+
+
+def get_non_prose_state(match):
+    """
+    Get state, which is started by a token
+    :param match: token match
+    :return: tuple (state, end_marker), where end_marker is the token
+        (or environment name), which ends the state
+    """
+    environment = match.group(1)
+    if environment is not None:
+        if environment in VERBATIM_ENVIRONMENTS:
+            return VERBATIM, environment
+        if environment in MATH_ENVIRONMENTS:
+            return DISPLAY_MATH, environment
+        return PROSE, None
+
+    token = match.group()
+    if token == "$":
+        return INLINE_MATH, "$"
+    if token == "$$":
+        return DISPLAY_MATH, "$$"
+    if token == "\\(":
+        return INLINE_MATH, "\\)"
+    if token == "\\[":
+        return DISPLAY_MATH, "\\]"
+    # escaped characters, e.g., \$ or \%, and line breaks (\\) are prose
+    return PROSE, None
@@ -1,14 +1,23 @@
 import os
 import sys
-import argparse
-import traceback
 import re
-import copy
+from io import StringIO
+from collections import deque
+from itertools import repeat
 
 # local imports
-from Abbreviation import Abbreviation, find_abbreviation_by_short_notice
-from json_converters.abbreviations_to_json import abbreviations_to_json
-from input_file_worker import get_input_file_paths
+from Abbreviation import Abbreviation, AbbreviationRegistry, abbreviation_to_record, record_to_abbreviation, \
+    FileAbbreviations, MERGE_POLICIES
+from scan_options import ScanOptions, ENGINES, DEFAULT_WINDOW, DEFAULT_ENCODINGS
+from abbreviation_rules import DEFAULT_ABBREVIATION_RULES, get_rules
+from json_converters.abbreviations_to_json import abbreviations_to_json, NdjsonAbbreviationsWriter, OUTPUT_FORMATS, \
+    DEFAULT_OUTPUT_FORMAT
+from input_file_worker import iterate_input_file_paths, DEFAULT_EXCLUDE_PATTERNS
+from archive_reader import is_archive, iterate_archive_members, decode_member, ARCHIVE_EXTENSIONS
+from result_store import ResultStore
+
+# substring, enclosed in round brackets, that may be an abbreviation
+ROUND_BRACKETS_PATTERN = re.compile(r"\(([A-Za-z0-9_]+)\)")
 
 
 def main():
@@ -17,21 +26,105 @@ def main():
     this_dir = os.path.dirname(__file__)
     sys.path.append(this_dir)
 
+    # modules, which are only used by the command line interface, are imported here,
+    # so that importing the abbreviations search functions (e.g., in abbreviations_hook.py) stays cheap
+    import argparse
+    import traceback
+    from scan_cache import ScanCache, get_default_cache_path, DEFAULT_MAX_ENTRIES
+    from abbreviation_rules import load_rules_config
+
     # general arguments
     parser = argparse.ArgumentParser(description='The script finds abbreviations in a .tex file '
                                                  'or a folder with .tex files. The found abbreviations '
                                                  'are saved in output JSON file.')
 
     parser.add_argument('-i', metavar='--input', type=str, action='store', required=True,
-                        help='path to input file or input files directory')
+                        help='path to input file, input files directory or archive (.zip, .tar, .tar.gz) '
+                             'with input files. Archives in the input files directory are also searched')
 
     parser.add_argument('-o', metavar='--output', type=str, action='store', default="./output/abbr.json",
                         help='path to output JSON file with abbreviations')
 
+    parser.add_argument('--format', type=str, action='store', default=DEFAULT_OUTPUT_FORMAT, choices=OUTPUT_FORMATS,
+                        help='format of output file: json-pretty (indented JSON), json-compact (JSON without '
+                             'white spaces) or ndjson (one abbreviation per line, written as soon as every input '
+                             'file is scanned; a later line with the same short notice supersedes earlier lines)')
+
     parser.add_argument('-e', metavar='--extension', type=str, action='store', default='tex',
                         help='file extension. Only files of this extension will be searched')
 
+    parser.add_argument('--exclude', type=str, action='append', default=[],
+                        help='glob pattern of names of directories, which are not visited, e.g., figures. '
+                             'Can be specified several times. Hidden directories, node_modules, '
+                             '__pycache__, _minted-* and build directories are never visited')
+
+    parser.add_argument('--lookback', type=int, action='store', default=1,
+                        help='number of previous lines, where the long notice of an abbreviation is searched')
+
+    parser.add_argument('--engine', type=str, action='store', default='line', choices=ENGINES,
+                        help='abbreviations search engine: line (visit input files line-by-line), '
+                             'regex (visit every input file as a whole in a single pass) or '
+                             'bytes (visit raw bytes of every input file and only decode text around candidates)')
+
+    parser.add_argument('--encoding', type=str, action='store', default=",".join(DEFAULT_ENCODINGS),
+                        help='comma-separated encodings of input files, tried one after another, '
+                             'until a file is decoded')
+
+    parser.add_argument('--rules', type=str, action='store', default=None,
+                        help='path to JSON file with abbreviations classification rules (stop words and patterns, '
+                             'allowed words and patterns, plural suffixes), which extend the default rules')
+
+    parser.add_argument('--window', type=int, action='store', default=DEFAULT_WINDOW,
+                        help='regex engine only: number of characters before the abbreviation, '
+                             'where the long notice of the abbreviation is searched')
+
+    parser.add_argument('--policy', type=str, action='store', default='latest', choices=MERGE_POLICIES,
+                        help='definition of an abbreviation, defined with different long notices in the input files: '
+                             'latest (the latest definition), first (the first definition) or most-frequent '
+                             '(the most frequent long notice). Different long notices are reported in the output file')
+
+    parser.add_argument('--jobs', type=int, action='store', default=1,
+                        help='number of worker processes, used to scan the input files')
+
+    parser.add_argument('--cache-size', type=int, action='store', default=DEFAULT_MAX_ENTRIES,
+                        help='max number of files, which abbreviations are kept in the scan cache')
+
+    parser.add_argument('--poll-interval', type=float, action='store', default=0.5,
+                        help='watch mode only: interval between two checks of the input files, in seconds')
+
+    parser.add_argument('--index', type=str, action='store', default=None,
+                        help='path to SQLite corpus index. Every definition found in every input file '
+                             'is also saved in the index, replacing the previous definitions of the file')
+
+    parser.add_argument('--baseline', type=str, action='store', default=None,
+                        help='path to previously generated output JSON file. Only added, removed and changed '
+                             'abbreviations are reported, and the output file is not written. Exit code is 0 '
+                             'if there are no changes, 1 if there are changes and 2 if the search failed')
+
+    parser.add_argument('--diff-output', type=str, action='store', default=None,
+                        help='baseline mode only: path to output JSON file with the changes against the baseline')
+
+    parser.add_argument('--profile-output', type=str, action='store', default=None,
+                        help='path to output JSON file with profiling results. Implies --profile')
+
     # general flags
+    parser.add_argument('--latex-aware', help="skip LaTeX comments, verbatim environments and math, "
+                                              "and only search prose for abbreviations",
+                        action="store_true", default=False)
+    parser.add_argument('--profile', help="measure wall time and count processed items of every abbreviations "
+                                          "search stage, per file and in total, and print the results",
+                        action="store_true", default=False)
+    parser.add_argument('--follow-includes', help="input is a root document, e.g., thesis/main.tex. Only files, "
+                                                  "reachable from the root document via \\input, \\include and "
+                                                  "\\subfile commands are searched, in document order",
+                        action="store_true", default=False)
+    parser.add_argument('--usages', help="find uses of every abbreviation in the input files and save the number "
+                                         "of uses and the first use of every abbreviation in the output file",
+                        action="store_true", default=False)
+    parser.add_argument('--watch', help="watch the input files and update the output file, when the input files change",
+                        action="store_true", default=False)
+    parser.add_argument('--no-cache', help="do not use the scan cache, stored next to the output file",
+                        action="store_true", default=False)
     parser.add_argument('--verbose', help="print details", action="store_true", default=False)
 
     # parse arguments
@@ -40,83 +133,643 @@ def main():
     input_path = args.i
     output_path = args.o
     extension = args.e
+    exclude_patterns = DEFAULT_EXCLUDE_PATTERNS + args.exclude
     verbose = args.verbose
+    options = ScanOptions(lookback=args.lookback, engine=args.engine, window=args.window,
+                          latex_aware=args.latex_aware, encodings=args.encoding.split(","),
+                          member_extensions=[extension],
+                          rules=None if args.rules is None else load_rules_config(args.rules))
+    jobs = args.jobs
+    cache = None
+    if not args.no_cache:
+        cache = ScanCache(get_default_cache_path(output_path), options.signature(), args.cache_size)
+
+    profiler = None
+    if args.profile or args.profile_output is not None:
+        from scan_profiler import ScanProfiler
+        profiler = ScanProfiler(options.engine)
+        profiler.install(sys.modules[__name__])
+        if jobs > 1:
+            print("Profiling is only supported for a single job. The input files are scanned serially.")
+            jobs = 1
 
     try:
-        input_file_paths = get_input_file_paths(input_path, [extension], verbose)
-        abbreviations = find_abbreviations_in_files_list(input_file_paths, verbose)
-        abbreviations_to_json(abbreviations, output_path, verbose)
+        if cache is not None:
+            cache.load()
+        include_graph = None
+        if args.follow_includes:
+            from include_graph import IncludeGraph, get_default_include_graph_path
+            if not os.path.isfile(input_path):
+                raise Exception("Wrong input: existing root document file is expected with --follow-includes.")
+            include_graph = IncludeGraph(None if args.no_cache else get_default_include_graph_path(output_path),
+                                         options.encodings)
+            include_graph.load()
+        if args.watch:
+            from watcher import AbbreviationsWatcher
+            watcher = AbbreviationsWatcher(input_path, [extension] + ARCHIVE_EXTENSIONS, output_path, options, jobs,
+                                           cache, verbose, policy=args.policy, output_format=args.format,
+                                           poll_interval=args.poll_interval, exclude_patterns=exclude_patterns,
+                                           include_graph=include_graph)
+            watcher.run()
+            return
+        reading_order = None
+        if include_graph is not None:
+            reading_order = include_graph.get_reading_order(input_path, verbose)
+            input_file_paths = reading_order.get_files()
+            include_graph.save()
+        else:
+            input_file_paths = iterate_input_file_paths(input_path, [extension], verbose, exclude_patterns,
+                                                        ARCHIVE_EXTENSIONS)
+        baseline_index = None
+        if args.baseline is not None:
+            from baseline_diff import load_baseline, get_baseline_digest, diff_abbreviations, EXIT_NO_CHANGES
+            baseline_index = load_baseline(args.baseline)
+            # stop early, if no input file changed since the run, which produced the baseline
+            if cache is not None:
+                input_file_paths = list(input_file_paths)
+                if is_baseline_unchanged(input_file_paths, cache, get_baseline_digest(baseline_index), args.policy):
+                    if verbose:
+                        print("Input files did not change since the baseline was produced")
+                    report_baseline_differences({"added": [], "removed": [], "changed": []}, args.baseline,
+                                                args.diff_output)
+                    sys.exit(EXIT_NO_CHANGES)
+        if args.usages:
+            input_file_paths = list(input_file_paths)
+        corpus_index = None
+        if args.index is not None:
+            from corpus_index import CorpusIndex
+            corpus_index = CorpusIndex(args.index)
+            corpus_index.open()
+        output_writer = None
+        if baseline_index is None and args.format == "ndjson":
+            output_writer = NdjsonAbbreviationsWriter(output_path)
+            output_writer.open()
+        registry = AbbreviationRegistry(policy=args.policy)
+        try:
+            abbreviations = find_abbreviations_in_files_list(input_file_paths, verbose, options, jobs, cache,
+                                                             corpus_index, registry, output_writer, reading_order)
+            if corpus_index is not None:
+                removed_documents = corpus_index.remove_missing_documents()
+                if verbose and removed_documents > 0:
+                    print("Removed", removed_documents, "documents, which no longer exist, from the corpus index")
+        except BaseException:
+            if output_writer is not None:
+                output_writer.close(failed=True)
+            if corpus_index is not None:
+                corpus_index.close(failed=True)
+            raise
+        if corpus_index is not None:
+            corpus_index.close()
+        exit_code = None
+        if baseline_index is not None:
+            exit_code = report_baseline_differences(diff_abbreviations(baseline_index, abbreviations), args.baseline,
+                                                    args.diff_output)
+        else:
+            extra_fields = registry.get_conflicts()
+            if args.usages:
+                usages = find_abbreviation_usages(abbreviations, input_file_paths, verbose, options, reading_order)
+                for short, fields in usages.items():
+                    fields.update(extra_fields.get(short, {}))
+                extra_fields = usages
+            if output_writer is not None:
+                output_writer.write_extra_fields(extra_fields)
+                output_writer.close()
+                if verbose:
+                    print("Abbreviations saved in", output_path)
+            else:
+                abbreviations_to_json(abbreviations, output_path, verbose, extra_fields, args.format)
+        if cache is not None:
+            from baseline_diff import get_definitions_digest
+            cache.set_merged(get_definitions_digest((a.short, a.long) for a in abbreviations), args.policy)
+            cache.save()
+            if verbose:
+                cache.print_stats()
+        if profiler is not None:
+            profiler.finish()
+            profiler.print_report()
+            if args.profile_output is not None:
+                profiler.save(args.profile_output)
+        if exit_code is not None:
+            sys.exit(exit_code)
     except Exception as e:
         print("Abbreviations search error: " + str(e))
         traceback.print_tb(e.__traceback__)
+        if args.baseline is not None:
+            from baseline_diff import EXIT_ERROR
+            sys.exit(EXIT_ERROR)
+        sys.exit(1)
 
 
-def find_abbreviations_in_files_list(file_paths, verbose):
+def is_baseline_unchanged(file_paths, cache, baseline_digest, policy):
+    """
+    Check if the input files have not changed since the run, which produced the baseline,
+    so that the abbreviations do not need to be found and merged again. The check stops
+    at the first file, which changed since it was cached. The check is not counted in the
+    cache statistics, so that the files are counted once, when they are scanned
+    :param file_paths: list of paths to input files
+    :param cache: scan cache (ScanCache)
+    :param baseline_digest: digest of the baseline definitions
+    :param policy: merge policy
+    :return: True, if the input files and the merged definitions have not changed and False otherwise
+    """
+    for path in file_paths:
+        # archives are not cached, so their changes cannot be detected
+        if is_archive(path) or not cache.is_unchanged(path):
+            return False
+    return cache.is_merged_unchanged(baseline_digest, policy, file_paths)
+
+
+def report_baseline_differences(differences, baseline_path, diff_output_path=None):
+    """
+    Print differences between found abbreviations and the baseline
+    :param differences: differences, obtained with diff_abbreviations()
+    :param baseline_path: path to the baseline JSON file
+    :param diff_output_path: path to output JSON file with the differences (optional)
+    :return: exit code: EXIT_CHANGES, if there are differences, and EXIT_NO_CHANGES otherwise
+    """
+    from baseline_diff import has_differences, print_differences, EXIT_CHANGES, EXIT_NO_CHANGES
+    from json_converters.abbreviations_to_json import save_as_json
+    print_differences(differences, baseline_path)
+    if diff_output_path is not None:
+        save_as_json(diff_output_path, differences)
+    return EXIT_CHANGES if has_differences(differences) else EXIT_NO_CHANGES
+
+
+def find_abbreviations_in_files_list(file_paths, verbose, options=None, jobs=1, cache=None, corpus_index=None,
+                                     registry=None, output_writer=None, reading_order=None):
     """
     Visit a number of input files and try to find abbreviations there
     :param file_paths: list of paths to input files
     :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :param jobs: number of worker processes, used to scan the input files
+    :param cache: scan cache (ScanCache). If specified, only the files that
+        changed since they were cached are scanned
+    :param corpus_index: open corpus index (CorpusIndex). If specified, abbreviations
+        found in every input file are also saved in the index
+    :param registry: registry (AbbreviationRegistry), where abbreviations found in the input files are merged.
+        If None, a new registry is created
+    :param output_writer: open NDJSON output writer (NdjsonAbbreviationsWriter). If specified, the merged
+        abbreviations, which changed in every input file, are written, as soon as the file is scanned
+    :param reading_order: reading order of a LaTeX document (ReadingOrder), which consists of the input files.
+        If specified, abbreviations are merged in the reading order of the document, rather than file by file,
+        and are written into the output writer once all the input files are scanned
     :return: abbreviations: list of  abbreviations found in the input files
     """
-    abbreviations = []
-    for path in file_paths:
-        file_abbreviations = find_abbreviations_in_file(path, verbose)
+    abbreviations = AbbreviationRegistry() if registry is None else registry
+    # until all the input files are scanned, per-file abbreviations are kept in a compact store
+    results = ResultStore() if reading_order is not None else None
+    for path, file_abbreviations in scan_files(file_paths, verbose, options, jobs, cache):
+        if corpus_index is not None:
+            corpus_index.add_document(path, file_abbreviations)
+        if reading_order is not None:
+            results.add_abbreviations(path, file_abbreviations)
+            continue
         for abbreviation in file_abbreviations:
-            add_or_replace_abbreviation(abbreviation, abbreviations)
+            add_or_replace_abbreviation(abbreviation, abbreviations, verbose)
+        if output_writer is not None:
+            output_writer.write_changes([abbreviations.find(abbreviation.short) for abbreviation in file_abbreviations])
+
+    if reading_order is not None:
+        for abbreviation in reading_order.iterate_abbreviations(results.get_file_abbreviations):
+            add_or_replace_abbreviation(abbreviation, abbreviations, verbose)
+        if output_writer is not None:
+            output_writer.write_changes(abbreviations.to_list())
+    return abbreviations.to_list()
+
+
+def find_abbreviation_usages(abbreviations, file_paths, verbose, options=None, reading_order=None):
+    """
+    Visit a number of input files and find uses of abbreviations there
+    :param abbreviations: list of abbreviations found in the input files
+    :param file_paths: list of paths to input files and archives
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :param reading_order: reading order of a LaTeX document (ReadingOrder), which consists of the input files.
+        If specified, uses and definitions are compared in the reading order of the document
+    :return: uses of every abbreviation: dictionary with key = short notice,
+        value = dictionary with number of uses and the first use of the abbreviation
+    """
+    from usage_index import UsageIndex
+    if options is None:
+        options = ScanOptions()
+    usage_index = UsageIndex(abbreviations, reading_order)
+    for path in file_paths:
+        if not is_archive(path):
+            # files, which cannot be decoded, are reported and skipped, as in the abbreviations search
+            try:
+                usage_index.index_file(path, options.encodings)
+            except UnicodeDecodeError as e:
+                print("Abbreviations usages error: " + get_decode_error_message(path, e))
+            continue
+        import tarfile
+        import zipfile
+        try:
+            for member_path, data in iterate_archive_members(path, options.member_extensions):
+                try:
+                    usage_index.index_text(decode_member(data, options.encodings), member_path)
+                except UnicodeDecodeError as e:
+                    print("Abbreviations usages error: " + get_decode_error_message(member_path, e))
+        except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError):
+            continue
+    if verbose:
+        unused = usage_index.get_unused()
+        used_before_definition = [short for short in usage_index.counts.keys()
+                                  if usage_index.is_used_before_definition(short)]
+        print("Abbreviations, defined but never used (", len(unused), "):", unused)
+        print("Abbreviations, used before definition (", len(used_before_definition), "):", used_before_definition)
+    return usage_index.to_json_fields()
+
+
+def scan_files(file_paths, verbose, options=None, jobs=1, cache=None):
+    """
+    Visit a number of input files and try to find abbreviations in every file.
+    If more than one job is requested, the files are scanned by a pool of worker processes.
+    Independent of the number of jobs, the files are returned in the order of the input list.
+    Input archives are replaced with their members, in the order of the members in the archive
+    :param file_paths: list of paths to input files
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :param jobs: number of worker processes, used to scan the input files
+    :param cache: scan cache (ScanCache). If specified, only the files that
+        changed since they were cached are scanned. Archives are not cached
+    :return: generator of tuples (file_path, file_abbreviations), where file_abbreviations is
+        the list of abbreviations found in the file
+    """
+    if options is None:
+        options = ScanOptions()
+
+    if cache is None:
+        for path, file_abbreviations, _ in scan_files_without_cache(file_paths, verbose, options, jobs):
+            yield path, file_abbreviations
+        return
+
+    # scan files one by one: every file is scanned as soon as its path is obtained
+    if jobs <= 1:
+        for path in file_paths:
+            records = None if is_archive(path) else cache.lookup(path)
+            if records is not None:
+                yield path, get_cached_file_abbreviations(path, records, verbose)
+                continue
+            for scanned_path, file_abbreviations, error in scan_input_path(path, verbose, options):
+                store_scanned_file(cache, path, scanned_path, file_abbreviations, error)
+                yield scanned_path, file_abbreviations
+        return
+
+    # scan files in parallel: the files, missing in the cache, are collected and sent to the workers
+    file_paths = list(file_paths)
+    cached_records = {}
+    for path in file_paths:
+        records = None if is_archive(path) else cache.lookup(path)
+        if records is not None:
+            cached_records[path] = records
+
+    missed_file_paths = [path for path in file_paths if path not in cached_records]
+    scanned_input_paths = scan_input_paths(missed_file_paths, verbose, options, jobs)
+    for path in file_paths:
+        if path in cached_records:
+            yield path, get_cached_file_abbreviations(path, cached_records[path], verbose)
+            continue
+        for scanned_path, file_abbreviations, error in next(scanned_input_paths):
+            store_scanned_file(cache, path, scanned_path, file_abbreviations, error)
+            yield scanned_path, file_abbreviations
+
+
+def store_scanned_file(cache, path, scanned_path, file_abbreviations, error):
+    """
+    Store abbreviations, found in a scanned file, in the scan cache.
+    Files, which cannot be decoded, are not cached, so that they are scanned again in the next run.
+    Archive members are not cached, because they have no fingerprint of their own
+    :param cache: scan cache (ScanCache)
+    :param path: path to input file or archive
+    :param scanned_path: path to the scanned file or archive member
+    :param file_abbreviations: list of abbreviations found in the scanned file
+    :param error: decoding error or None
+    """
+    if error is None and scanned_path == path:
+        cache.store(path, [abbreviation_to_record(abbreviation) for abbreviation in file_abbreviations])
+
+
+def get_cached_file_abbreviations(file_path, records, verbose):
+    """
+    Restore abbreviations found in a file from the scan cache
+    :param file_path: path to the file
+    :param records: cached records (short, long, line) of abbreviations found in the file
+    :param verbose: flag. If True, print details
+    :return: list of abbreviations found in the file
+    """
+    file_abbreviations = [record_to_abbreviation(record, file_path) for record in records]
+    if verbose:
+        print("Using cached abbreviations for", file_path)
+        print_file_abbreviations(file_abbreviations)
+    return file_abbreviations
+
+
+def scan_files_without_cache(file_paths, verbose, options, jobs=1):
+    """
+    Visit a number of input files and try to find abbreviations in every file.
+    Files, which cannot be decoded, are reported and skipped
+    :param file_paths: list of paths to input files
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions)
+    :param jobs: number of worker processes, used to scan the input files
+    :return: generator of tuples (file_path, file_abbreviations, error), where file_abbreviations is
+        the list of abbreviations found in the file and error is the decoding error or None
+    """
+    for scanned_files in scan_input_paths(file_paths, verbose, options, jobs):
+        yield from scanned_files
+
+
+def scan_input_paths(file_paths, verbose, options, jobs=1):
+    """
+    Visit a number of input files and archives and try to find abbreviations in every file
+    :param file_paths: list of paths to input files and archives
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions)
+    :param jobs: number of worker processes, used to scan the input files.
+        Every input archive is scanned by a single worker
+    :return: generator of lists of tuples (file_path, file_abbreviations, error): one list per input path,
+        in the order of the input paths. The list holds one tuple for an input file
+        and one tuple per scanned member for an input archive
+    """
+    if jobs <= 1:
+        for path in file_paths:
+            yield scan_input_path(path, verbose, options)
+        return
+
+    file_paths = list(file_paths)
+    if len(file_paths) == 0:
+        return
+    # submit files in chunks, so that every worker gets several
+    # chunks and the inter-process communication overhead is amortized
+    chunk_size = max(1, len(file_paths) // (jobs * 4))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map() returns results in the order of the input files,
+        # whatever order the workers finish in
+        input_path_records = executor.map(scan_input_path_records, file_paths, repeat(options), chunksize=chunk_size)
+        for file_records in input_path_records:
+            scanned_files = []
+            for path, records, error in file_records:
+                file_abbreviations = [record_to_abbreviation(record, path) for record in records]
+                if verbose:
+                    print("Opening", path)
+                    print_file_abbreviations(file_abbreviations)
+                if error is not None:
+                    print("Abbreviations search error: " + error)
+                scanned_files.append((path, file_abbreviations, error))
+            yield scanned_files
+
+
+def scan_input_path(path, verbose, options):
+    """
+    Visit an input file or archive and try to find abbreviations there
+    :param path: path to input file or archive
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions)
+    :return: list of tuples (file_path, file_abbreviations, error): one tuple for an input file
+        and one tuple per scanned member for an input archive
+    """
+    if is_archive(path):
+        return list(find_abbreviations_in_archive(path, verbose, options))
+    return [(path,) + find_abbreviations_in_file_or_report(path, verbose, options)]
+
+
+def scan_input_path_records(path, options=None):
+    """
+    Visit an input file or archive and try to find abbreviations there.
+    Used by the worker processes, when the input files are scanned in parallel
+    :param path: path to input file or archive
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :return: list of tuples (file_path, records, error): list of compact records (short, long, line)
+        of abbreviations found in the file and the decoding error or None. An input file
+        has one tuple, an input archive has one tuple per scanned member
+    """
+    if is_archive(path):
+        scanned_files = find_abbreviations_in_archive(path, False, options, report_errors=False)
+    else:
+        try:
+            scanned_files = [(path, find_abbreviations_in_file(path, False, options), None)]
+        except UnicodeDecodeError as e:
+            scanned_files = [(path, [], get_decode_error_message(path, e))]
+    return [(file_path, [abbreviation_to_record(abbreviation) for abbreviation in file_abbreviations], error)
+            for file_path, file_abbreviations, error in scanned_files]
+
+
+def find_abbreviations_in_file_or_report(file_path, verbose, options=None):
+    """
+    Visit an input file and try to find abbreviations there.
+    If the file cannot be decoded, the error is reported, and the search continues
+    :param file_path: path to input file
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :return: tuple (abbreviations, error): list of abbreviations found in the input file
+        and the decoding error or None
+    """
+    try:
+        return find_abbreviations_in_file(file_path, verbose, options), None
+    except UnicodeDecodeError as e:
+        error = get_decode_error_message(file_path, e)
+        print("Abbreviations search error: " + error)
+        return [], error
+
+
+def get_decode_error_message(file_path, error):
+    return "cannot decode " + str(file_path) + ": " + str(error)
+
+
+def find_abbreviations_in_archive(archive_path, verbose, options=None, report_errors=True):
+    """
+    Visit members of an input archive and try to find abbreviations there.
+    Only members with the extensions of the input files are visited. The members are read
+    straight from the archive, the archive is not extracted. Members, which cannot be decoded,
+    and archives, which cannot be read, are reported and skipped
+    :param archive_path: path to input archive
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
+    :param report_errors: flag. If True, errors are printed
+    :return: generator of tuples (member_path, member_abbreviations, error), where member_path is
+        the path of the form archive!member, member_abbreviations is the list of abbreviations
+        found in the member and error is the decoding (or archive reading) error or None
+    """
+    import tarfile
+    import zipfile
+    if options is None:
+        options = ScanOptions()
+    if verbose:
+        print("Opening archive", archive_path)
+    try:
+        for member_path, data in iterate_archive_members(archive_path, options.member_extensions):
+            try:
+                yield member_path, find_abbreviations_in_archive_member(data, member_path, verbose, options), None
+            except UnicodeDecodeError as e:
+                error = get_decode_error_message(member_path, e)
+                if report_errors:
+                    print("Abbreviations search error: " + error)
+                yield member_path, [], error
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        error = "cannot read archive " + str(archive_path) + ": " + str(e)
+        if report_errors:
+            print("Abbreviations search error: " + error)
+        yield archive_path, [], error
+
+
+def find_abbreviations_in_archive_member(data, member_path, verbose, options):
+    """
+    Try to find abbreviations in a member of an input archive
+    :param data: raw content (bytes) of the member
+    :param member_path: path to the member of the form archive!member
+    :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions)
+    :return: abbreviations: list of  abbreviations found in the member
+    """
+    rules = get_rules(options.rules)
+    if verbose:
+        print("Opening", member_path)
+    if options.engine == "bytes":
+        from byte_scanner import find_abbreviations_in_bytes
+        abbreviations, decode_errors = find_abbreviations_in_bytes(data, member_path, options.lookback,
+                                                                   options.encodings, rules)
+        print_decode_errors(member_path, decode_errors, options)
+    else:
+        text = decode_member(data, options.encodings)
+        abbreviations = find_abbreviations_in_text_stream(StringIO(text), member_path, options, rules)
+
+    if verbose:
+        print_file_abbreviations(abbreviations)
     return abbreviations
 
 
-def find_abbreviations_in_file(file_path, verbose):
+def find_abbreviations_in_file(file_path, verbose, options=None):
     """
-    Visit an input file and try to find abbreviations there
+    Visit an input file and try to find abbreviations there.
+    With the line engine, the file is read line-by-line, so that only the
+    current line and (lookback) previous lines are kept in memory.
+    With the regex engine, the file is read as a whole and visited in a single pass.
+    With the bytes engine, the file is visited as raw bytes, and only text around
+    the candidates is decoded
     :param file_path: path to input file
     :param verbose: flag. If True, print details
+    :param options: abbreviations search options (ScanOptions). If None, default options are used
     :return: abbreviations: list of  abbreviations found in the input file
     """
+    if options is None:
+        options = ScanOptions()
+    rules = get_rules(options.rules)
     if verbose:
         print("Opening", file_path)
-    abbreviations = []
-    file_as_lines = get_file_as_lines(file_path)
-    line_id = 0
-    for line in file_as_lines:
-        if has_two_round_brackets(line):
-            prev_line = file_as_lines[line_id-1] if line_id > 0 else ""
-            line_abbreviations = try_find_abbreviations_in_line(line, prev_line)
-            for line_abbreviation in line_abbreviations:
-                line_abbreviation.file = file_path
-                line_abbreviation.line = line_id
-                add_or_replace_abbreviation(line_abbreviation, abbreviations)
-        line_id += 1
+
+    if options.engine == "bytes":
+        from byte_scanner import find_abbreviations_in_bytes_file
+        abbreviations, decode_errors = find_abbreviations_in_bytes_file(file_path, options.lookback,
+                                                                        options.encodings, rules)
+        print_decode_errors(file_path, decode_errors, options)
+    else:
+        abbreviations = find_abbreviations_in_text_file(file_path, options, rules)
+
     if verbose:
-        if len(abbreviations) > 0:
-            print("  - abbreviations found (", len(abbreviations), "):", [str(abbreviation) for abbreviation in abbreviations])
-        else:
-            print("  - no abbreviations found")
+        print_file_abbreviations(abbreviations)
     return abbreviations
 
 
-def add_or_replace_abbreviation(abbreviation, abbreviations):
+def print_decode_errors(file_path, decode_errors, options):
+    if decode_errors > 0:
+        print("Abbreviations search error: cannot decode", decode_errors, "text windows in", file_path,
+              "with", list(options.encodings), "encodings. Undecodable bytes are replaced")
+
+
+def find_abbreviations_in_text_file(file_path, options, rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Decode an input file and try to find abbreviations there.
+    The encodings are tried one after another, until the file is decoded
+    :param file_path: path to input file
+    :param options: abbreviations search options (ScanOptions)
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: abbreviations: list of  abbreviations found in the input file
+    """
+    last_encoding = options.encodings[-1]
+    for encoding in options.encodings:
+        try:
+            with open(file_path, encoding=encoding) as fp:
+                return find_abbreviations_in_text_stream(fp, file_path, options, rules)
+        except UnicodeDecodeError:
+            if encoding == last_encoding:
+                raise
+
+
+def find_abbreviations_in_text_stream(fp, file_path, options, rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Try to find abbreviations in a text stream
+    :param fp: text stream, e.g., an open text file
+    :param file_path: path to the file, the text belongs to
+    :param options: abbreviations search options (ScanOptions)
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: abbreviations: list of  abbreviations found in the text
+    """
+    lines = fp
+    if options.latex_aware:
+        from latex_tokenizer import iterate_prose_lines
+        lines = iterate_prose_lines(fp)
+    if options.engine == "regex":
+        from regex_scanner import find_abbreviations_in_buffer
+        text = fp.read() if lines is fp else "".join(lines)
+        return find_abbreviations_in_buffer(text, file_path, options.window, rules)
+    return find_abbreviations_in_lines(lines, file_path, options.lookback, rules)
+
+
+def print_file_abbreviations(abbreviations):
+    """
+    Print abbreviations, found in a file
+    :param abbreviations: list of abbreviations found in the file
+    """
+    if len(abbreviations) > 0:
+        print("  - abbreviations found (", len(abbreviations), "):", [str(abbreviation) for abbreviation in abbreviations])
+    else:
+        print("  - no abbreviations found")
+
+
+def find_abbreviations_in_lines(lines, file_path=None, lookback=1, rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Visit lines of text and try to find abbreviations there
+    :param lines: iterable over text lines, e.g., an open file
+    :param file_path: path to the file, the lines belong to (if available)
+    :param lookback: number of previous lines, where the long notice of an abbreviation is searched
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: abbreviations: list of  abbreviations found in the lines: every definition with long notice
+        and the first use of every abbreviation (see FileAbbreviations)
     """
-    Add abbreviation to the list or replace existing abbreviation in the list.
-    The abbreviation is added to the list, if the list does not yet contain
+    abbreviations = FileAbbreviations()
+    for line_id, line, prev_lines in iterate_lines_with_lookback(lines, lookback):
+        if has_two_round_brackets(line):
+            prev_line = "".join(prev_lines)
+            for short_notice, long_notice in iterate_line_definitions(line, prev_line, rules):
+                # repeated use of an abbreviation is not kept,
+                # so no abbreviation object is created for it
+                if long_notice is None and abbreviations.is_found(short_notice):
+                    continue
+                abbreviations.add(Abbreviation(short_notice, long_notice, file_path, line_id))
+    return abbreviations.to_list()
+
+
+def add_or_replace_abbreviation(abbreviation, abbreviations: AbbreviationRegistry, verbose=False):
+    """
+    Add abbreviation to the registry or replace existing abbreviation in the registry.
+    The abbreviation is added to the registry, if the registry does not yet contain
      the abbreviation.
-    The abbreviation replaces another abbreviation in the list, if:
+    The abbreviation replaces another abbreviation in the registry, if:
         1) current abbreviation has long notice;
-        2) the list contains current abbreviation but without long notice
+        2) the registry contains current abbreviation but without long notice
+    The replacing abbreviation keeps the position of the replaced one,
+    so that the abbreviations are kept in the order of their first definition
     :param abbreviation: abbreviation
-    :param abbreviations: list of abbreviations
+    :param abbreviations: registry of abbreviations
+    :param verbose: flag. If True, print details
+    :return: True, if an abbreviation in the registry was replaced and False otherwise
     """
-    # add
-    if abbreviation not in abbreviations:
-        abbreviations.append(abbreviation)
-        return
-
-    # replace
-    if abbreviation.long is not None:
-        print("replace abbreviation")
-        saved_abbreviation = find_abbreviation_by_short_notice(abbreviation.short, abbreviations)
-        abbreviations.remove(saved_abbreviation)
-        abbreviations.append(abbreviation)
+    replaced = abbreviations.add_or_replace(abbreviation)
+    if replaced and verbose:
+        print("  - replace abbreviation", abbreviation, "defined in", abbreviation.file)
+    return replaced
 
 
 def get_file_as_lines(file_path):
@@ -136,40 +789,64 @@ def get_file_as_lines(file_path):
     return lines
 
 
-def try_find_abbreviations_in_line(line, prev_line):
+def iterate_lines_with_lookback(lines, lookback=1):
+    """
+    Iterate over lines of text, keeping a bounded window of previous lines
+    :param lines: iterable over text lines, e.g., an open file
+    :param lookback: max number of previous lines kept in the window
+    :return: generator of tuples (line_id, line, prev_lines), where
+        line_id is the id of the line (starting from 0) and prev_lines
+        is the window with up to (lookback) lines, previous to the line.
+        The window is updated once the next line is requested, so it should
+        not be stored by the caller
+    """
+    prev_lines = deque(maxlen=max(lookback, 0))
+    line_id = 0
+    for line in lines:
+        yield line_id, line, prev_lines
+        prev_lines.append(line)
+        line_id += 1
+
+
+def try_find_abbreviations_in_line(line, prev_line, rules=DEFAULT_ABBREVIATION_RULES):
     """
     Try to find abbreviations in a line
     :param line: line of text that may contain abbreviations
     :param prev_line: line, previous to current line (if available)
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
     :return: list of abbreviations found in the text line
     """
-    abbreviations = []
+    return [Abbreviation(short_notice, long_notice) for short_notice, long_notice
+            in iterate_line_definitions(line, prev_line, rules)]
+
+
+def iterate_line_definitions(line, prev_line, rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Iterate over abbreviations in a line without creating abbreviation objects
+    :param line: line of text that may contain abbreviations
+    :param prev_line: line, previous to current line (if available)
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: generator of tuples (short_notice, long_notice), where long_notice is None, if not found
+    """
     substrings_in_round_brackets = find_substrings_in_round_brackets(line)
     for substring in substrings_in_round_brackets:
-        if is_abbreviation(substring):
-            abbreviation = Abbreviation(substring)
-            long_notice = find_long_notice(line, prev_line, substring)
-            if long_notice is not None:
-                abbreviation.long = long_notice
-            abbreviations.append(abbreviation) # substring
-    return abbreviations
+        if is_abbreviation(substring, rules):
+            yield substring, find_long_notice(line, prev_line, substring, rules)
 
 
-def find_long_notice(line: str, prev_line: str, short_notice: str):
+def find_long_notice(line: str, prev_line: str, short_notice: str, rules=DEFAULT_ABBREVIATION_RULES):
     """
     Find long notice for the abbreviation
     :param line: text line with abbreviation
     :param prev_line: line, previous to the text line with abbreviation (if available)
     :param short_notice: short notice of abbreviation, e.g., BBC
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
     :return: long notice of abbreviation, e.g., British Broadcasting Corporation
     """
     # find position of short notice in the line
     short_notice_pos = line.find(short_notice)
 
-    short_notice_letters = [char for char in short_notice]
-    # small "s" in the end of abbreviation stands for multiple objects
-    if short_notice_letters[-1] == "s":
-        short_notice_letters.pop(-1)
+    short_notice_letters = get_short_notice_letters(short_notice, rules)
 
     # the long notice should be located before the abbreviation
     substring_to_search = line[:short_notice_pos]
@@ -180,6 +857,18 @@ def find_long_notice(line: str, prev_line: str, short_notice: str):
     return long_notice
 
 
+def get_short_notice_letters(short_notice: str, rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Represent short notice of abbreviation as an array of letters,
+    matching the words of the long notice
+    :param short_notice: short notice of abbreviation, e.g., BBC
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: short notice of abbreviation, represented as an array of letters
+    """
+    # plural suffix (e.g., small "s" in the end of abbreviation) stands for multiple objects
+    return list(rules.strip_plural_suffix(short_notice))
+
+
 def search_substring_for_long_notice(substring: str, short_notice_letters: []):
     """"
     Search substring of text for long notice of abbreviation, e.g., British Broadcasting Corporation
@@ -189,8 +878,9 @@ def search_substring_for_long_notice(substring: str, short_notice_letters: []):
         and None otherwise
     """
 
-    # we search string word-by word
-    string_as_words = substring.split(" ")
+    # we search string word-by word. Words are separated by any white spaces,
+    # so that a long notice, wrapped across a line break, is also found
+    string_as_words = substring.split()
 
     # we start search from the last letter/word
     # thus, we traverse the short-notice letters
@@ -306,29 +996,18 @@ def find_word_and_its_pos_in_string(string, first_letter, start_pos, end_pos):
     return None, -1
 
 
-def is_abbreviation(substrings_in_round_brackets):
+def is_abbreviation(substrings_in_round_brackets, rules=DEFAULT_ABBREVIATION_RULES):
     """
     Try to determine if a substring, enclosed in round brackets is
-    an abbreviation
+    an abbreviation. The substring is classified by the rules
+    (see abbreviation_rules.py). With default rules, an abbreviation has at least
+    two capital letters and does not start with i.e. or e.g.
     :param substrings_in_round_brackets: substring, enclosed in round brackets
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
     :return: True, if a substring, enclosed in round brackets is
         an abbreviation, and False otherwise
     """
-    # abbreviations do not start with i.e.,
-    if substrings_in_round_brackets.strip().startswith("i.e."):
-        return False
-
-    # abbreviations do not start with e.g.,
-    if substrings_in_round_brackets.strip().startswith("e.g."):
-        return False
-
-    # abbreviation has at least two capital letters
-    if count_capital_letters(substrings_in_round_brackets) < 2:
-        return False
-
-    # in all other cases, we assume that the input substring,
-    # enclosed in round brackets is an abbreviation
-    return True
+    return rules.classify(substrings_in_round_brackets)
 
 
 def count_capital_letters(string):
@@ -347,7 +1026,7 @@ def find_substrings_in_round_brackets(line):
     :param line: text line
     :return: all substrings enclosed in round brackets '()' that are in a line
     """
-    matches = re.findall(r"\(([A-Za-z0-9_]+)\)", line)
+    matches = ROUND_BRACKETS_PATTERN.findall(line)
     return matches
 
 
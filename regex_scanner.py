@@ -0,0 +1,68 @@
+"""
+Regex engine of abbreviations search. Instead of visiting the input text
+line-by-line, the engine runs a single precompiled regular expression over
+the whole text, so that no per-line strings are created
+"""
+from Abbreviation import Abbreviation, FileAbbreviations
+from scan_options import DEFAULT_WINDOW
+from abbreviation_rules import DEFAULT_ABBREVIATION_RULES
+from main import ROUND_BRACKETS_PATTERN, is_abbreviation, get_short_notice_letters, search_substring_for_long_notice
+
+
+def find_abbreviations_in_buffer(text, file_path=None, window=DEFAULT_WINDOW, rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Visit text as a whole and try to find abbreviations there
+    :param text: text that may contain abbreviations, e.g., content of a .tex file
+    :param file_path: path to the file, the text belongs to (if available)
+    :param window: number of characters before the abbreviation, where
+        the long notice of the abbreviation is searched
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: abbreviations: list of  abbreviations found in the text: every definition with long notice
+        and the first use of every abbreviation (see FileAbbreviations)
+    """
+    abbreviations = FileAbbreviations()
+
+    # matches are visited in the order of their position in the text,
+    # so the line of every match is obtained by counting the line breaks
+    # between the previous and the current match
+    line_id = 0
+    counted_pos = 0
+    for match in ROUND_BRACKETS_PATTERN.finditer(text):
+        substring = match.group(1)
+        if not is_abbreviation(substring, rules):
+            continue
+
+        short_notice_pos = match.start(1)
+        line_id += text.count("\n", counted_pos, short_notice_pos)
+        counted_pos = short_notice_pos
+
+        long_notice = find_long_notice_in_window(text, short_notice_pos, substring, window, rules)
+        if long_notice is None and abbreviations.is_found(substring):
+            continue
+        abbreviations.add(Abbreviation(substring, long_notice, file_path, line_id))
+
+    return abbreviations.to_list()
+
+
+def find_long_notice_in_window(text: str, short_notice_pos: int, short_notice: str, window: int,
+                               rules=DEFAULT_ABBREVIATION_RULES):
+    """
+    Find long notice for the abbreviation in a window of characters before the abbreviation.
+    Unlike the line engine, the window is not limited to the current and the previous line
+    :param text: text with abbreviation
+    :param short_notice_pos: position of short notice of the abbreviation in the text
+    :param short_notice: short notice of abbreviation, e.g., BBC
+    :param window: number of characters before the abbreviation, where
+        the long notice of the abbreviation is searched
+    :param rules: compiled rules of abbreviations classification (AbbreviationRules)
+    :return: long notice of abbreviation, e.g., British Broadcasting Corporation
+    """
+    window_start = max(0, short_notice_pos - window)
+
+    # the window should not start in the middle of a word
+    if window_start > 0 and not text[window_start - 1].isspace():
+        while window_start < short_notice_pos and not text[window_start].isspace():
+            window_start += 1
+
+    short_notice_letters = get_short_notice_letters(short_notice, rules)
+    return search_substring_for_long_notice(text[window_start:short_notice_pos], short_notice_letters)
@@ -0,0 +1,165 @@
+"""
+Compact store of abbreviations search results. Every found abbreviation is kept as a row of integer columns:
+file id, line number, short notice id and long notice id. File paths and notices are stored once, in interned
+tables, and the columns are backed by arrays, so an abbreviation takes 16 bytes instead of an Abbreviation object.
+Rows are grouped by input file, so that the results of a file can be replaced, when the file is scanned again.
+Abbreviation objects (views) are only created, when the results are read, e.g., when they are merged
+"""
+import sys
+from array import array
+
+# local imports
+from Abbreviation import Abbreviation, AbbreviationRegistry
+
+# id of a missing value (file, line or long notice)
+MISSING_ID = -1
+
+
+class ResultStore:
+    """
+    Compact column store of abbreviations, found in the input files
+    Attributes:
+        paths: list of distinct file paths, indexed by file id
+        path_ids: dictionary with key = file path, value = file id
+        notices: list of distinct (interned) short and long notices, indexed by notice id
+        notice_ids: dictionary with key = notice, value = notice id
+        file_ids: array of file ids of the abbreviations (MISSING_ID, if the file is unknown)
+        lines: array of line numbers of the abbreviations (MISSING_ID, if the line is unknown)
+        short_ids: array of notice ids of short notices of the abbreviations
+        long_ids: array of notice ids of long notices of the abbreviations (MISSING_ID, if not found)
+        file_rows: dictionary with key = path to input file, value = [first row, number of rows] of the results
+            of the file. Results of the files are stored in the order of the dictionary
+    """
+    def __init__(self):
+        self.paths = []
+        self.path_ids = {}
+        self.notices = []
+        self.notice_ids = {}
+        self.file_ids = array("i")
+        self.lines = array("i")
+        self.short_ids = array("i")
+        self.long_ids = array("i")
+        self.file_rows = {}
+
+    def add_abbreviations(self, file_path, abbreviations):
+        """
+        Add abbreviations found in an input file. Previous results of the file are replaced
+        :param file_path: path to input file
+        :param abbreviations: abbreviations found in the file. For an archive, abbreviations
+            of all the archive members, which keep the paths of the members
+        """
+        self.remove_file(file_path)
+        first_row = len(self.short_ids)
+        for abbreviation in abbreviations:
+            self.add_row(abbreviation.short, abbreviation.long, abbreviation.file, abbreviation.line)
+        self.file_rows[file_path] = [first_row, len(self.short_ids) - first_row]
+
+    def add_records(self, file_path, records):
+        """
+        Add abbreviations found in an input file, without creating abbreviation objects.
+        Previous results of the file are replaced
+        :param file_path: path to input file
+        :param records: compact records (short, long, line) of abbreviations found in the file
+        """
+        self.remove_file(file_path)
+        first_row = len(self.short_ids)
+        for short, long, line in records:
+            self.add_row(short, long, file_path, line)
+        self.file_rows[file_path] = [first_row, len(self.short_ids) - first_row]
+
+    def add_row(self, short, long, file, line):
+        self.file_ids.append(MISSING_ID if file is None else self.get_path_id(file))
+        self.lines.append(MISSING_ID if line is None else line)
+        self.short_ids.append(self.get_notice_id(short))
+        self.long_ids.append(MISSING_ID if long is None else self.get_notice_id(long))
+
+    def remove_file(self, file_path):
+        """
+        Remove results of an input file. Paths and notices stay in the tables, so that they can be reused
+        :param file_path: path to input file
+        :return: True, if the store contained results of the file and False otherwise
+        """
+        rows = self.file_rows.pop(file_path, None)
+        if rows is None:
+            return False
+        first_row, count = rows
+        if count > 0:
+            for column in (self.file_ids, self.lines, self.short_ids, self.long_ids):
+                del column[first_row:first_row + count]
+            for other_rows in self.file_rows.values():
+                if other_rows[0] > first_row:
+                    other_rows[0] -= count
+        return True
+
+    def get_path_id(self, path):
+        path_id = self.path_ids.get(path)
+        if path_id is None:
+            path_id = len(self.paths)
+            self.paths.append(path)
+            self.path_ids[path] = path_id
+        return path_id
+
+    def get_notice_id(self, notice):
+        notice_id = self.notice_ids.get(notice)
+        if notice_id is None:
+            notice_id = len(self.notices)
+            notice = sys.intern(notice)
+            self.notices.append(notice)
+            self.notice_ids[notice] = notice_id
+        return notice_id
+
+    def get_abbreviation(self, row):
+        """
+        Materialize a row as an abbreviation
+        :param row: index of the row
+        :return: abbreviation (a new object, which is not kept by the store)
+        """
+        file_id = self.file_ids[row]
+        line = self.lines[row]
+        long_id = self.long_ids[row]
+        return Abbreviation(self.notices[self.short_ids[row]],
+                            None if long_id == MISSING_ID else self.notices[long_id],
+                            None if file_id == MISSING_ID else self.paths[file_id],
+                            None if line == MISSING_ID else line)
+
+    def get_file_abbreviations(self, file_path):
+        """
+        Get abbreviations found in an input file
+        :param file_path: path to input file
+        :return: list of abbreviations (new objects) or an empty list, if the store has no results of the file
+        """
+        rows = self.file_rows.get(file_path)
+        if rows is None:
+            return []
+        first_row, count = rows
+        return [self.get_abbreviation(row) for row in range(first_row, first_row + count)]
+
+    def get_files(self):
+        return list(self.file_rows.keys())
+
+    def merge(self, registry=None):
+        """
+        Merge the abbreviations, as abbreviations found in the input files are merged.
+        Abbreviations without long notice, which cannot change the registry, are skipped
+        without creating abbreviation objects
+        :param registry: registry (AbbreviationRegistry), where the abbreviations are merged.
+            If None, a new registry is created
+        :return: registry with merged abbreviations
+        """
+        if registry is None:
+            registry = AbbreviationRegistry()
+        seen_short_ids = set()
+        long_ids = self.long_ids
+        for row, short_id in enumerate(self.short_ids):
+            if long_ids[row] == MISSING_ID and short_id in seen_short_ids:
+                continue
+            seen_short_ids.add(short_id)
+            registry.add_or_replace(self.get_abbreviation(row))
+        return registry
+
+    def __len__(self):
+        return len(self.short_ids)
+
+    def __iter__(self):
+        for row in range(len(self.short_ids)):
+            yield self.get_abbreviation(row)
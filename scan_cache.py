@@ -0,0 +1,239 @@
+import os
+import json
+import hashlib
+
+# local imports
+from json_converters.abbreviations_to_json import save_as_json
+
+CACHE_FORMAT_VERSION = 2
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class ScanCache:
+    """
+    On-disk cache of abbreviations search results. For every scanned file
+    the cache stores the file fingerprint (size, modification time and
+    content hash) together with the compact records (short, long, line)
+    of abbreviations found in the file. Files with unchanged fingerprint
+    are not read and parsed again.
+    Attributes:
+        cache_path: path to the .json file, where the cache is stored
+        options_signature: signature of the abbreviations search options.
+            Results, cached with other options, are not used
+        max_entries: max number of files, which results are kept in the cache
+        entries: dictionary with key = absolute file path, value = cache entry
+        run_id: id of the current run. Used to evict the least recently used entries
+        hits: number of files, which results were taken from the cache
+        misses: number of files, which had to be (re-)scanned
+        evicted: number of entries, evicted from the cache
+        run_files: set of keys of the files, looked up in the cache during the current run
+        scan_fingerprints: dictionary with key = key of a file, missing in the cache, value = (size,
+            modification time) of the file, taken before the file is scanned, or None, if the file cannot be accessed
+        merged: summary of the merged abbreviations of the last run: dictionary with the digest of the
+            input files ("files"), the digest of the merged definitions ("definitions") and the merge
+            policy ("policy") or None
+    """
+    def __init__(self, cache_path, options_signature=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_path = cache_path
+        self.options_signature = options_signature
+        self.max_entries = max_entries
+        self.entries = {}
+        self.run_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.run_files = set()
+        self.scan_fingerprints = {}
+        self.merged = None
+
+    def load(self):
+        """
+        Load cache from the disk. If the cache file does not exist, cannot be parsed
+        or was created with different abbreviations search options, the cache stays empty
+        """
+        if not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cache_json = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache_json.get("version") != CACHE_FORMAT_VERSION:
+            return
+        if cache_json.get("options") != self.options_signature:
+            return
+        self.entries = cache_json.get("files", {})
+        self.merged = cache_json.get("merged")
+        self.run_id = cache_json.get("run", 0) + 1
+
+    def save(self):
+        """
+        Evict outdated entries and save cache to the disk
+        """
+        self.evict()
+        cache_json = {"version": CACHE_FORMAT_VERSION,
+                      "options": self.options_signature,
+                      "run": self.run_id,
+                      "files": self.entries,
+                      "merged": self.merged}
+        save_as_json(self.cache_path, cache_json, pretty_printing=False)
+
+    def lookup(self, file_path):
+        """
+        Find cached abbreviations search results for a file
+        :param file_path: path to the file
+        :return: list of records (short, long, line) of abbreviations, found in the file,
+            if the file has not changed since it was cached and None otherwise
+        """
+        key = os.path.abspath(file_path)
+        self.run_files.add(key)
+        entry = self.get_unchanged_entry(file_path)
+        if entry is None:
+            self.misses += 1
+            # the file is scanned after the lookup, so its fingerprint is taken before the file is read
+            self.scan_fingerprints[key] = get_file_fingerprint(file_path)
+            return None
+        entry["used"] = self.run_id
+        self.hits += 1
+        return entry["records"]
+
+    def is_unchanged(self, file_path):
+        """
+        Check if a file has not changed since it was cached. Unlike lookup(), the check
+        is not counted in the cache statistics and does not mark the file as visited by the run
+        :param file_path: path to the file
+        :return: True, if the file has not changed since it was cached and False otherwise
+        """
+        return self.get_unchanged_entry(file_path) is not None
+
+    def get_unchanged_entry(self, file_path):
+        """
+        Get cache entry of a file, if the file has not changed since it was cached
+        :param file_path: path to the file
+        :return: cache entry or None
+        """
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None:
+            return None
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        # the file has changed, if its size has changed
+        if stat.st_size != entry["size"]:
+            return None
+
+        # the file has not changed, if its size and modification time are the same,
+        # otherwise the file content should be compared
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            if get_file_content_hash(file_path) != entry["hash"]:
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return entry
+
+    def store(self, file_path, records):
+        """
+        Store abbreviations search results for a file. If the file was looked up in the cache
+        and has changed since then, e.g., it was edited while it was scanned, the results may
+        not match the file content, so they are not stored and the file is scanned again in the next run
+        :param file_path: path to the file
+        :param records: list of records (short, long, line) of abbreviations, found in the file
+        """
+        key = os.path.abspath(file_path)
+        try:
+            # the content hash is taken before the fingerprint, so that changes
+            # of the file during the hashing are also detected
+            content_hash = get_file_content_hash(file_path)
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        if key in self.scan_fingerprints and self.scan_fingerprints.pop(key) != (stat.st_size, stat.st_mtime_ns):
+            return
+        self.entries[key] = {"size": stat.st_size,
+                             "mtime_ns": stat.st_mtime_ns,
+                             "hash": content_hash,
+                             "used": self.run_id,
+                             "records": [list(record) for record in records]}
+
+    def set_merged(self, definitions_digest, policy):
+        """
+        Save summary of the merged abbreviations of the current run
+        :param definitions_digest: digest of the merged definitions
+        :param policy: merge policy
+        """
+        self.merged = {"files": self.get_run_files_digest(), "definitions": definitions_digest, "policy": policy}
+
+    def is_merged_unchanged(self, definitions_digest, policy, file_paths=None):
+        """
+        Check if the merged abbreviations of the last run had the definitions digest, and the
+        current run visits the same files
+        :param definitions_digest: digest of the merged definitions
+        :param policy: merge policy
+        :param file_paths: paths to the files of the current run. If None, the files, which were
+            looked up in the cache during the current run, are used
+        :return: True, if the merged abbreviations have not changed and False otherwise
+        """
+        return self.merged == {"files": self.get_run_files_digest(file_paths), "definitions": definitions_digest,
+                               "policy": policy}
+
+    def get_run_files_digest(self, file_paths=None):
+        run_files = self.run_files if file_paths is None else set(os.path.abspath(path) for path in file_paths)
+        return hashlib.sha1("\n".join(sorted(run_files)).encode("utf-8")).hexdigest()
+
+    def evict(self):
+        """
+        Evict entries for files that no longer exist. If the cache is still larger
+        than its max size, evict the least recently used entries
+        """
+        for key in [key for key in self.entries.keys() if not os.path.isfile(key)]:
+            del self.entries[key]
+            self.evicted += 1
+
+        extra_entries = len(self.entries) - self.max_entries
+        if extra_entries > 0:
+            keys_by_use = sorted(self.entries.keys(), key=lambda k: self.entries[k]["used"])
+            for key in keys_by_use[:extra_entries]:
+                del self.entries[key]
+                self.evicted += 1
+
+    def print_stats(self):
+        print("Scan cache", self.cache_path + ":", self.hits, "hits,", self.misses, "misses,",
+              self.evicted, "evicted,", len(self.entries), "entries")
+
+
+def get_default_cache_path(output_path):
+    """
+    Get default path to the scan cache: the cache is stored next to the output file
+    :param output_path: path to output JSON file with abbreviations
+    :return: path to the scan cache file
+    """
+    output_dir, output_file = os.path.split(output_path)
+    return os.path.join(output_dir, "." + output_file + ".cache")
+
+
+def get_file_fingerprint(file_path):
+    """
+    Get fingerprint of the file, which changes, when the file is modified
+    :param file_path: path to the file
+    :return: tuple (size, modification time) of the file or None, if the file cannot be accessed
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def get_file_content_hash(file_path):
+    """
+    Get hash of the file content
+    :param file_path: path to the file
+    :return: hex digest of the file content
+    """
+    content_hash = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
@@ -0,0 +1,151 @@
+"""
+Client of the abbreviations scan server (see scan_server.py). The client keeps a single connection
+to the server and sends requests one after another. Example:
+    from scan_client import ScanClient
+    with ScanClient(socket_path="/tmp/abbr.sock") as client:
+        report = client.scan("intro.tex", "the existing Deep Learning (DL) frameworks")
+        # {'path': 'intro.tex', 'defined': [{'short': 'DL', 'long': 'Deep Learning ', ...}], 'undefined': []}
+Command line:
+    python scan_client.py --socket /tmp/abbr.sock scan intro.tex
+    cat intro.tex | python scan_client.py --socket /tmp/abbr.sock scan intro.tex --stdin
+"""
+import sys
+import json
+import socket
+
+DEFAULT_HOST = "127.0.0.1"
+
+
+class ScanClient:
+    """
+    Client of the abbreviations scan server
+    Attributes:
+        socket_path: path to Unix domain socket of the server or None, if the server listens on a TCP port
+        host: host of the TCP port
+        port: TCP port of the server
+        timeout: timeout of the connection and of every request, in seconds, or None
+        connection: connected socket or None
+        stream: file-like object, reading the responses
+        next_id: id of the next request
+    """
+    def __init__(self, socket_path=None, host=DEFAULT_HOST, port=None, timeout=None):
+        if socket_path is None and port is None:
+            raise Exception("Either socket path or TCP port should be specified")
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connection = None
+        self.stream = None
+        self.next_id = 0
+
+    def connect(self):
+        if self.socket_path is not None:
+            self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.connection.settimeout(self.timeout)
+            self.connection.connect(self.socket_path)
+        else:
+            self.connection = socket.create_connection((self.host, self.port), self.timeout)
+            # requests are small and answered one by one, so they should not wait to be merged with other packets
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.connection.makefile("rb")
+
+    def close(self):
+        if self.connection is not None:
+            self.stream.close()
+            self.connection.close()
+            self.connection = None
+            self.stream = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def request(self, operation, **fields):
+        """
+        Send a request to the server and wait for the response
+        :param operation: operation (one of scan_server.OPERATIONS)
+        :param fields: additional fields of the request, e.g., path and text
+        :return: response (dictionary) without the request id
+        """
+        if self.connection is None:
+            self.connect()
+        self.next_id += 1
+        request = {"id": self.next_id, "op": operation}
+        request.update(fields)
+        self.connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        line = self.stream.readline()
+        if not line:
+            raise Exception("Connection closed by the server")
+        response = json.loads(line)
+        if "error" in response:
+            raise Exception("Scan server error: " + response["error"])
+        response.pop("id", None)
+        return response
+
+    def scan(self, path, text=None):
+        """
+        Scan a document
+        :param path: path (name) of the document
+        :param text: text of the document (e.g., the editor buffer). If None, the server reads the file from the disk
+        :return: dictionary with the "path" of the document and the lists of "defined" and "undefined" abbreviations
+        """
+        if text is None:
+            return self.request("scan", path=path)
+        return self.request("scan", path=path, text=text)
+
+    def query(self, path):
+        return self.request("query", path=path)
+
+    def forget(self, path):
+        return self.request("forget", path=path)["forgotten"]
+
+    def get_definitions(self):
+        return self.request("definitions")["abbreviations"]
+
+    def get_stats(self):
+        return self.request("stats")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='The script sends requests to the abbreviations scan server '
+                                                 'and prints the responses as JSON lines.')
+    parser.add_argument('--socket', type=str, action='store', default=None,
+                        help='path to Unix domain socket of the server')
+    parser.add_argument('--host', type=str, action='store', default=DEFAULT_HOST, help='host of the TCP port')
+    parser.add_argument('--port', type=int, action='store', default=None,
+                        help='TCP port of the server. Used, if --socket is not specified')
+    parser.add_argument('op', type=str, choices=["scan", "query", "forget", "definitions", "stats"],
+                        help='request: scan or query documents, forget documents, '
+                             'get merged abbreviations (definitions) or server statistics (stats)')
+    parser.add_argument('paths', type=str, nargs='*', help='paths (names) of the documents')
+    parser.add_argument('--stdin', help="scan only: read text of the (single) document from stdin, "
+                                        "e.g., an unsaved editor buffer",
+                        action="store_true", default=False)
+    args = parser.parse_args()
+
+    try:
+        with ScanClient(args.socket, args.host, args.port) as client:
+            if args.op in ["definitions", "stats"]:
+                responses = [client.request(args.op)]
+            elif args.op == "scan" and args.stdin:
+                if len(args.paths) != 1:
+                    raise Exception("A single document path is expected with --stdin")
+                responses = [client.scan(args.paths[0], sys.stdin.read())]
+            else:
+                responses = [client.request(args.op, path=path) for path in args.paths]
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    for response in responses:
+        print(json.dumps(response))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+ENGINES = ["line", "regex", "bytes"]
+DEFAULT_WINDOW = 300
+# input files are decoded as UTF-8. Files, which are not valid UTF-8
+# (e.g., legacy theses), are decoded as Latin-1
+DEFAULT_ENCODINGS = ("utf-8", "latin-1")
+
+
+class ScanOptions:
+    """
+    Options of abbreviations search in the input files.
+    The options are passed to the worker processes, when the input files
+    are scanned in parallel, so they should only hold picklable values
+    Attributes:
+        lookback: number of previous lines, where the long notice of an abbreviation is searched
+        engine: abbreviations search engine: "line" (visit input files line-by-line),
+            "regex" (visit every input file as a whole in a single pass) or
+            "bytes" (visit raw bytes of every input file and only decode text around candidates)
+        window: regex engine only: number of characters before the abbreviation,
+            where the long notice of the abbreviation is searched
+        latex_aware: flag. If True, comments, verbatim environments and math are
+            skipped, and only prose is searched for abbreviations. Not supported by the bytes engine
+        encodings: encodings of input files, tried one after another, until a file is decoded
+        member_extensions: extensions of archive members, which are searched for abbreviations,
+            when input files are packed into archives. If None, all archive members are searched
+        rules: abbreviations classification rules configuration (see abbreviation_rules.py).
+            If None, default rules are used
+    """
+    def __init__(self, lookback=1, engine="line", window=DEFAULT_WINDOW, latex_aware=False,
+                 encodings=DEFAULT_ENCODINGS, member_extensions=None, rules=None):
+        if engine not in ENGINES:
+            raise Exception("Unknown abbreviations search engine: " + str(engine) + ". Expected one of " + str(ENGINES))
+        if engine == "bytes" and latex_aware:
+            raise Exception("LaTeX-aware search is not supported by the bytes engine")
+        if len(encodings) == 0:
+            raise Exception("At least one input files encoding is expected")
+        self.lookback = lookback
+        self.engine = engine
+        self.window = window
+        self.latex_aware = latex_aware
+        self.encodings = tuple(encodings)
+        self.member_extensions = None if member_extensions is None else tuple(member_extensions)
+        self.rules = rules
+
+    def signature(self):
+        """
+        Get signature of the options. Results of abbreviations search, obtained
+        with options of different signatures, should not be mixed
+        :return: signature of the options: dictionary with key = option name, value = option value
+        """
+        return {"lookback": self.lookback, "engine": self.engine, "window": self.window,
+                "latex_aware": self.latex_aware, "encodings": list(self.encodings),
+                "member_extensions": None if self.member_extensions is None else list(self.member_extensions),
+                "rules": self.rules}
@@ -0,0 +1,244 @@
+"""
+Profiler of abbreviations search. When the profiler is installed, it replaces the
+functions of abbreviations search stages with instrumented wrappers, which measure
+wall time and count processed items. When the profiler is not installed, the original
+functions are called directly, so profiling costs nothing
+"""
+import sys
+import time
+
+# local imports
+from json_converters.abbreviations_to_json import save_as_json
+
+# stages, which wall time is measured: (stage, description)
+STAGES = [("discovery", "input files discovery"),
+          ("reading", "input files reading"),
+          ("prefilter", "bracket prefilter (has_two_round_brackets)"),
+          ("regex", "regex candidates search (find_substrings_in_round_brackets)"),
+          ("is_abbreviation", "candidates classification (is_abbreviation)"),
+          ("long_notice", "long notice search (search_substring_for_long_notice)"),
+          ("merge", "abbreviations merge (add_or_replace_abbreviation)"),
+          ("json", "output writing (abbreviations_to_json)")]
+
+# counters: (counter, description)
+COUNTERS = [("files", "scanned files"),
+            ("cached_files", "files, taken from the scan cache"),
+            ("lines_read", "lines read"),
+            ("candidate_lines", "lines with two round brackets"),
+            ("regex_candidates", "substrings in round brackets"),
+            ("rejected_candidates", "candidates, rejected by is_abbreviation"),
+            ("long_notice_resolved", "successful long notice searches"),
+            ("long_notice_failed", "failed long notice searches"),
+            ("replacements", "replaced abbreviations")]
+
+# stages and counters, which are not measured with an engine: the regex and bytes engines
+# do not read the input files line by line and search the whole text with a single regex
+NOT_APPLICABLE = {"line": [],
+                  "regex": ["reading", "prefilter", "regex", "lines_read", "candidate_lines"],
+                  "bytes": ["reading", "prefilter", "regex", "lines_read", "candidate_lines"]}
+
+# modules, which functions are instrumented, in addition to the module that installs the profiler
+INSTRUMENTED_MODULES = ["main", "regex_scanner", "byte_scanner"]
+
+
+class ScanProfiler:
+    """
+    Per-stage wall time and counters of abbreviations search
+    Attributes:
+        engine: abbreviations search engine (one of ENGINES)
+        totals: dictionary with key = counter or stage time name, value = total value
+        files: dictionary with key = file path, value = dictionary of the file counters and stage times
+        current_file: counters of the currently scanned file or None
+        start_time: time, when the profiler was installed
+        end_time: time, when the profiling was over
+    """
+    def __init__(self, engine="line"):
+        self.engine = engine
+        self.totals = {}
+        self.files = {}
+        self.current_file = None
+        self.start_time = None
+        self.end_time = None
+
+    def add(self, name, value=1, per_file=True):
+        """
+        Add value to a counter or stage time
+        :param name: name of the counter or stage time
+        :param value: value to add
+        :param per_file: flag. If True, the value is also added to the counters of the currently scanned file
+        """
+        self.totals[name] = self.totals.get(name, 0) + value
+        if per_file and self.current_file is not None:
+            self.current_file[name] = self.current_file.get(name, 0) + value
+
+    def start_file(self, file_path, counter="files"):
+        self.current_file = self.files.setdefault(file_path, {})
+        self.add(counter)
+
+    def install(self, module):
+        """
+        Instrument abbreviations search functions
+        :param module: module, which installs the profiler (e.g., the __main__ module)
+        """
+        self.start_time = time.perf_counter()
+        # importing the modules here ensures that later "from main import ..."
+        # statements obtain the instrumented functions
+        import main
+        modules = [module, main] + [sys.modules[name] for name in INSTRUMENTED_MODULES if name in sys.modules]
+        for instrumented_module in modules:
+            self.instrument_module(instrumented_module)
+
+    def instrument_module(self, module):
+        """
+        Replace abbreviations search functions of a module with instrumented wrappers
+        :param module: module
+        """
+        profiler = self
+
+        def count_prefilter(result):
+            if result:
+                profiler.add("candidate_lines")
+
+        def count_regex_candidates(result):
+            profiler.add("regex_candidates", len(result))
+
+        # the regex and bytes engines pass every substring in round brackets to is_abbreviation
+        count_candidates = profiler.engine != "line"
+
+        def count_rejected(result):
+            if count_candidates:
+                profiler.add("regex_candidates")
+            if not result:
+                profiler.add("rejected_candidates")
+
+        def count_long_notice(result):
+            profiler.add("long_notice_failed" if result is None else "long_notice_resolved")
+
+        def count_replacements(result):
+            if result:
+                profiler.add("replacements")
+
+        def start_scanned_file(file_path, *args, **kwargs):
+            profiler.start_file(file_path)
+
+        def start_archive_member(data, member_path, *args, **kwargs):
+            profiler.start_file(member_path)
+
+        def start_cached_file(file_path, *args, **kwargs):
+            profiler.start_file(file_path, "cached_files")
+
+        wrappers = {"has_two_round_brackets": lambda f: self.timed(f, "prefilter", count_prefilter),
+                    "find_substrings_in_round_brackets": lambda f: self.timed(f, "regex", count_regex_candidates),
+                    "is_abbreviation": lambda f: self.timed(f, "is_abbreviation", count_rejected),
+                    "search_substring_for_long_notice": lambda f: self.timed(f, "long_notice", count_long_notice),
+                    "add_or_replace_abbreviation": lambda f: self.timed(f, "merge", count_replacements),
+                    "abbreviations_to_json": lambda f: self.timed(f, "json", per_file=False),
+                    "iterate_lines_with_lookback": lambda f: self.timed_generator(f, "reading", "lines_read"),
+                    "iterate_input_file_paths": lambda f: self.timed_generator(f, "discovery", per_file=False),
+                    "find_abbreviations_in_file": lambda f: self.before(f, start_scanned_file),
+                    "find_abbreviations_in_archive_member": lambda f: self.before(f, start_archive_member),
+                    "get_cached_file_abbreviations": lambda f: self.before(f, start_cached_file)}
+
+        for name, wrap in wrappers.items():
+            function = getattr(module, name, None)
+            if function is None or getattr(function, "instrumented", False):
+                continue
+            wrapper = wrap(function)
+            wrapper.instrumented = True
+            setattr(module, name, wrapper)
+
+    def timed(self, function, stage, count=None, per_file=True):
+        """
+        Wrap function so that its wall time is added to the stage time
+        :param function: function
+        :param stage: stage name
+        :param count: function, that updates counters with the function result (optional)
+        :param per_file: flag. If True, the stage time is also added to the currently scanned file
+        :return: wrapper of the function
+        """
+        perf_counter = time.perf_counter
+        stage_time = stage + "_seconds"
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            self.add(stage_time, perf_counter() - start, per_file)
+            if count is not None:
+                count(result)
+            return result
+        return wrapper
+
+    def timed_generator(self, function, stage, counter=None, per_file=True):
+        """
+        Wrap generator function so that the time of obtaining every item is added to the stage time
+        :param function: generator function
+        :param stage: stage name
+        :param counter: counter of obtained items (optional)
+        :param per_file: flag. If True, the stage time is also added to the currently scanned file
+        :return: wrapper of the generator function
+        """
+        perf_counter = time.perf_counter
+        stage_time = stage + "_seconds"
+
+        def wrapper(*args, **kwargs):
+            iterator = iter(function(*args, **kwargs))
+            while True:
+                start = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    self.add(stage_time, perf_counter() - start, per_file)
+                    return
+                self.add(stage_time, perf_counter() - start, per_file)
+                if counter is not None:
+                    self.add(counter, 1, per_file)
+                yield item
+        return wrapper
+
+    @staticmethod
+    def before(function, callback):
+        """
+        Wrap function so that a callback is called with the function arguments before the function
+        :param function: function
+        :param callback: callback
+        :return: wrapper of the function
+        """
+        def wrapper(*args, **kwargs):
+            callback(*args, **kwargs)
+            return function(*args, **kwargs)
+        return wrapper
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+        self.current_file = None
+
+    def is_applicable(self, name):
+        return name not in NOT_APPLICABLE.get(self.engine, [])
+
+    def to_json(self):
+        """
+        Represent profiling results as a dictionary
+        :return: profiling results (dictionary). Stages and counters, which are not measured
+            with the engine, are listed as "not_applicable"
+        """
+        return {"engine": self.engine,
+                "total_seconds": None if self.end_time is None else self.end_time - self.start_time,
+                "totals": self.totals,
+                "not_applicable": NOT_APPLICABLE.get(self.engine, []),
+                "files": self.files}
+
+    def save(self, filepath):
+        save_as_json(filepath, self.to_json())
+
+    def print_report(self):
+        print("Profile:")
+        if self.end_time is not None:
+            print("  {:<62} {:>12.4f} s".format("total", self.end_time - self.start_time))
+        for stage, description in STAGES:
+            if not self.is_applicable(stage):
+                print("  {:<62} {:>14}".format(description, "n/a"))
+                continue
+            print("  {:<62} {:>12.4f} s".format(description, self.totals.get(stage + "_seconds", 0)))
+        for counter, description in COUNTERS:
+            print("  {:<62} {:>12}".format(description, self.totals.get(counter, 0) if self.is_applicable(counter)
+                                           else "n/a"))
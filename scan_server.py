@@ -0,0 +1,391 @@
+"""
+Long-running abbreviations scan server, e.g., for editor integrations, which ask for defined and undefined
+abbreviations of a buffer on every save. The server keeps abbreviations found in every document, the merged
+abbreviations of all the documents and the compiled classification rules in memory, so that a single buffer
+is scanned and answered in milliseconds. Documents, which were not scanned or queried for the longest time,
+are evicted, when the number of kept documents exceeds the limit.
+The server listens on a Unix domain socket or on a localhost TCP port and serves concurrent clients with asyncio.
+Requests and responses are JSON objects, one per line (JSON lines). Responses of a connection are sent
+in the order of its requests:
+    {"id": 1, "op": "scan", "path": "intro.tex", "text": "..."}   scan the buffer ("text") of a document.
+                                                                  If "text" is missing, the file is read from the disk
+    {"id": 2, "op": "query", "path": "intro.tex"}                 answer from the kept abbreviations of a document
+    {"id": 3, "op": "forget", "path": "intro.tex"}                remove a document (e.g., when it is closed)
+    {"id": 4, "op": "definitions"}                                merged abbreviations of all the kept documents
+    {"id": 5, "op": "stats"}                                      number of documents, requests and evictions
+Response to scan and query:
+    {"id": 1, "path": "intro.tex",
+     "defined": [{"short": "DL", "long": "Deep Learning ", "file": "intro.tex", "line": 0}],
+     "undefined": [{"short": "CNN", "file": "intro.tex", "line": 3}]}
+Failed requests get an "error" field instead. Example:
+    python scan_server.py --socket /tmp/abbr.sock
+"""
+import os
+import sys
+import json
+import asyncio
+import re
+import stat
+from collections import OrderedDict
+
+# local imports
+from Abbreviation import AbbreviationRegistry, MERGE_POLICIES
+from scan_options import ScanOptions, DEFAULT_WINDOW, DEFAULT_ENCODINGS
+from abbreviations_api import AbbreviationsScanner
+from archive_reader import decode_member
+from json_converters.abbreviations_to_json import abbreviation_to_dict
+
+DEFAULT_HOST = "127.0.0.1"
+# max number of documents, kept by the server
+DEFAULT_MAX_DOCUMENTS = 1000
+# max size of a request (a line), in bytes
+DEFAULT_MAX_REQUEST_SIZE = 64 * 1024 * 1024
+# requests, served by the server
+OPERATIONS = ["scan", "query", "forget", "definitions", "stats"]
+# words with capital letters, which may be uses of abbreviations
+WORD_PATTERN = re.compile("(?<![A-Za-z0-9_])[A-Za-z0-9_]*[A-Z][A-Za-z0-9_]*")
+
+
+class Document:
+    """
+    Abbreviations search results of a document, kept by the server
+    Attributes:
+        abbreviations: abbreviations found in the document
+        words: frozen set of words with capital letters in the document, i.e., possible uses of abbreviations
+    """
+    __slots__ = ("abbreviations", "words")
+
+    def __init__(self, abbreviations, words):
+        self.abbreviations = abbreviations
+        self.words = words
+
+    def get_definitions(self):
+        return [(a.short, a.long, a.line) for a in self.abbreviations]
+
+
+class ScanServer:
+    """
+    Abbreviations scan server
+    Attributes:
+        options: abbreviations search options (ScanOptions). The bytes engine is not supported
+        scanner: abbreviations scanner (AbbreviationsScanner), set up once for all the requests
+        rules: compiled rules of abbreviations classification (AbbreviationRules) of the scanner,
+            compiled once for all the requests
+        policy: merge policy of abbreviations, defined with different long notices (one of MERGE_POLICIES)
+        max_documents: max number of documents, kept by the server
+        documents: dictionary with key = document path, value = document (Document). Documents are kept
+            in the order of their scans, and their abbreviations are merged in this order
+        last_access: dictionary with key = document path, value = None, in the order of the last
+            scan or query of the document (least recently used first)
+        registry: merged abbreviations of all the documents (AbbreviationRegistry)
+        registry_stale: flag. If True, the registry should be merged again before it is used
+        requests: number of served requests
+        evictions: number of evicted documents
+        verbose: flag. If True, print details
+    """
+    def __init__(self, options=None, policy="latest", max_documents=DEFAULT_MAX_DOCUMENTS, verbose=False):
+        self.options = ScanOptions() if options is None else options
+        self.scanner = AbbreviationsScanner(self.options)
+        self.rules = self.scanner.rules
+        self.policy = policy
+        self.max_documents = max_documents
+        self.documents = OrderedDict()
+        self.last_access = OrderedDict()
+        self.registry = AbbreviationRegistry(policy=policy)
+        self.registry_stale = False
+        self.requests = 0
+        self.evictions = 0
+        self.verbose = verbose
+
+    def handle_request(self, request):
+        """
+        Serve a request
+        :param request: request (dictionary) with the "op" field (one of OPERATIONS)
+        :return: response (dictionary)
+        """
+        self.requests += 1
+        operation = request.get("op")
+        if operation == "scan":
+            response = self.scan(get_request_path(request), request.get("text"))
+        elif operation == "query":
+            response = self.query(get_request_path(request))
+        elif operation == "forget":
+            response = {"path": request.get("path"), "forgotten": self.forget(get_request_path(request))}
+        elif operation == "definitions":
+            response = {"abbreviations": [abbreviation_to_dict(a) for a in self.get_registry()]}
+        elif operation == "stats":
+            response = self.get_stats()
+        else:
+            raise Exception("Unknown operation: " + str(operation) + ". Expected one of " + str(OPERATIONS))
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def handle_line(self, line):
+        """
+        Serve a request, received as a JSON line
+        :param line: JSON line (bytes)
+        :return: response (dictionary). Failed requests get an "error" field
+        """
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise Exception("Request should be a JSON object")
+            return self.handle_request(request)
+        except Exception as e:
+            if self.verbose:
+                print("Request error: " + str(e))
+            response = {"error": str(e)}
+            if isinstance(request, dict) and "id" in request:
+                response["id"] = request["id"]
+            return response
+
+    def scan(self, path, text=None):
+        """
+        Scan a document and keep its abbreviations
+        :param path: path (name) of the document
+        :param text: text of the document (e.g., the editor buffer). If None, the file is read from the disk
+        :return: defined and undefined abbreviations of the document (see get_document_report())
+        """
+        if text is None:
+            with open(path, "rb") as f:
+                text = decode_member(f.read(), self.options.encodings)
+        document = Document(self.scanner.find_abbreviations(path, text), frozenset(WORD_PATTERN.findall(text)))
+
+        previous_document = self.documents.get(path)
+        if previous_document is None:
+            self.documents[path] = document
+            # a new document is merged last, so the merged abbreviations are updated without merging again
+            if not self.registry_stale:
+                for abbreviation in document.abbreviations:
+                    self.registry.add_or_replace(abbreviation)
+        elif previous_document.get_definitions() == document.get_definitions():
+            # e.g., the buffer is saved again without changes of abbreviations: the document keeps its position
+            self.documents[path] = document
+        else:
+            # the latest scanned document is merged last
+            del self.documents[path]
+            self.documents[path] = document
+            self.registry_stale = True
+
+        self.touch(path)
+        self.evict_idle_documents()
+        return self.get_document_report(path, document)
+
+    def query(self, path):
+        """
+        Get defined and undefined abbreviations of a kept document without scanning it again
+        :param path: path (name) of the document
+        :return: defined and undefined abbreviations of the document (see get_document_report())
+        """
+        document = self.documents.get(path)
+        if document is None:
+            raise Exception("Unknown document: " + str(path) + ". Scan the document first")
+        self.touch(path)
+        return self.get_document_report(path, document)
+
+    def forget(self, path):
+        """
+        Remove a document
+        :param path: path (name) of the document
+        :return: True, if the document was kept and False otherwise
+        """
+        document = self.documents.pop(path, None)
+        if document is None:
+            return False
+        del self.last_access[path]
+        if len(document.abbreviations) > 0:
+            self.registry_stale = True
+        return True
+
+    def touch(self, path):
+        self.last_access[path] = None
+        self.last_access.move_to_end(path)
+
+    def evict_idle_documents(self):
+        """
+        Remove the least recently used documents, while there are more documents than the limit
+        """
+        while len(self.documents) > self.max_documents:
+            path, _ = self.last_access.popitem(last=False)
+            document = self.documents.pop(path)
+            if len(document.abbreviations) > 0:
+                self.registry_stale = True
+            self.evictions += 1
+            if self.verbose:
+                print("Evicted idle document", path)
+
+    def get_registry(self):
+        """
+        Get merged abbreviations of all the kept documents. The documents are only merged again,
+        if a document was changed, forgotten or evicted since the last merge
+        :return: merged abbreviations (AbbreviationRegistry)
+        """
+        if self.registry_stale:
+            self.registry = AbbreviationRegistry(policy=self.policy)
+            for document in self.documents.values():
+                for abbreviation in document.abbreviations:
+                    self.registry.add_or_replace(abbreviation)
+            self.registry_stale = False
+        return self.registry
+
+    def get_document_report(self, path, document):
+        """
+        Get abbreviations, used in a document. An abbreviation is defined, if any of the kept documents
+        defines its long notice, and undefined otherwise
+        :param path: path (name) of the document
+        :param document: document (Document)
+        :return: dictionary with the "path" of the document and the lists of "defined" abbreviations
+            (as merged) and "undefined" abbreviations (as found in the document), sorted by short notice
+        """
+        registry = self.get_registry()
+        rules = self.rules
+
+        found_abbreviations = {}
+        for abbreviation in document.abbreviations:
+            found_abbreviations.setdefault(abbreviation.short, abbreviation)
+        used_shorts = set(found_abbreviations.keys())
+        for word in document.words:
+            if registry.find(word) is not None:
+                used_shorts.add(word)
+                continue
+            # singular or plural form of an abbreviation, e.g., CNNs for CNN or CNN for CNNs
+            singular = rules.strip_plural_suffix(word)
+            if singular != word and registry.find(singular) is not None:
+                used_shorts.add(singular)
+                continue
+            for suffix in rules.plural_suffixes:
+                if registry.find(word + suffix) is not None:
+                    used_shorts.add(word + suffix)
+                    break
+
+        defined = []
+        undefined = []
+        for short in sorted(used_shorts):
+            merged_abbreviation = registry.find(short)
+            if merged_abbreviation is not None and merged_abbreviation.long is not None:
+                defined.append(abbreviation_to_dict(merged_abbreviation))
+            else:
+                undefined.append(abbreviation_to_dict(found_abbreviations.get(short, merged_abbreviation)))
+        return {"path": path, "defined": defined, "undefined": undefined}
+
+    def get_stats(self):
+        return {"documents": len(self.documents),
+                "abbreviations": len(self.get_registry()),
+                "requests": self.requests,
+                "evictions": self.evictions}
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve requests of a client, until the client closes the connection
+        :param reader: stream of client requests (asyncio.StreamReader)
+        :param writer: stream of responses (asyncio.StreamWriter)
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the request exceeds the max request size. The rest of the stream cannot be parsed
+                    writer.write((json.dumps({"error": "Request is too large"}) + "\n").encode("utf-8"))
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                if line.strip() == b"":
+                    continue
+                response = self.handle_line(line)
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, socket_path=None, host=DEFAULT_HOST, port=None, max_request_size=DEFAULT_MAX_REQUEST_SIZE):
+        """
+        Start listening for clients
+        :param socket_path: path to Unix domain socket. If None, the server listens on the TCP port
+        :param host: host of the TCP port
+        :param port: TCP port
+        :param max_request_size: max size of a request, in bytes
+        :return: started server (asyncio.AbstractServer)
+        """
+        if socket_path is not None:
+            # remove the socket, left by a server which was not stopped properly
+            if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                os.remove(socket_path)
+            return await asyncio.start_unix_server(self.handle_connection, path=socket_path, limit=max_request_size)
+        if port is None:
+            raise Exception("Either socket path or TCP port should be specified")
+        return await asyncio.start_server(self.handle_connection, host, port, limit=max_request_size)
+
+    async def serve(self, socket_path=None, host=DEFAULT_HOST, port=None, max_request_size=DEFAULT_MAX_REQUEST_SIZE):
+        """
+        Serve clients until interrupted (e.g., with Ctrl+C)
+        """
+        server = await self.start(socket_path, host, port, max_request_size)
+        print("Listening on", socket_path if socket_path is not None else host + ":" + str(port), flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def get_request_path(request):
+    path = request.get("path")
+    if not isinstance(path, str):
+        raise Exception("Request should specify the document path")
+    return path
+
+
+def main():
+    import argparse
+    from abbreviation_rules import load_rules_config
+
+    parser = argparse.ArgumentParser(description='The script starts the abbreviations scan server, which keeps '
+                                                 'abbreviations of the scanned documents in memory and answers '
+                                                 'JSON lines requests on a Unix domain socket or a localhost port.')
+    parser.add_argument('--socket', type=str, action='store', default=None, help='path to Unix domain socket')
+    parser.add_argument('--host', type=str, action='store', default=DEFAULT_HOST, help='host of the TCP port')
+    parser.add_argument('--port', type=int, action='store', default=None,
+                        help='TCP port. Used, if --socket is not specified')
+    parser.add_argument('--engine', type=str, action='store', default='line', choices=["line", "regex"],
+                        help='abbreviations search engine: line or regex')
+    parser.add_argument('--lookback', type=int, action='store', default=1,
+                        help='number of previous lines, where the long notice of an abbreviation is searched')
+    parser.add_argument('--window', type=int, action='store', default=DEFAULT_WINDOW,
+                        help='regex engine only: number of characters before the abbreviation, '
+                             'where the long notice of the abbreviation is searched')
+    parser.add_argument('--encoding', type=str, action='store', default=",".join(DEFAULT_ENCODINGS),
+                        help='comma-separated encodings of files, read from the disk')
+    parser.add_argument('--rules', type=str, action='store', default=None,
+                        help='path to JSON file with abbreviations classification rules')
+    parser.add_argument('--policy', type=str, action='store', default='latest', choices=MERGE_POLICIES,
+                        help='definition of an abbreviation, defined with different long notices in the documents')
+    parser.add_argument('--max-documents', type=int, action='store', default=DEFAULT_MAX_DOCUMENTS,
+                        help='max number of documents, kept in memory. The least recently used documents are evicted')
+    parser.add_argument('--latex-aware', help="skip LaTeX comments, verbatim environments and math, "
+                                              "and only search prose for abbreviations",
+                        action="store_true", default=False)
+    parser.add_argument('--verbose', help="print details", action="store_true", default=False)
+    args = parser.parse_args()
+
+    if args.socket is None and args.port is None:
+        print("Either --socket or --port should be specified", file=sys.stderr)
+        sys.exit(2)
+
+    options = ScanOptions(lookback=args.lookback, engine=args.engine, window=args.window,
+                          latex_aware=args.latex_aware, encodings=args.encoding.split(","),
+                          rules=None if args.rules is None else load_rules_config(args.rules))
+    server = ScanServer(options, args.policy, args.max_documents, args.verbose)
+    try:
+        asyncio.run(server.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.socket is not None and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import unittest
+
+from Abbreviation import Abbreviation, AbbreviationRegistry
+
+
+class AbbreviationRegistryTest(unittest.TestCase):
+    def test_add_and_find(self):
+        registry = AbbreviationRegistry()
+        self.assertFalse(registry.add_or_replace(Abbreviation("DL", None, "a.tex", 0)))
+        self.assertFalse(registry.add_or_replace(Abbreviation("NN", "Neural Network ", "a.tex", 1)))
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.find("NN").long, "Neural Network ")
+        self.assertIsNone(registry.find("CNN"))
+        self.assertIn(Abbreviation("DL"), registry)
+
+    def test_definition_with_long_notice_replaces(self):
+        registry = AbbreviationRegistry()
+        registry.add_or_replace(Abbreviation("DL", None, "a.tex", 0))
+        self.assertTrue(registry.add_or_replace(Abbreviation("DL", "Deep Learning ", "b.tex", 3)))
+        self.assertFalse(registry.add_or_replace(Abbreviation("DL", None, "c.tex", 5)))
+        self.assertTrue(registry.add_or_replace(Abbreviation("DL", "Dense Layers ", "d.tex", 7)))
+        saved = registry.find("DL")
+        self.assertEqual((saved.long, saved.file, saved.line), ("Dense Layers ", "d.tex", 7))
+
+    def test_replaced_abbreviation_keeps_position(self):
+        registry = AbbreviationRegistry([Abbreviation("DL"), Abbreviation("NN"), Abbreviation("CNN")])
+        registry.add_or_replace(Abbreviation("DL", "Deep Learning "))
+        self.assertEqual([a.short for a in registry.to_list()], ["DL", "NN", "CNN"])
+        self.assertEqual(registry.to_list()[0].long, "Deep Learning ")
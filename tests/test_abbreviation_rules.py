@@ -0,0 +1,68 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from abbreviation_rules import AbbreviationRules, get_rules
+from scan_options import ScanOptions
+from abbreviations_api import AbbreviationsScanner
+from main import find_abbreviations_in_lines, is_abbreviation, get_short_notice_letters
+
+TEXT = ["the Central Processing Units (CPUs) and Graphics Processing Units (GPUs)\n",
+        "at 5 Mega Hertz (MHz), see (Smith2019a) and (i.e., AB) in 3 Dimensions (3D)\n"]
+RULES_CONFIG = {"stop_words": ["MHz"], "allowed_words": ["3D"]}
+
+
+class AbbreviationRulesTest(unittest.TestCase):
+    def test_default_rules(self):
+        rules = AbbreviationRules()
+        for candidate, expected in [("CNN", True), ("CNNs", True), ("MHz", True), ("Smith2019a", False), ("3D", False),
+                                    ("i.e., AB", False), (" e.g., CPU", False), ("x", False)]:
+            self.assertEqual(rules.classify(candidate), expected, candidate)
+        self.assertEqual(rules.strip_plural_suffix("CNNs"), "CNN")
+
+    def test_rules_config(self):
+        rules = AbbreviationRules({"stop_words": ["MHz"], "stop_patterns": ["[A-Z][A-Za-z]+[0-9]{4}[a-z]?"],
+                                   "allowed_words": ["3D"], "allowed_patterns": ["[0-9][A-Z]+"],
+                                   "plural_suffixes": ["es"]})
+        for candidate, expected in [("MHz", False), ("Smith2019a", False), ("3D", True), ("2DM", True), ("CNN", True)]:
+            self.assertEqual(rules.classify(candidate), expected, candidate)
+        self.assertEqual(rules.strip_plural_suffix("CNNes"), "CNN")
+        self.assertEqual(rules.strip_plural_suffix("CNNs"), "CNN")
+
+    def test_unknown_rule(self):
+        with self.assertRaises(Exception):
+            AbbreviationRules({"stop_word": ["MHz"]})
+
+    def test_rules_are_used_by_search(self):
+        self.assertTrue(is_abbreviation("MHz"))
+        default_shorts = [a.short for a in find_abbreviations_in_lines(TEXT)]
+        self.assertEqual(default_shorts, ["CPUs", "GPUs", "MHz"])
+        rules = get_rules(RULES_CONFIG)
+        self.assertFalse(is_abbreviation("MHz", rules))
+        abbreviations = find_abbreviations_in_lines(TEXT, rules=rules)
+        self.assertEqual([(a.short, a.long) for a in abbreviations],
+                         [("CPUs", "Central Processing Units "), ("GPUs", "Graphics Processing Units "),
+                          ("3D", "3 Dimensions ")])
+        self.assertEqual(get_short_notice_letters("CPUs", rules), ["C", "P", "U"])
+        # the rules are not changed for other callers
+        self.assertEqual([a.short for a in find_abbreviations_in_lines(TEXT)], default_shorts)
+
+    def test_rules_are_compiled_once_per_config(self):
+        rules = get_rules(RULES_CONFIG)
+        self.assertIs(get_rules({"allowed_words": ["3D"], "stop_words": ["MHz"]}), rules)
+        self.assertIsNot(get_rules({"stop_words": ["MHz"]}), rules)
+        self.assertIs(get_rules(None), get_rules())
+
+    def test_scanners_with_different_rules(self):
+        text = "".join(TEXT)
+        for engine in ["line", "regex"]:
+            default_scanner = AbbreviationsScanner(ScanOptions(engine=engine))
+            custom_scanner = AbbreviationsScanner(ScanOptions(engine=engine, rules=RULES_CONFIG))
+            expected = {default_scanner: ["CPUs", "GPUs", "MHz"], custom_scanner: ["CPUs", "GPUs", "3D"]}
+
+            def scan(scanner):
+                return scanner, [record["short"] for record in scanner.scan_text("a.tex", text)]
+
+            # the scanners are used alternately from several threads
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for scanner, shorts in executor.map(scan, [default_scanner, custom_scanner] * 50):
+                    self.assertEqual(shorts, expected[scanner], engine)
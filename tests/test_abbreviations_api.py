@@ -0,0 +1,44 @@
+import os
+import unittest
+
+from abbreviations_api import AbbreviationsScanner, scan_text, scan_texts, scan_batch, scan_to_store
+from main import find_abbreviations_in_files_list
+from scan_options import ScanOptions
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_PATH = os.path.join(PROJECT_DIR, "input_examples", "Introduction.tex")
+
+
+class AbbreviationsApiTest(unittest.TestCase):
+    def setUp(self):
+        with open(EXAMPLE_PATH) as f:
+            self.text = f.read()
+
+    def test_scan_text_equals_file_scan(self):
+        expected = [(a.short, a.long, a.line) for a in find_abbreviations_in_files_list([EXAMPLE_PATH], False)]
+        for engine in ["line", "regex"]:
+            records = scan_text(EXAMPLE_PATH, self.text, ScanOptions(engine=engine))
+            self.assertEqual([(r["short"], r.get("long"), r["line"]) for r in records], expected, engine)
+
+    def test_scan_texts_merges_texts(self):
+        texts = [("a.tex", "the DL models\n"), ("b.tex", "text\nwe use Deep Learning (DL) here\n")]
+        self.assertEqual(scan_texts(texts), [{"short": "DL", "long": "Deep Learning ", "file": "b.tex", "line": 1}])
+        self.assertEqual(scan_batch(texts), [("a.tex", []), ("b.tex", scan_texts(texts))])
+
+    def test_scan_to_store(self):
+        texts = [("a.tex", "a Neural Network (NN)\n"), ("b.tex", "some NN (NN)\n")]
+        store = scan_to_store(texts)
+        self.assertEqual(store.get_files(), ["a.tex", "b.tex"])
+        self.assertEqual([(a.short, a.long, a.file) for a in store.merge()],
+                         [("NN", "Neural Network ", "a.tex")])
+
+    def test_definitions_in_one_text(self):
+        text = "we use Deep Learning (DL)\nsome Dense Layers (DL)\nthe DL (DL)\n"
+        abbreviations = AbbreviationsScanner().find_abbreviations("a.tex", text)
+        self.assertEqual([(a.long, a.line) for a in abbreviations], [("Deep Learning ", 0), ("Dense Layers ", 1)])
+        self.assertEqual(scan_text("a.tex", text),
+                         [{"short": "DL", "long": "Dense Layers ", "file": "a.tex", "line": 1}])
+
+    def test_bytes_engine_is_rejected(self):
+        with self.assertRaises(Exception):
+            AbbreviationsScanner(ScanOptions(engine="bytes"))
@@ -0,0 +1,70 @@
+import io
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import unittest
+
+from abbreviations_hook import iterate_null_separated_paths
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOOK_PATH = os.path.join(PROJECT_DIR, "abbreviations_hook.py")
+
+
+class AbbreviationsHookTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.first_path = self.write_file("a b.tex", "we use Deep Learning (DL) here\n")
+        self.second_path = self.write_file("c.tex", "a Neural Network (NN)\nDL (DL)\n")
+        self.missing_path = os.path.join(self.temp_dir.name, "missing.tex")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name, text):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def run_hook(self, args, stdin=None):
+        result = subprocess.run([sys.executable, HOOK_PATH] + args, input=stdin, capture_output=True)
+        return result.returncode, [json.loads(line) for line in result.stdout.decode("utf-8").splitlines()]
+
+    def assert_results(self, results):
+        self.assertEqual(results, [
+            {"file": self.first_path,
+             "abbreviations": [{"short": "DL", "long": "Deep Learning ", "file": self.first_path, "line": 0}]},
+            {"file": self.second_path,
+             "abbreviations": [{"short": "NN", "long": "Neural Network ", "file": self.second_path, "line": 0},
+                               {"short": "DL", "file": self.second_path, "line": 1}]}])
+
+    def test_files_are_scanned_separately(self):
+        returncode, results = self.run_hook([self.first_path, self.second_path])
+        self.assertEqual(returncode, 0)
+        self.assert_results(results)
+
+    def test_stdin_batch(self):
+        returncode, results = self.run_hook(["--stdin"], (self.first_path + "\n\n" + self.second_path + "\n").encode())
+        self.assertEqual(returncode, 0)
+        self.assert_results(results)
+        returncode, results = self.run_hook(["--stdin", "-0", "--engine", "bytes"],
+                                            (self.first_path + "\0" + self.second_path + "\0").encode())
+        self.assertEqual(returncode, 0)
+        self.assert_results(results)
+
+    def test_unreadable_file_is_reported(self):
+        returncode, results = self.run_hook([self.missing_path, self.first_path])
+        self.assertEqual(returncode, 0)
+        self.assertEqual(results[0]["file"], self.missing_path)
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1]["file"], self.first_path)
+
+    def test_wrong_arguments(self):
+        for args in [["--unknown", self.first_path], [], ["-0", self.first_path]]:
+            self.assertEqual(self.run_hook(args)[0], 2, args)
+
+    def test_null_separated_paths_in_chunks(self):
+        stream = io.BytesIO("a.tex\0dir/é.tex\0\0last.tex".encode("utf-8"))
+        self.assertEqual(list(iterate_null_separated_paths(stream, chunk_size=3)), ["a.tex", "dir/é.tex", "last.tex"])
@@ -0,0 +1,57 @@
+import io
+import os
+import tarfile
+import zipfile
+import tempfile
+import unittest
+
+from archive_reader import iterate_archive_members, decode_member
+from main import find_abbreviations_in_files_list
+from scan_options import ScanOptions
+
+MEMBERS = {"sections/intro.tex": "we use Deep Learning (DL) here\n".encode("utf-8"),
+           "sections/latin.tex": "été a Neural Network (NN)\n".encode("latin-1"),
+           "figures/plot.png": b"\x89PNG (XY)"}
+
+
+class ArchiveReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = os.path.join(self.temp_dir.name, "paper.zip")
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            for name, data in MEMBERS.items():
+                archive.writestr(name, data)
+        self.tar_path = os.path.join(self.temp_dir.name, "paper.tar.gz")
+        with tarfile.open(self.tar_path, "w:gz") as archive:
+            for name, data in MEMBERS.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_members_with_extensions(self):
+        for archive_path in [self.zip_path, self.tar_path]:
+            members = dict(iterate_archive_members(archive_path, ["tex"]))
+            self.assertEqual(sorted(members.keys()), [archive_path + "!sections/intro.tex",
+                                                      archive_path + "!sections/latin.tex"])
+            self.assertEqual(decode_member(members[archive_path + "!sections/latin.tex"], ["utf-8", "latin-1"]),
+                             "été a Neural Network (NN)\n")
+
+    def test_abbreviations_in_archives(self):
+        for engine in ["line", "regex", "bytes"]:
+            for archive_path in [self.zip_path, self.tar_path]:
+                abbreviations = find_abbreviations_in_files_list([archive_path], False,
+                                                                 ScanOptions(engine=engine, member_extensions=["tex"]))
+                self.assertEqual(sorted((a.short, a.long, a.file) for a in abbreviations),
+                                 [("DL", "Deep Learning ", archive_path + "!sections/intro.tex"),
+                                  ("NN", "Neural Network ", archive_path + "!sections/latin.tex")], engine)
+
+    def test_broken_archive_is_skipped(self):
+        broken_path = os.path.join(self.temp_dir.name, "broken.zip")
+        with open(broken_path, "wb") as f:
+            f.write(b"not an archive")
+        abbreviations = find_abbreviations_in_files_list([broken_path, self.zip_path], False,
+                                                         ScanOptions(member_extensions=["tex"]))
+        self.assertEqual(len(abbreviations), 2)
@@ -0,0 +1,49 @@
+import os
+import sys
+import subprocess
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BaselineDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.temp_dir.name, "input")
+        os.mkdir(self.input_dir)
+        for file_id, text in enumerate(["We use Deep Learning (DL) here\n", "a Neural Network (NN) here\n",
+                                        "the Support Vector Machine (SVM)\n", "no abbreviations\n"]):
+            self.write_input("file" + str(file_id) + ".tex", text)
+        self.output_path = os.path.join(self.temp_dir.name, "abbr.json")
+        self.run_main()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_input(self, name, text):
+        with open(os.path.join(self.input_dir, name), "w") as f:
+            f.write(text)
+
+    def run_main(self, *args):
+        return subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"), "-i", self.input_dir,
+                               "-o", self.output_path] + list(args), capture_output=True, text=True)
+
+    def test_no_changes(self):
+        result = self.run_main("--baseline", self.output_path)
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+    def test_changes(self):
+        self.write_input("file1.tex", "a Neural Net (NN) here\n")
+        result = self.run_main("--baseline", self.output_path, "--no-cache")
+        self.assertEqual(result.returncode, 1, result.stdout)
+
+    def test_error(self):
+        result = self.run_main("--baseline", os.path.join(self.temp_dir.name, "missing.json"))
+        self.assertEqual(result.returncode, 2, result.stdout)
+
+    def test_cache_stats_count_every_file_once(self):
+        self.write_input("file1.tex", "a Neural Net (NN) here\n")
+        result = self.run_main("--baseline", self.output_path, "--verbose")
+        self.assertEqual(result.returncode, 1, result.stdout)
+        self.assertIn("3 hits, 1 misses", result.stdout)
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from byte_scanner import find_abbreviations_in_bytes, find_abbreviations_in_bytes_file
+from main import find_abbreviations_in_files_list
+from scan_options import ScanOptions
+
+TEXT = "Résumé text\r\nwe use Deep Learning (DL) here\r\nété Neural Network (NN)\r\nDL and NN (NN)\r\n"
+
+
+class ByteScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_encodings_and_line_breaks(self):
+        for encoding in ["utf-8", "latin-1", "cp1252"]:
+            path = self.write_file("a.tex", TEXT.encode(encoding))
+            expected = [(a.short, a.long, a.line) for a in find_abbreviations_in_files_list([path], False)]
+            self.assertEqual(expected, [("DL", "Deep Learning ", 1), ("NN", "Neural Network ", 2)])
+            abbreviations, decode_errors = find_abbreviations_in_bytes_file(path)
+            self.assertEqual([(a.short, a.long, a.line) for a in abbreviations], expected, encoding)
+            self.assertEqual(decode_errors, 0)
+
+    def test_undecodable_windows_are_counted(self):
+        abbreviations, decode_errors = find_abbreviations_in_bytes(TEXT.encode("latin-1"), "a.tex", 1, ["utf-8"])
+        self.assertEqual([(a.short, a.long) for a in abbreviations],
+                         [("DL", "Deep Learning "), ("NN", "Neural Network ")])
+        # windows of every candidate include the previous line, so all three windows contain Latin-1 letters
+        self.assertEqual(decode_errors, 3)
+
+    def test_empty_file(self):
+        self.assertEqual(find_abbreviations_in_bytes_file(self.write_file("empty.tex", b"")), ([], 0))
+
+    def test_undecodable_file_is_skipped_by_text_engines(self):
+        path = self.write_file("a.tex", TEXT.encode("latin-1"))
+        other_path = self.write_file("b.tex", b"a Support Vector Machine (SVM)\n")
+        for engine in ["line", "regex"]:
+            abbreviations = find_abbreviations_in_files_list([path, other_path], False,
+                                                             ScanOptions(engine=engine, encodings=["utf-8"]))
+            self.assertEqual([a.short for a in abbreviations], ["SVM"], engine)
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus_generator import CorpusSettings, generate_corpus
+
+
+def read_corpus(output_dir, file_paths):
+    corpus = {}
+    for file_path in file_paths:
+        with open(file_path) as f:
+            corpus[os.path.relpath(file_path, output_dir)] = f.read()
+    return corpus
+
+
+class CorpusGeneratorTest(unittest.TestCase):
+    def generate(self, settings):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return read_corpus(temp_dir, generate_corpus(temp_dir, settings))
+
+    def test_same_seed_generates_the_same_corpus(self):
+        settings = CorpusSettings(files=12, file_size=2000, seed=7)
+        corpus = self.generate(settings)
+        self.assertEqual(len(corpus), 12)
+        self.assertEqual(corpus, self.generate(CorpusSettings(files=12, file_size=2000, seed=7)))
+
+    def test_different_seeds_generate_different_corpora(self):
+        self.assertNotEqual(self.generate(CorpusSettings(files=3, file_size=2000, seed=1)),
+                            self.generate(CorpusSettings(files=3, file_size=2000, seed=2)))
+
+    def test_files_have_about_the_requested_size(self):
+        for text in self.generate(CorpusSettings(files=3, file_size=5000)).values():
+            self.assertGreaterEqual(len(text), 5000)
+            self.assertLess(len(text), 5000 + 1000)
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import subprocess
+import unittest
+
+from Abbreviation import Abbreviation
+from corpus_index import CorpusIndex
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CorpusIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "abbr.sqlite")
+        self.first_path = self.write_file("a.tex")
+        self.second_path = self.write_file("b.tex")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w") as f:
+            f.write("text\n")
+        return path
+
+    def test_deleted_documents_are_removed(self):
+        with CorpusIndex(self.db_path) as corpus_index:
+            corpus_index.add_document(self.first_path, [Abbreviation("DL", "Deep Learning ", self.first_path, 0)])
+            corpus_index.add_document(self.second_path, [Abbreviation("DL", "Dense Layers ", self.second_path, 2)])
+        os.remove(self.second_path)
+        with CorpusIndex(self.db_path) as corpus_index:
+            corpus_index.add_document(self.first_path, [Abbreviation("DL", "Deep Learning ", self.first_path, 0)])
+            self.assertEqual(corpus_index.remove_missing_documents(), 1)
+            self.assertEqual(corpus_index.get_documents("DL"), [(self.first_path, 0, "Deep Learning ")])
+            self.assertEqual(corpus_index.get_long_notices("DL"), [("Deep Learning ", 1, 1)])
+
+    def test_members_removed_from_archive_are_removed(self):
+        archive_path = os.path.join(self.temp_dir.name, "paper.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("intro.tex", "text\n")
+        old_member, new_member = archive_path + "!old.tex", archive_path + "!intro.tex"
+        with CorpusIndex(self.db_path) as corpus_index:
+            corpus_index.add_document(old_member, [Abbreviation("DL", "Dense Layers ", old_member, 0)])
+            self.assertEqual(corpus_index.remove_missing_documents(), 0)
+        with CorpusIndex(self.db_path) as corpus_index:
+            # the archive was not indexed again, so its members are kept
+            self.assertEqual(corpus_index.remove_missing_documents(), 0)
+            corpus_index.add_document(new_member, [Abbreviation("DL", "Deep Learning ", new_member, 0)])
+            self.assertEqual(corpus_index.remove_missing_documents(), 1)
+            self.assertEqual(corpus_index.get_documents("DL"), [(new_member, 0, "Deep Learning ")])
+
+    def test_failed_update_is_rolled_back(self):
+        with CorpusIndex(self.db_path) as corpus_index:
+            corpus_index.add_document(self.first_path, [Abbreviation("DL", "Deep Learning ", self.first_path, 0)])
+        with self.assertRaises(KeyError):
+            with CorpusIndex(self.db_path) as corpus_index:
+                corpus_index.add_document(self.first_path, [Abbreviation("DL", "Dense Layers ", self.first_path, 0)])
+                raise KeyError("scan failed")
+        with CorpusIndex(self.db_path) as corpus_index:
+            self.assertEqual(corpus_index.get_documents("DL"), [(self.first_path, 0, "Deep Learning ")])
+
+    def run_main(self, cwd, input_path):
+        output_path = os.path.join(self.temp_dir.name, "abbr.json")
+        return subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"), "-i", input_path,
+                               "-o", output_path, "--no-cache", "--index", self.db_path],
+                              cwd=cwd, capture_output=True, text=True)
+
+    def test_update_from_another_working_directory(self):
+        document_paths = []
+        for tree, long in [("tree1", "Deep Learning"), ("tree2", "Dense Layers")]:
+            corpus_dir = os.path.join(self.temp_dir.name, tree, "corpus")
+            os.makedirs(corpus_dir)
+            document_paths.append(os.path.join(corpus_dir, "a.tex"))
+            with open(document_paths[-1], "w") as f:
+                f.write("We use " + long + " (DL) here\n")
+            # the same relative path in both trees
+            result = self.run_main(os.path.join(self.temp_dir.name, tree), "corpus")
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        result = self.run_main(self.temp_dir.name, os.path.join("tree1", "corpus"))
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        with CorpusIndex(self.db_path) as corpus_index:
+            self.assertEqual(corpus_index.get_documents("DL"), [(document_paths[0], 0, "Deep Learning "),
+                                                                (document_paths[1], 0, "Dense Layers ")])
+
+    def test_relative_paths_are_removed(self):
+        with CorpusIndex(self.db_path) as corpus_index:
+            corpus_index.connection.execute("INSERT INTO documents (path, indexed_at) VALUES (?, ?)",
+                                            (os.path.relpath(self.first_path), time.time()))
+            corpus_index.add_document(self.first_path, [Abbreviation("DL", "Deep Learning ", self.first_path, 0)])
+            self.assertEqual(corpus_index.remove_missing_documents(), 1)
+            self.assertEqual(corpus_index.get_summary()["documents"], 1)
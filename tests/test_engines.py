@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus_generator import CorpusSettings, generate_corpus
+from input_file_worker import get_input_file_paths
+from main import find_abbreviations_in_files_list
+from scan_options import ScanOptions
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORPUS_LINES = ["We use Deep Learning (DL) and Machine Learning (ML) here.\n",
+                "the DL (DL) is used again, see (Fig. 1) and items (a) and (b)\n",
+                "a Graphics Processing Unit (GPU) based Neural Network (NN).\n",
+                "no brackets here\n",
+                "the (CNN) is not defined yet\n",
+                "later the Recurrent Network (RN) and a Convolutional Neural Network (CNN) are defined\n",
+                "a Deep Layer (DL) is something else\n",
+                "the definition of a Support Vector\n",
+                "Machine (SVM) is wrapped and so is a Random Forest\n",
+                "(RF) definition\n"]
+
+
+def find_abbreviations(file_paths, **options):
+    return [(a.short, a.long, a.file, a.line)
+            for a in find_abbreviations_in_files_list(file_paths, False, ScanOptions(**options))]
+
+
+class EnginesTest(unittest.TestCase):
+    """
+    Every engine should find the same abbreviations, including the definitions, wrapped across a line break
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.example_paths = get_input_file_paths(os.path.join(PROJECT_DIR, "input_examples"), ["tex"])
+        cls.corpus_paths = []
+        for file_id in range(3):
+            file_path = os.path.join(cls.temp_dir.name, "section" + str(file_id) + ".tex")
+            with open(file_path, "w") as f:
+                f.writelines(CORPUS_LINES[file_id:] + CORPUS_LINES[:file_id])
+            cls.corpus_paths.append(file_path)
+        cls.generated_paths = []
+        for seed in range(3):
+            settings = CorpusSettings(files=4, file_size=4000, wrapped_share=0.5, seed=seed)
+            cls.generated_paths += generate_corpus(os.path.join(cls.temp_dir.name, str(seed)), settings)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def assert_engines_equal(self, engines, **options):
+        for file_paths in [self.example_paths, self.corpus_paths, self.generated_paths]:
+            expected = find_abbreviations(file_paths, engine="line", **options)
+            self.assertGreater(len(expected), 0)
+            for engine in engines:
+                self.assertEqual(find_abbreviations(file_paths, engine=engine, **options), expected, engine)
+
+    def test_regex_engine_equals_line_engine(self):
+        self.assert_engines_equal(["regex"])
+
+    def test_bytes_engine_equals_line_engine(self):
+        self.assert_engines_equal(["bytes"])
+
+    def test_latex_aware_regex_engine_equals_line_engine(self):
+        self.assert_engines_equal(["regex"], latex_aware=True)
+
+    def test_wrapped_definitions_are_found(self):
+        for engine in ["line", "regex", "bytes"]:
+            abbreviations = find_abbreviations(self.corpus_paths[:1], engine=engine)
+            definitions = [(short, long) for short, long, _, _ in abbreviations]
+            self.assertIn(("SVM", "Support Vector Machine "), definitions, engine)
+            self.assertIn(("RF", "Random Forest "), definitions, engine)
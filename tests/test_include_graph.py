@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from Abbreviation import AbbreviationRegistry
+from include_graph import IncludeGraph, parse_includes
+from main import find_abbreviations_in_files_list, find_abbreviation_usages
+
+
+class IncludeGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.main_path = self.write_file("main.tex", "\\begin{document}\n"
+                                                     "\\input{chap2}\n"
+                                                     "text\n"
+                                                     "text\n"
+                                                     "some Dense Layers (DL) here\n"
+                                                     "\\end{document}\n")
+        self.chapter_path = self.write_file("chap2.tex", "We use Deep Learning (DL) here\nDL\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name, text, encoding="utf-8"):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w", encoding=encoding) as f:
+            f.write(text)
+        return path
+
+    def test_reading_order_splits_including_file(self):
+        reading_order = IncludeGraph().get_reading_order(self.main_path)
+        self.assertEqual(reading_order.segments, [(self.main_path, 0, 2), (self.chapter_path, 0, None),
+                                                  (self.main_path, 2, None)])
+        self.assertEqual(reading_order.get_files(), [self.main_path, self.chapter_path])
+        self.assertLess(reading_order.get_position(self.chapter_path, 1), reading_order.get_position(self.main_path, 4))
+
+    def test_first_policy_follows_reading_order(self):
+        reading_order = IncludeGraph().get_reading_order(self.main_path)
+        abbreviations = find_abbreviations_in_files_list(reading_order.get_files(), False,
+                                                         registry=AbbreviationRegistry(policy="first"),
+                                                         reading_order=reading_order)
+        self.assertEqual([(a.short, a.long, a.file) for a in abbreviations],
+                         [("DL", "Deep Learning ", self.chapter_path)])
+
+    def test_use_after_included_definition(self):
+        reading_order = IncludeGraph().get_reading_order(self.main_path)
+        abbreviations = find_abbreviations_in_files_list(reading_order.get_files(), False,
+                                                         registry=AbbreviationRegistry(policy="first"),
+                                                         reading_order=reading_order)
+        usages = find_abbreviation_usages(abbreviations, reading_order.get_files(), False,
+                                          reading_order=reading_order)
+        self.assertFalse(usages["DL"]["used_before_definition"])
+        self.assertEqual(usages["DL"]["first_use"], {"file": self.chapter_path, "line": 1})
+
+    def test_parse_includes_with_encodings(self):
+        path = self.write_file("latin.tex", "\u00e9t\u00e9\n\\input{chap2}\n", encoding="latin-1")
+        self.assertEqual(parse_includes(path, path, ["utf-8", "latin-1"]), [(self.chapter_path, 1)])
+
+    def get_cached_reachable_files(self, root_path):
+        include_graph = IncludeGraph(os.path.join(self.temp_dir.name, "includes.json"))
+        include_graph.load()
+        reachable_files = include_graph.get_reachable_files(root_path)
+        include_graph.save()
+        return reachable_files, include_graph.parsed_files
+
+    def test_cached_includes_are_resolved_again(self):
+        self.assertEqual(self.get_cached_reachable_files(self.main_path), ([self.main_path, self.chapter_path], 2))
+        # a file without the .tex extension takes precedence, when it is created
+        chapter_path = self.write_file("chap2", "some Neural Network (NN) here\n")
+        self.assertEqual(self.get_cached_reachable_files(self.main_path), ([self.main_path, chapter_path], 1))
+
+    def test_cached_includes_depend_on_root(self):
+        self.write_file("chap2.tex", "\\input{chap3}\n")
+        chapter3_path = self.write_file("chap3.tex", "text\n")
+        os.mkdir(os.path.join(self.temp_dir.name, "sub"))
+        other_root_path = self.write_file(os.path.join("sub", "main.tex"), "\\input{../chap2}\n")
+        other_chapter3_path = self.write_file(os.path.join("sub", "chap3.tex"), "text\n")
+        self.assertEqual(self.get_cached_reachable_files(self.main_path)[0],
+                         [self.main_path, self.chapter_path, chapter3_path])
+        # \\input is resolved relative to the root document
+        reachable_files, parsed_files = self.get_cached_reachable_files(other_root_path)
+        self.assertEqual(reachable_files, [other_root_path, self.chapter_path, other_chapter3_path])
+        self.assertEqual(parsed_files, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from input_file_worker import get_input_file_paths, DEFAULT_EXCLUDE_PATTERNS
+
+
+class InputFileWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for path in ["main.tex", "b.tex", "notes.txt", "chapters/a.tex", "chapters/sub/c.tex",
+                     ".git/x.tex", "node_modules/y.tex", "build/z.tex", "_minted-main/m.tex"]:
+            self.write_file(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, relative_path):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("text\n")
+
+    def get_relative_paths(self, **kwargs):
+        return [os.path.relpath(path, self.root) for path in get_input_file_paths(self.root, **kwargs)]
+
+    def test_default_exclude_patterns(self):
+        self.assertEqual(self.get_relative_paths(file_extensions=["tex"]),
+                         ["b.tex", "main.tex", os.path.join("chapters", "a.tex"),
+                          os.path.join("chapters", "sub", "c.tex")])
+
+    def test_custom_exclude_patterns(self):
+        exclude_patterns = DEFAULT_EXCLUDE_PATTERNS + ["sub", "*.txt"]
+        self.assertEqual(self.get_relative_paths(file_extensions=["tex", "txt"], exclude_patterns=exclude_patterns),
+                         ["b.tex", "main.tex", os.path.join("chapters", "a.tex")])
+        # custom patterns replace the default patterns
+        self.assertIn(os.path.join("build", "z.tex"), self.get_relative_paths(file_extensions=["tex"],
+                                                                               exclude_patterns=[]))
+
+    def test_symbolic_link_loop(self):
+        try:
+            os.symlink(self.root, os.path.join(self.root, "chapters", "loop"))
+        except (OSError, NotImplementedError):
+            self.skipTest("symbolic links are not supported")
+        self.assertEqual(len(self.get_relative_paths(file_extensions=["tex"])), 4)
+
+    def test_single_file(self):
+        path = os.path.join(self.root, "main.tex")
+        self.assertEqual(get_input_file_paths(path, ["tex"]), [path])
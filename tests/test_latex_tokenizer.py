@@ -0,0 +1,41 @@
+import io
+import os
+import tempfile
+import unittest
+
+from latex_tokenizer import iterate_prose_lines
+from main import find_abbreviations_in_file
+from scan_options import ScanOptions
+
+DOCUMENT = ("we use Deep Learning (DL) here % a Neural Network (NN)\n"
+            "\\begin{verbatim}\n"
+            "Support Vector Machine (SVM)\n"
+            "\\end{verbatim}\n"
+            "math $f(XY)$ and \\verb|Random Forest (RF)| and 50\\% Cost Model (CM)\n"
+            "\\[\n"
+            "g(AB)\n"
+            "\\]\n"
+            "\\begin{equation} h(CD) \\end{equation} Graph Neural Network (GNN)\n")
+
+
+class LatexTokenizerTest(unittest.TestCase):
+    def test_only_prose_is_kept(self):
+        lines = list(iterate_prose_lines(io.StringIO(DOCUMENT)))
+        self.assertEqual(len(lines), DOCUMENT.count("\n"))
+        self.assertEqual(lines[0], "we use Deep Learning (DL) here \n")
+        self.assertEqual(lines[2], "\n")
+        self.assertEqual(lines[4], "math  and  and 50\\% Cost Model (CM)\n")
+        self.assertEqual(lines[6], "\n")
+        for removed in ["(NN)", "(SVM)", "(XY)", "(RF)", "(AB)", "(CD)"]:
+            self.assertFalse(any(removed in line for line in lines), removed)
+
+    def test_latex_aware_engines(self):
+        expected = [("DL", "Deep Learning ", 0), ("CM", "Cost Model ", 4), ("GNN", "Graph Neural Network ", 8)]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "a.tex")
+            with open(file_path, "w") as f:
+                f.write(DOCUMENT)
+            for engine in ["line", "regex"]:
+                options = ScanOptions(engine=engine, latex_aware=True)
+                abbreviations = find_abbreviations_in_file(file_path, False, options)
+                self.assertEqual([(a.short, a.long, a.line) for a in abbreviations], expected, engine)
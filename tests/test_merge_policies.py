@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import unittest
+
+from Abbreviation import Abbreviation, AbbreviationRegistry
+from main import find_abbreviations_in_files_list
+from scan_options import ScanOptions
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFINITIONS = [Abbreviation("DL", None, "a.tex", 0),
+               Abbreviation("DL", "Dense Layers ", "a.tex", 1),
+               Abbreviation("DL", "Deep Learning ", "b.tex", 2),
+               Abbreviation("DL", "deep  learning ", "c.tex", 3),
+               Abbreviation("DL", "Dense Layers ", "d.tex", 4),
+               Abbreviation("DL", "Deep Learning ", "e.tex", 5),
+               Abbreviation("DL", "Data Lake ", "f.tex", 6),
+               Abbreviation("DL", None, "g.tex", 7)]
+
+
+def merge(policy, abbreviations=DEFINITIONS, **kwargs):
+    registry = AbbreviationRegistry(policy=policy, **kwargs)
+    for abbreviation in abbreviations:
+        registry.add_or_replace(abbreviation)
+    return registry
+
+
+class MergePoliciesTest(unittest.TestCase):
+    def test_policies(self):
+        self.assertEqual(merge("latest").find("DL").file, "f.tex")
+        self.assertEqual(merge("first").find("DL").file, "a.tex")
+        # deep learning: 3 votes (case and white spaces are ignored), the first definition is kept
+        self.assertEqual(merge("most-frequent").find("DL").file, "b.tex")
+
+    def test_latest_policy_equals_registry_without_policy(self):
+        self.assertIs(merge("latest").find("DL"), merge(None).find("DL"))
+
+    def test_most_frequent_tie_is_resolved_in_favour_of_first_definition(self):
+        abbreviations = [Abbreviation("DL", "Deep Learning ", "a.tex", 0),
+                         Abbreviation("DL", "Dense Layers ", "b.tex", 0),
+                         Abbreviation("DL", "Dense Layers ", "c.tex", 0),
+                         Abbreviation("DL", "Deep Learning ", "d.tex", 0)]
+        self.assertEqual(merge("most-frequent", abbreviations).find("DL").file, "a.tex")
+
+    def test_conflicts(self):
+        conflicts = merge("first").get_conflicts()["DL"]["conflicts"]
+        self.assertEqual([(c["long"], c["votes"], c["file"]) for c in conflicts],
+                         [("Dense Layers ", 2, "a.tex"), ("Deep Learning ", 3, "b.tex"), ("Data Lake ", 1, "f.tex")])
+        self.assertEqual(merge("first", [Abbreviation("NN", "Neural Network ")] * 2).get_conflicts(), {})
+
+    def test_candidates_cap(self):
+        fields = merge("first", max_candidates=2).get_conflicts()["DL"]
+        self.assertEqual(len(fields["conflicts"]), 2)
+        self.assertEqual(fields["other_votes"], 1)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(Exception):
+            AbbreviationRegistry(policy="oldest")
+
+    def test_policy_option(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, text in [("a.tex", "some Dense Layers (DL)\n"), ("b.tex", "we use Deep Learning (DL)\n"),
+                               ("c.tex", "the Deep Learning (DL)\n")]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write(text)
+            output_path = os.path.join(temp_dir, "out", "abbr.json")
+            longs = {}
+            for policy in ["latest", "first", "most-frequent"]:
+                subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"), "-i", temp_dir, "-o", output_path,
+                                "--no-cache", "--policy", policy], check=True, capture_output=True)
+                with open(output_path) as f:
+                    abbreviation = json.load(f)["abbreviations"][0]
+                longs[policy] = (abbreviation["long"], abbreviation["file"], len(abbreviation["conflicts"]))
+        self.assertEqual(longs, {"latest": ("Deep Learning ", os.path.join(temp_dir, "c.tex"), 2),
+                                 "first": ("Dense Layers ", os.path.join(temp_dir, "a.tex"), 2),
+                                 "most-frequent": ("Deep Learning ", os.path.join(temp_dir, "b.tex"), 2)})
+
+    def test_definitions_in_one_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "a.tex")
+            with open(file_path, "w") as f:
+                f.write("we use Deep Learning (DL)\ntext\nsome Dense Layers (DL)\n"
+                        "the DL (DL)\nthe Deep Learning (DL)\n")
+            for engine in ["line", "regex", "bytes"]:
+                definitions = {}
+                for policy in ["latest", "first", "most-frequent"]:
+                    registry = AbbreviationRegistry(policy=policy)
+                    abbreviation = find_abbreviations_in_files_list([file_path], False, ScanOptions(engine=engine),
+                                                                    registry=registry)[0]
+                    definitions[policy] = (abbreviation.long, abbreviation.line)
+                    conflicts = registry.get_conflicts()["DL"]["conflicts"]
+                    self.assertEqual([(c["long"], c["votes"], c["line"]) for c in conflicts],
+                                     [("Deep Learning ", 2, 0), ("Dense Layers ", 1, 2)], engine)
+                self.assertEqual(definitions, {"latest": ("Deep Learning ", 4), "first": ("Deep Learning ", 0),
+                                               "most-frequent": ("Deep Learning ", 0)}, engine)
@@ -0,0 +1,82 @@
+import io
+import os
+import re
+import json
+import tempfile
+import unittest
+
+from Abbreviation import Abbreviation
+from json_converters.abbreviations_to_json import abbreviations_to_json, write_abbreviations_document, \
+    NdjsonAbbreviationsWriter
+
+
+class OutputFormatsTest(unittest.TestCase):
+    def setUp(self):
+        self.abbreviations = [Abbreviation("DL", "Deep Learning ", "a.tex", 0),
+                              Abbreviation("NN", "Neural Network ", "b.tex", 3),
+                              Abbreviation("SVM", None, None, None)]
+        self.extra_fields = {"DL": {"uses": 2}}
+        self.expected_records = [{"short": "DL", "long": "Deep Learning ", "file": "a.tex", "line": 0, "uses": 2},
+                                 {"short": "NN", "long": "Neural Network ", "file": "b.tex", "line": 3},
+                                 {"short": "SVM"}]
+
+    def write_document(self, abbreviations, pretty_printing):
+        f = io.StringIO()
+        write_abbreviations_document(f, abbreviations, self.extra_fields, pretty_printing)
+        return f.getvalue()
+
+    def test_pretty_document_is_json_dump_with_indent(self):
+        for abbreviations, records in [(self.abbreviations, self.expected_records), ([], [])]:
+            self.assertEqual(self.write_document(abbreviations, True),
+                             json.dumps({"abbreviations": records}, indent=4))
+
+    def test_compact_document_has_no_white_spaces(self):
+        for abbreviations, records in [(self.abbreviations, self.expected_records), ([], [])]:
+            document = self.write_document(abbreviations, False)
+            self.assertEqual(json.loads(document), {"abbreviations": records})
+            # white spaces are only kept inside the notices
+            self.assertIsNone(re.search(r'[,:\[{]\s|\s[,:\]}]', document), document)
+
+    def test_ndjson_lines_supersede_earlier_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "abbr.ndjson")
+            writer = NdjsonAbbreviationsWriter(output_path)
+            writer.open()
+            first_definition = Abbreviation("DL", "Dense Layers ", "a.tex", 0)
+            writer.write_changes([first_definition])
+            self.assertFalse(os.path.exists(output_path))
+            writer.write_changes([first_definition, Abbreviation("NN", "Neural Network ", "b.tex", 3)])
+            writer.write_changes([Abbreviation("DL", "Deep Learning ", "c.tex", 1)])
+            writer.write_extra_fields({"NN": {"uses": 4}})
+            writer.close()
+            with open(output_path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all(", " not in line and ": " not in line for line in lines))
+        merged = {}
+        for line in lines:
+            record = json.loads(line)
+            merged[record["short"]] = record
+        self.assertEqual(merged, {"DL": {"short": "DL", "long": "Deep Learning ", "file": "c.tex", "line": 1},
+                                  "NN": {"short": "NN", "long": "Neural Network ", "file": "b.tex", "line": 3,
+                                         "uses": 4}})
+
+    def test_failed_ndjson_output_is_not_written(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "abbr.ndjson")
+            writer = NdjsonAbbreviationsWriter(output_path)
+            writer.open()
+            writer.write_changes(self.abbreviations)
+            writer.close(failed=True)
+            self.assertEqual(os.listdir(temp_dir), [])
+
+    def test_formats_contain_the_same_abbreviations(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            documents = {}
+            for output_format in ["json-pretty", "json-compact", "ndjson"]:
+                output_path = os.path.join(temp_dir, "abbr." + output_format)
+                abbreviations_to_json(self.abbreviations, output_path, False, self.extra_fields, output_format)
+                with open(output_path) as f:
+                    documents[output_format] = f.read()
+        self.assertEqual(json.loads(documents["json-pretty"]), json.loads(documents["json-compact"]))
+        self.assertEqual([json.loads(line) for line in documents["ndjson"].splitlines()], self.expected_records)
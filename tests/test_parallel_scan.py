@@ -0,0 +1,65 @@
+import os
+import sys
+import subprocess
+import tempfile
+import unittest
+
+from main import find_abbreviations_in_files_list, scan_files
+from scan_options import ScanOptions
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# definitions of the corpus. Some abbreviations have several long notices,
+# so the merged abbreviations depend on the order of the files
+DEFINITIONS = [("DL", "Deep Learning"), ("NN", "Neural Network"), ("DL", "Dense Layers"),
+               ("SVM", "Support Vector Machine"), ("GPU", "Graphics Processing Unit"), ("NN", "Nearest Neighbour")]
+
+
+def write_corpus(corpus_dir, files=12, lines=20):
+    file_paths = []
+    for file_id in range(files):
+        file_path = os.path.join(corpus_dir, "section" + str(file_id).zfill(2) + ".tex")
+        with open(file_path, "w") as f:
+            for line_id in range(lines):
+                short, long = DEFINITIONS[(file_id * 7 + line_id) % len(DEFINITIONS)]
+                f.write("we use the " + long + " (" + short + ") here\n" if line_id % 3 == 0 else "plain text\n")
+        file_paths.append(file_path)
+    return file_paths
+
+
+class ParallelScanTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.corpus_dir = os.path.join(cls.temp_dir.name, "corpus")
+        os.mkdir(cls.corpus_dir)
+        cls.file_paths = write_corpus(cls.corpus_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def test_files_are_returned_in_input_order(self):
+        scanned_paths = [path for path, _ in scan_files(self.file_paths, False, ScanOptions(), jobs=3)]
+        self.assertEqual(scanned_paths, self.file_paths)
+
+    def test_jobs_find_the_same_abbreviations(self):
+        expected = [(a.short, a.long, a.file, a.line)
+                    for a in find_abbreviations_in_files_list(self.file_paths, False, ScanOptions())]
+        for jobs in [2, 4]:
+            for engine in ["line", "regex", "bytes"]:
+                abbreviations = find_abbreviations_in_files_list(self.file_paths, False, ScanOptions(engine=engine),
+                                                                 jobs)
+                self.assertEqual([(a.short, a.long, a.file, a.line) for a in abbreviations], expected,
+                                 engine + ", jobs=" + str(jobs))
+
+    def test_output_does_not_depend_on_jobs(self):
+        outputs = []
+        for jobs in ["1", "3"]:
+            output_path = os.path.join(self.temp_dir.name, "abbr" + jobs + ".json")
+            result = subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"), "-i", self.corpus_dir,
+                                     "-o", output_path, "--jobs", jobs], capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stdout)
+            with open(output_path) as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
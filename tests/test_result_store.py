@@ -0,0 +1,69 @@
+import os
+import json
+import tempfile
+import unittest
+
+from Abbreviation import Abbreviation, AbbreviationRegistry
+from result_store import ResultStore
+from scan_options import ScanOptions
+from watcher import AbbreviationsWatcher
+
+
+class ResultStoreTest(unittest.TestCase):
+    def test_file_abbreviations_round_trip(self):
+        store = ResultStore()
+        abbreviations = [Abbreviation("DL", "Deep Learning ", "a.tex", 0), Abbreviation("DL", None, "a.tex", 3),
+                         Abbreviation("CNN", "Convolutional Neural Network ", "a.zip::b.tex", None)]
+        store.add_abbreviations("a.tex", abbreviations)
+        self.assertEqual(len(store), 3)
+        self.assertEqual([(a.short, a.long, a.file, a.line) for a in store.get_file_abbreviations("a.tex")],
+                         [(a.short, a.long, a.file, a.line) for a in abbreviations])
+        self.assertEqual(store.get_file_abbreviations("missing.tex"), [])
+
+    def test_replace_and_remove_file(self):
+        store = ResultStore()
+        store.add_records("a.tex", [("DL", "Deep Learning ", 0)])
+        store.add_records("b.tex", [("NN", "Neural Network ", 1), ("NN", None, 2)])
+        store.add_records("a.tex", [("DL", "Dense Layers ", 5)])
+        self.assertEqual(store.get_files(), ["b.tex", "a.tex"])
+        self.assertEqual([(a.long, a.line) for a in store.get_file_abbreviations("a.tex")], [("Dense Layers ", 5)])
+        self.assertTrue(store.remove_file("b.tex"))
+        self.assertFalse(store.remove_file("b.tex"))
+        self.assertEqual(len(store), 1)
+        self.assertEqual([(a.short, a.long, a.file) for a in store],
+                         [("DL", "Dense Layers ", "a.tex")])
+
+    def test_merge_as_registry(self):
+        records = [("DL", None, 0), ("DL", "Deep Learning ", 1), ("DL", None, 2), ("NN", None, 3)]
+        store = ResultStore()
+        store.add_records("a.tex", records)
+        registry = AbbreviationRegistry()
+        for short, long, line in records:
+            registry.add_or_replace(Abbreviation(short, long, "a.tex", line))
+        self.assertEqual([(a.short, a.long, a.line) for a in store.merge().to_list()],
+                         [(a.short, a.long, a.line) for a in registry.to_list()])
+
+
+class WatcherResultsTest(unittest.TestCase):
+    def test_rescan_replaces_changed_and_removes_deleted_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first_path = os.path.join(temp_dir, "a.tex")
+            second_path = os.path.join(temp_dir, "b.tex")
+            output_path = os.path.join(temp_dir, "abbr.json")
+            with open(first_path, "w") as f:
+                f.write("We use Deep Learning (DL) here\n")
+            with open(second_path, "w") as f:
+                f.write("a Neural Network (NN) here\n")
+            watcher = AbbreviationsWatcher(temp_dir, ["tex"], output_path, ScanOptions())
+            watcher.fingerprints = watcher.get_fingerprints()
+            self.assertTrue(watcher.rescan(list(watcher.fingerprints.keys()), []))
+
+            with open(first_path, "w") as f:
+                f.write("some Dense Layers (DL) here\n")
+            os.remove(second_path)
+            watcher.fingerprints = watcher.get_fingerprints()
+            self.assertTrue(watcher.rescan([first_path], [second_path]))
+            self.assertEqual(watcher.results.get_files(), [first_path])
+            with open(output_path) as f:
+                saved = json.load(f)["abbreviations"]
+            self.assertEqual([(a["short"], a["long"]) for a in saved], [("DL", "Dense Layers ")])
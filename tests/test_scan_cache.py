@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from main import find_abbreviations_in_files_list
+from scan_cache import ScanCache
+from scan_options import ScanOptions
+
+
+class ScanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "abbr.cache.json")
+        self.file_path = os.path.join(self.temp_dir.name, "a.tex")
+        self.write_input("We use Deep Learning (DL) here\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_input(self, text, mtime_ns=None):
+        with open(self.file_path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(self.file_path, ns=(mtime_ns, mtime_ns))
+
+    def scan(self, options=None):
+        cache = ScanCache(self.cache_path, (options or ScanOptions()).signature())
+        cache.load()
+        abbreviations = find_abbreviations_in_files_list([self.file_path], False, options, cache=cache)
+        cache.save()
+        return [(a.short, a.long, a.line) for a in abbreviations], cache
+
+    def test_unchanged_file_is_taken_from_cache(self):
+        first, cache = self.scan()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        second, cache = self.scan()
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual(second, first)
+
+    def test_changed_file_is_scanned_again(self):
+        self.scan()
+        self.write_input("some Dense Layers (DL) here\n")
+        abbreviations, cache = self.scan()
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(abbreviations, [("DL", "Dense Layers ", 0)])
+
+    def test_touched_file_with_same_content_is_a_hit(self):
+        self.scan()
+        stat = os.stat(self.file_path)
+        self.write_input("We use Deep Learning (DL) here\n", stat.st_mtime_ns + 10 ** 9)
+        _, cache = self.scan()
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_changed_options_invalidate_cache(self):
+        self.scan()
+        _, cache = self.scan(ScanOptions(lookback=2))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_deleted_files_are_evicted(self):
+        self.scan()
+        os.remove(self.file_path)
+        cache = ScanCache(self.cache_path, ScanOptions().signature())
+        cache.load()
+        cache.save()
+        self.assertEqual((cache.evicted, len(cache.entries)), (1, 0))
+
+    def test_file_changed_during_scan_is_not_cached(self):
+        cache = ScanCache(self.cache_path, ScanOptions().signature())
+        self.assertIsNone(cache.lookup(self.file_path))
+        stat = os.stat(self.file_path)
+        # the file is edited after it was read, but before the results are stored
+        self.write_input("some Dense Layers (DL) here\n", stat.st_mtime_ns + 10 ** 9)
+        cache.store(self.file_path, [("DL", "Deep Learning ", 0)])
+        self.assertEqual(cache.entries, {})
+        cache.save()
+        abbreviations, cache = self.scan()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertEqual(abbreviations, [("DL", "Dense Layers ", 0)])
@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ScanProfilerTest(unittest.TestCase):
+    def get_profile(self, engine, temp_dir):
+        profile_path = os.path.join(temp_dir, engine + ".profile.json")
+        result = subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"),
+                                 "-i", os.path.join(PROJECT_DIR, "input_examples"),
+                                 "-o", os.path.join(temp_dir, engine + ".json"), "--no-cache", "--engine", engine,
+                                 "--profile-output", profile_path], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        with open(profile_path) as f:
+            return json.load(f)
+
+    def test_engines_count_the_same_candidates(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiles = {engine: self.get_profile(engine, temp_dir) for engine in ["line", "regex", "bytes"]}
+        line_totals = profiles["line"]["totals"]
+        self.assertEqual(profiles["line"]["not_applicable"], [])
+        self.assertGreater(line_totals["lines_read"], 0)
+        for engine in ["regex", "bytes"]:
+            profile = profiles[engine]
+            self.assertIn("lines_read", profile["not_applicable"])
+            self.assertIn("candidate_lines", profile["not_applicable"])
+            for counter in ["regex_candidates", "rejected_candidates", "long_notice_resolved"]:
+                self.assertEqual(profile["totals"].get(counter, 0), line_totals.get(counter, 0),
+                                 engine + ": " + counter)
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.server_latency import start_server
+from scan_client import ScanClient
+from scan_options import ScanOptions
+from scan_server import ScanServer
+
+
+def get_shorts(records):
+    return [record["short"] for record in records]
+
+
+class ScanServerTest(unittest.TestCase):
+    def test_defined_and_undefined_abbreviations(self):
+        server = ScanServer()
+        report = server.scan("a.tex", "we use Deep Learning (DL) here\nsome Graph Networks (GN), CNNs and (RNN)\n")
+        self.assertEqual(get_shorts(report["defined"]), ["DL", "GN"])
+        self.assertEqual(get_shorts(report["undefined"]), ["RNN"])
+        server.scan("b.tex", "a Convolutional Neural Network (CNN)\nthe DL models\n")
+        # CNNs is the plural form of CNN, defined in another document
+        report = server.query("a.tex")
+        self.assertEqual(get_shorts(report["defined"]), ["CNN", "DL", "GN"])
+        self.assertEqual(get_shorts(report["undefined"]), ["RNN"])
+        self.assertEqual(get_shorts(server.query("b.tex")["defined"]), ["CNN", "DL"])
+
+    def test_rules_of_the_server(self):
+        server = ScanServer(ScanOptions(rules={"stop_words": ["GN"], "plural_suffixes": ["es"]}))
+        self.assertIs(server.rules, server.scanner.rules)
+        server.scan("a.tex", "some Graph Networks (GN) and CNNes\n")
+        server.scan("b.tex", "a Convolutional Neural Network (CNN)\n")
+        # CNNes is the plural form of CNN with the rules of the server
+        report = server.query("a.tex")
+        self.assertEqual(get_shorts(report["defined"]), ["CNN"])
+        self.assertEqual(get_shorts(report["undefined"]), [])
+
+    def test_rescan_and_forget(self):
+        server = ScanServer()
+        server.scan("a.tex", "some Dense Layers (DL)\n")
+        server.scan("b.tex", "we use Deep Learning (DL)\n")
+        self.assertEqual(server.handle_request({"op": "definitions"})["abbreviations"][0]["long"], "Deep Learning ")
+        server.scan("b.tex", "no definitions\n")
+        self.assertEqual(server.handle_request({"op": "definitions"})["abbreviations"][0]["long"], "Dense Layers ")
+        self.assertTrue(server.forget("a.tex"))
+        self.assertFalse(server.forget("a.tex"))
+        self.assertEqual(server.handle_request({"op": "definitions"})["abbreviations"], [])
+
+    def test_least_recently_used_documents_are_evicted(self):
+        server = ScanServer(max_documents=2)
+        server.scan("a.tex", "a Neural Network (NN)\n")
+        server.scan("b.tex", "we use Deep Learning (DL)\n")
+        server.query("a.tex")
+        server.scan("c.tex", "text\n")
+        self.assertEqual(sorted(server.documents.keys()), ["a.tex", "c.tex"])
+        self.assertEqual(server.evictions, 1)
+        self.assertEqual(server.handle_line(b'{"id": 1, "op": "query", "path": "b.tex"}')["id"], 1)
+        self.assertIn("error", server.handle_line(b'{"id": 1, "op": "query", "path": "b.tex"}'))
+        self.assertIn("error", server.handle_line(b'{"id": 2, "op": "unknown"}'))
+        self.assertIn("error", server.handle_line(b'not json'))
+
+    def test_client_and_server(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "latin.tex")
+            with open(file_path, "w", encoding="latin-1") as f:
+                f.write("été a Neural Network (NN)\n")
+            server_process, connection_settings = start_server(temp_dir)
+            try:
+                with ScanClient(**connection_settings, timeout=10) as client:
+                    self.assertEqual(client.scan(file_path)["defined"],
+                                     [{"short": "NN", "long": "Neural Network ", "file": file_path, "line": 0}])
+                    report = client.scan("buffer.tex", "NN and DL (DL)\n")
+                    self.assertEqual(get_shorts(report["defined"]), ["NN"])
+                    self.assertEqual(get_shorts(report["undefined"]), ["DL"])
+                    self.assertEqual(client.get_stats()["documents"], 2)
+                    with self.assertRaises(Exception):
+                        client.query("missing.tex")
+            finally:
+                server_process.terminate()
+                server_process.wait()
@@ -0,0 +1,45 @@
+import io
+import os
+import tempfile
+import unittest
+
+from main import iterate_lines_with_lookback, find_abbreviations_in_lines, find_abbreviations_in_files_list
+
+
+class StreamingReaderTest(unittest.TestCase):
+    def test_window_keeps_lookback_previous_lines(self):
+        lines = ["a\n", "b\n", "c\n", "d\n"]
+        windows = [(line_id, line, list(prev_lines))
+                   for line_id, line, prev_lines in iterate_lines_with_lookback(lines, 2)]
+        self.assertEqual(windows, [(0, "a\n", []), (1, "b\n", ["a\n"]),
+                                   (2, "c\n", ["a\n", "b\n"]), (3, "d\n", ["b\n", "c\n"])])
+
+    def test_zero_lookback_keeps_no_lines(self):
+        windows = [list(prev_lines) for _, _, prev_lines in iterate_lines_with_lookback(["a\n", "b\n"], 0)]
+        self.assertEqual(windows, [[], []])
+
+    def test_lines_are_read_lazily(self):
+        read_lines = []
+
+        def lines():
+            for line in ["a\n", "b\n", "c\n"]:
+                read_lines.append(line)
+                yield line
+
+        iterator = iterate_lines_with_lookback(lines())
+        next(iterator)
+        self.assertEqual(read_lines, ["a\n"])
+
+    def test_abbreviations_are_found_in_a_stream(self):
+        stream = io.StringIO("text\nWe use Deep Learning (DL) here\nthe DL (DL) again\n")
+        abbreviations = find_abbreviations_in_lines(stream, "a.tex")
+        self.assertEqual([(a.short, a.long, a.file, a.line) for a in abbreviations],
+                         [("DL", "Deep Learning ", "a.tex", 1)])
+
+    def test_file_without_trailing_new_line(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "a.tex")
+            with open(file_path, "w") as f:
+                f.write("first line\nWe use Deep Learning (DL)")
+            abbreviations = find_abbreviations_in_files_list([file_path], False)
+        self.assertEqual([(a.short, a.long, a.line) for a in abbreviations], [("DL", "Deep Learning ", 1)])
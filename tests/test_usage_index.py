@@ -0,0 +1,52 @@
+import os
+import sys
+import subprocess
+import tempfile
+import unittest
+
+from Abbreviation import Abbreviation
+from usage_index import UsageIndex
+from main import find_abbreviation_usages
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class UsageIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "latin.tex")
+        with open(self.path, "w", encoding="latin-1") as f:
+            f.write("We use Deep Learning (DL) here\nété DL and DLs\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_index_file_with_encodings(self):
+        usage_index = UsageIndex([Abbreviation("DL", "Deep Learning ", self.path, 0)])
+        usage_index.index_file(self.path, ["utf-8", "latin-1"])
+        self.assertEqual(usage_index.counts["DL"], 2)
+        self.assertEqual(usage_index.first_uses["DL"], (self.path, 1))
+
+    def test_undecodable_file_is_skipped(self):
+        from scan_options import ScanOptions
+        usages = find_abbreviation_usages([Abbreviation("DL", "Deep Learning ", self.path, 0)], [self.path], False,
+                                          ScanOptions(encodings=["utf-8"]))
+        self.assertEqual(usages["DL"], {"uses": 0})
+
+    def test_usages_of_latin1_file_are_saved(self):
+        output_path = os.path.join(self.temp_dir.name, "abbr.json")
+        result = subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"), "-i", self.path,
+                                 "-o", output_path, "--usages", "--no-cache"], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertTrue(os.path.isfile(output_path))
+
+    def test_failed_search_exit_code(self):
+        result = subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "main.py"),
+                                 "-i", os.path.join(self.temp_dir.name, "missing"),
+                                 "-o", os.path.join(self.temp_dir.name, "abbr.json"), "--no-cache"],
+                                capture_output=True, text=True)
+        self.assertNotEqual(result.returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import json
+import tempfile
+import unittest
+
+from scan_options import ScanOptions
+from watcher import AbbreviationsWatcher
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.temp_dir.name, "input")
+        os.mkdir(self.input_dir)
+        self.first_path = self.write_input("first.tex", "We use Deep Learning (DL) here\n")
+        self.second_path = self.write_input("second.tex", "a Neural Network (NN) here\n")
+        self.output_path = os.path.join(self.temp_dir.name, "abbr.json")
+        self.watcher = AbbreviationsWatcher(self.input_dir, ["tex"], self.output_path, ScanOptions(),
+                                            poll_interval=0, debounce=0)
+        self.watcher.fingerprints = self.watcher.get_fingerprints()
+        self.watcher.rescan(list(self.watcher.fingerprints.keys()), [])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_input(self, name, text):
+        path = os.path.join(self.input_dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def read_output(self):
+        with open(self.output_path) as f:
+            return [(record["short"], record.get("long")) for record in json.load(f)["abbreviations"]]
+
+    def test_unchanged_files_are_not_rescanned(self):
+        os.remove(self.output_path)
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_modified_file_is_rescanned(self):
+        self.write_input("second.tex", "a Neural Net (NN) here, longer\n")
+        self.watcher.poll()
+        self.assertEqual(sorted(self.read_output()), [("DL", "Deep Learning "), ("NN", "Neural Net ")])
+
+    def test_created_and_deleted_files(self):
+        os.remove(self.first_path)
+        self.write_input("third.tex", "the Support Vector Machine (SVM)\n")
+        self.watcher.poll()
+        self.assertEqual(sorted(self.read_output()), [("NN", "Neural Network "), ("SVM", "Support Vector Machine ")])
+        self.assertEqual(sorted(self.watcher.results.get_files()),
+                         [self.second_path, os.path.join(self.input_dir, "third.tex")])
+
+    def test_unchanged_abbreviations_do_not_rewrite_output(self):
+        self.write_input("first.tex", "We use Deep Learning (DL) here and there\n")
+        os.remove(self.output_path)
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_deleted_input_file(self):
+        output_path = os.path.join(self.temp_dir.name, "single.json")
+        watcher = AbbreviationsWatcher(self.first_path, ["tex"], output_path, ScanOptions(),
+                                       poll_interval=0, debounce=0)
+        watcher.fingerprints = watcher.get_fingerprints()
+        watcher.rescan(list(watcher.fingerprints.keys()), [])
+        os.remove(self.first_path)
+        watcher.poll()
+        with open(output_path) as f:
+            self.assertEqual(json.load(f)["abbreviations"], [])
+        self.assertEqual(watcher.results.get_files(), [])
+        self.write_input("first.tex", "a Neural Network (NN) here\n")
+        watcher.poll()
+        with open(output_path) as f:
+            self.assertEqual([record["short"] for record in json.load(f)["abbreviations"]], ["NN"])
@@ -0,0 +1,176 @@
+"""
+Index of abbreviation uses. All the short notices are combined into a single
+regular expression, built from a prefix tree (trie) of the short notices, so
+that every text is visited once, independent of the number of abbreviations
+"""
+import re
+
+# local imports
+from scan_options import DEFAULT_ENCODINGS
+from archive_reader import decode_member
+
+# characters, which short notices consist of. Short notices are only matched as whole words
+WORD_CHARS = "A-Za-z0-9_"
+
+
+class UsageIndex:
+    """
+    Uses of abbreviations in the input files
+    Attributes:
+        definitions: dictionary with key = short notice, value = (file, line) of the abbreviation definition
+        forms: dictionary with key = form of short notice (e.g., CNN or CNNs), value = short notice
+        pattern: compiled regular expression, matching every form of every short notice
+        counts: dictionary with key = short notice, value = number of uses
+        first_uses: dictionary with key = short notice, value = (file, line) of the first use
+        file_order: dictionary with key = file, value = position of the file in the order of indexed files
+        reading_order: reading order of a LaTeX document (ReadingOrder) or None. If specified, uses and
+            definitions in the files of the document are compared in the reading order of the document
+    """
+    def __init__(self, abbreviations, reading_order=None):
+        self.definitions = {}
+        self.forms = {}
+        for abbreviation in abbreviations:
+            self.definitions[abbreviation.short] = (abbreviation.file, abbreviation.line)
+            self.forms[abbreviation.short] = abbreviation.short
+        # singular and plural forms of the abbreviations are also counted as uses,
+        # e.g., CNN is a use of CNNs, unless CNN is an abbreviation itself
+        for abbreviation in abbreviations:
+            short = abbreviation.short
+            other_form = short[:-1] if short.endswith("s") and len(short) > 1 else short + "s"
+            self.forms.setdefault(other_form, short)
+
+        self.pattern = build_words_pattern(self.forms.keys())
+        self.counts = {abbreviation.short: 0 for abbreviation in abbreviations}
+        self.first_uses = {}
+        self.file_order = {}
+        self.reading_order = reading_order
+
+    def index_file(self, file_path, encodings=DEFAULT_ENCODINGS):
+        """
+        Find uses of abbreviations in a file
+        :param file_path: path to the file
+        :param encodings: encodings of the file, tried one after another, until the file is decoded
+        """
+        with open(file_path, "rb") as fp:
+            self.index_text(decode_member(fp.read(), encodings), file_path)
+
+    def index_text(self, text, file_path=None):
+        """
+        Find uses of abbreviations in a text
+        :param text: text, e.g., content of a .tex file
+        :param file_path: path to the file, the text belongs to (if available)
+        """
+        self.file_order.setdefault(file_path, len(self.file_order))
+        if self.pattern is None:
+            return
+
+        line_id = 0
+        counted_pos = 0
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            line_id += text.count("\n", counted_pos, start)
+            counted_pos = start
+            short = self.forms[match.group()]
+            # the definition itself, e.g., (CNNs), is not a use of the abbreviation
+            if self.definitions[short] == (file_path, line_id) and is_enclosed_in_round_brackets(text, match):
+                continue
+            self.counts[short] += 1
+            first_use = self.first_uses.get(short)
+            if first_use is None or (self.reading_order is not None and
+                                     self.get_position(file_path, line_id) < self.get_position(*first_use)):
+                self.first_uses[short] = (file_path, line_id)
+
+    def is_used_before_definition(self, short):
+        """
+        Check if abbreviation is used before it is defined
+        :param short: short notice of the abbreviation
+        :return: True, if the first use of the abbreviation precedes its definition and False otherwise
+        """
+        first_use = self.first_uses.get(short)
+        definition = self.definitions[short]
+        if first_use is None or definition[0] not in self.file_order:
+            return False
+        return self.get_position(*first_use) < self.get_position(*definition)
+
+    def get_position(self, file_path, line):
+        """
+        Get position of a line in the indexed files
+        :param file_path: path to the file
+        :param line: line in the file
+        :return: position, which can be compared with other positions: (segment index, line) in the reading order
+            of the document, if the file is a part of the document, and (number of segments + position
+            of the file in the order of indexed files, line) otherwise
+        """
+        if self.reading_order is not None:
+            position = self.reading_order.get_position(file_path, line)
+            if position is not None:
+                return position
+            return len(self.reading_order.segments) + self.file_order[file_path], line
+        return self.file_order[file_path], line
+
+    def get_unused(self):
+        """
+        Get abbreviations, that are defined but never used
+        :return: list of short notices of unused abbreviations
+        """
+        return [short for short, count in self.counts.items() if count == 0]
+
+    def to_json_fields(self):
+        """
+        Represent abbreviation uses as additional fields of abbreviations in the output JSON file
+        :return: dictionary with key = short notice, value = dictionary of additional fields
+        """
+        json_fields = {}
+        for short, count in self.counts.items():
+            fields = {"uses": count}
+            first_use = self.first_uses.get(short)
+            if first_use is not None:
+                fields["first_use"] = {"file": first_use[0], "line": first_use[1]}
+                fields["used_before_definition"] = self.is_used_before_definition(short)
+            json_fields[short] = fields
+        return json_fields
+
+
+def is_enclosed_in_round_brackets(text, match):
+    return match.start() > 0 and text[match.start() - 1] == "(" and text[match.end():match.end() + 1] == ")"
+
+
+def build_words_pattern(words):
+    """
+    Build a single regular expression, matching any of the words as a whole word.
+    The words are combined into a prefix tree, so that common prefixes are matched once
+    :param words: words, consisting of letters, digits and underscores
+    :return: compiled regular expression or None, if there are no words
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if len(trie) == 0:
+        return None
+    return re.compile("(?<![" + WORD_CHARS + "])" + trie_to_pattern(trie) + "(?![" + WORD_CHARS + "])")
+
+
+def trie_to_pattern(node):
+    """
+    Convert a prefix tree (trie) of words into a regular expression
+    :param node: node of the trie: dictionary with key = next character, value = child node.
+        The empty key marks the end of a word
+    :return: regular expression, matching every word in the trie
+    """
+    alternatives = []
+    word_ends_here = False
+    for char in sorted(node.keys()):
+        if char == "":
+            word_ends_here = True
+            continue
+        alternatives.append(re.escape(char) + trie_to_pattern(node[char]))
+
+    if len(alternatives) == 0:
+        return ""
+    pattern = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if word_ends_here:
+        pattern = "(?:" + pattern + ")?"
+    return pattern
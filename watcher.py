@@ -0,0 +1,185 @@
+import os
+import time
+
+# local imports
+from Abbreviation import AbbreviationRegistry
+from json_converters.abbreviations_to_json import abbreviations_to_json, DEFAULT_OUTPUT_FORMAT
+from input_file_worker import get_input_file_paths, DEFAULT_EXCLUDE_PATTERNS
+from archive_reader import ARCHIVE_MEMBER_SEPARATOR
+from main import scan_files, add_or_replace_abbreviation
+from result_store import ResultStore
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.3
+
+
+class AbbreviationsWatcher:
+    """
+    Watches input files and re-writes the output JSON file with abbreviations,
+    when the input files change. Only the modified, created or deleted files
+    are re-scanned. The input files are polled, because the standard library
+    does not provide a portable file system notifications API
+    Attributes:
+        input_path: path to input file or input files directory
+        file_extensions: input file extensions
+        output_path: path to output JSON file with abbreviations
+        options: abbreviations search options (ScanOptions)
+        jobs: number of worker processes, used to scan the input files
+        cache: scan cache (ScanCache) or None
+        verbose: flag. If True, print details
+        poll_interval: interval between two checks of the input files, in seconds
+        debounce: time, during which the input files should not change
+            before they are re-scanned, in seconds
+        exclude_patterns: glob patterns of names of directories, which are not visited
+        include_graph: graph of LaTeX files (IncludeGraph). If specified, the input path is
+            a root document and only the files, reachable from the root document, are watched
+        policy: merge policy of abbreviations, defined with different long notices (one of MERGE_POLICIES)
+        output_format: format of the output file (one of OUTPUT_FORMATS)
+        fingerprints: dictionary with key = path to input file, value = (modification time, size) of the file
+        results: abbreviations found in the input files (ResultStore), kept between the re-scans
+        merged_abbreviations: abbreviations, saved in the output JSON file, represented as a list of tuples,
+            together with the conflicts of the abbreviations
+        reading_order: reading order of the root document (ReadingOrder), if the include graph is specified
+    """
+    def __init__(self, input_path, file_extensions, output_path, options, jobs=1, cache=None, verbose=False,
+                 poll_interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE, exclude_patterns=None,
+                 include_graph=None, policy="latest", output_format=DEFAULT_OUTPUT_FORMAT):
+        self.input_path = input_path
+        self.file_extensions = file_extensions
+        self.output_path = output_path
+        self.options = options
+        self.jobs = jobs
+        self.cache = cache
+        self.verbose = verbose
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.exclude_patterns = DEFAULT_EXCLUDE_PATTERNS if exclude_patterns is None else exclude_patterns
+        self.include_graph = include_graph
+        self.policy = policy
+        self.output_format = output_format
+        self.fingerprints = {}
+        self.results = ResultStore()
+        self.merged_abbreviations = None
+        self.reading_order = None
+
+    def run(self):
+        """
+        Scan all input files, and then watch them until interrupted (e.g., with Ctrl+C)
+        """
+        self.fingerprints = self.get_fingerprints()
+        self.rescan(list(self.fingerprints.keys()), [])
+        print("Watching", self.input_path, "for changes. Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(self.poll_interval)
+                self.poll()
+        except KeyboardInterrupt:
+            print("Watching stopped.")
+
+    def poll(self):
+        """
+        Check the input files once. If some of the input files changed,
+        wait until the changes are over and re-scan the changed files
+        """
+        fingerprints = self.get_fingerprints()
+        if fingerprints == self.fingerprints:
+            return
+        detection_time = time.time()
+
+        # debounce: rapid save bursts are processed together
+        while True:
+            time.sleep(self.debounce)
+            stable_fingerprints = self.get_fingerprints()
+            if stable_fingerprints == fingerprints:
+                break
+            fingerprints = stable_fingerprints
+
+        changed_paths = [path for path, fingerprint in fingerprints.items()
+                         if self.fingerprints.get(path) != fingerprint]
+        deleted_paths = [path for path in self.fingerprints.keys() if path not in fingerprints]
+        self.fingerprints = fingerprints
+        # deletion time is unknown, so for deleted files the time of the change detection is used
+        last_change_time = max([fingerprints[path][0] / 1e9 for path in changed_paths], default=detection_time)
+        if self.rescan(changed_paths, deleted_paths):
+            print("Abbreviations updated", "{:.0f}".format((time.time() - last_change_time) * 1000),
+                  "ms after the last change")
+
+    def rescan(self, changed_paths, deleted_paths):
+        """
+        Re-scan changed files and re-write the output JSON file, if the found abbreviations changed
+        :param changed_paths: paths to modified or created input files
+        :param deleted_paths: paths to deleted input files
+        :return: True, if the output JSON file was re-written and False otherwise
+        """
+        if self.verbose:
+            print("Changed files:", changed_paths, "deleted files:", deleted_paths)
+        for path in deleted_paths:
+            self.results.remove_file(path)
+        changed_abbreviations = {path: [] for path in changed_paths}
+        try:
+            for path, abbreviations in scan_files(changed_paths, self.verbose, self.options, self.jobs, self.cache):
+                # abbreviations, found in archive members, are kept together with the archive
+                input_path = path if path in changed_abbreviations else self.get_member_archive(path, changed_paths)
+                changed_abbreviations.setdefault(input_path, []).extend(abbreviations)
+        except OSError as e:
+            # the file was deleted or moved while it was scanned. It is re-scanned on the next poll
+            print("Abbreviations search error: " + str(e))
+            self.fingerprints = {}
+            return False
+        for path, abbreviations in changed_abbreviations.items():
+            self.results.add_abbreviations(path, abbreviations)
+        if self.cache is not None:
+            self.cache.save()
+
+        # merge per-file abbreviations in the order of the input files or in the reading order of the root document
+        registry = AbbreviationRegistry(policy=self.policy)
+        if self.reading_order is not None:
+            for abbreviation in self.reading_order.iterate_abbreviations(self.results.get_file_abbreviations):
+                add_or_replace_abbreviation(abbreviation, registry, self.verbose)
+        else:
+            for path in self.fingerprints.keys():
+                for abbreviation in self.results.get_file_abbreviations(path):
+                    add_or_replace_abbreviation(abbreviation, registry, self.verbose)
+        abbreviations = registry.to_list()
+
+        conflicts = registry.get_conflicts()
+        merged_abbreviations = ([(a.short, a.long, a.file, a.line) for a in abbreviations], conflicts)
+        if merged_abbreviations == self.merged_abbreviations:
+            if self.verbose:
+                print("Abbreviations did not change")
+            return False
+
+        abbreviations_to_json(abbreviations, self.output_path, self.verbose, conflicts, self.output_format)
+        self.merged_abbreviations = merged_abbreviations
+        return True
+
+    @staticmethod
+    def get_member_archive(member_path, archive_paths):
+        for archive_path in archive_paths:
+            if member_path.startswith(archive_path + ARCHIVE_MEMBER_SEPARATOR):
+                return archive_path
+        return member_path
+
+    def get_fingerprints(self):
+        """
+        Get fingerprints of the input files
+        :return: dictionary with key = path to input file, value = (modification time, size) of the file
+        """
+        # the input file or the root document may be missing for a moment, e.g., when an editor
+        # saves it by renaming a temporary file. Then all input files are considered deleted
+        if not os.path.exists(self.input_path):
+            return {}
+        if self.include_graph is not None:
+            self.reading_order = self.include_graph.get_reading_order(self.input_path)
+            input_file_paths = self.reading_order.get_files()
+        else:
+            input_file_paths = get_input_file_paths(self.input_path, self.file_extensions,
+                                                    exclude_patterns=self.exclude_patterns)
+        fingerprints = {}
+        for path in input_file_paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            fingerprints[path] = (stat.st_mtime_ns, stat.st_size)
+        return fingerprints